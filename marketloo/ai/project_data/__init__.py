@@ -0,0 +1,5 @@
+import os
+
+# The scripts in this package run as modules from marketloo/
+# (python -m ai.project_data.<script>) and keep their files here
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
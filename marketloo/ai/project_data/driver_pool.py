@@ -0,0 +1,130 @@
+from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.chrome.options import Options
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from webdriver_manager.chrome import ChromeDriverManager
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+import queue
+import threading
+
+PAGE_TIMEOUT = 30
+WAIT_TIMEOUT = 10
+
+@lru_cache(maxsize=None)
+def driver_path():
+    """Install (or find) chromedriver once per process"""
+    return ChromeDriverManager().install()
+
+def new_driver(page_timeout=PAGE_TIMEOUT):
+    chrome_options = Options()
+    chrome_options.add_argument("--headless")
+    chrome_options.add_argument("--disable-gpu")
+    chrome_options.add_argument("--no-sandbox")
+    driver = webdriver.Chrome(service=Service(driver_path()), options=chrome_options)
+    driver.set_page_load_timeout(page_timeout)
+    return driver
+
+def wait_for(driver, css_selector, timeout=WAIT_TIMEOUT):
+    """Wait until an element matching the selector exists and return it"""
+    return WebDriverWait(driver, timeout).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, css_selector)))
+
+class DriverPool:
+    """A fixed set of long-lived headless Chrome instances.
+
+    Browsers are started lazily up to `size` and handed out one caller at a
+    time. A browser that errors out is quit and replaced on next use.
+    """
+
+    def __init__(self, size=4, page_timeout=PAGE_TIMEOUT):
+        self.size = size
+        self.page_timeout = page_timeout
+        self.idle = queue.Queue()
+        self.started = 0
+        self.lock = threading.Lock()
+        self.drivers = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _acquire(self):
+        # None in the idle queue marks a slot whose browser needs (re)starting
+        with self.lock:
+            start = self.idle.empty() and self.started < self.size
+            if start:
+                self.started += 1
+        driver = None if start else self.idle.get()
+        if driver is not None:
+            return driver
+        try:
+            driver = new_driver(self.page_timeout)
+        except Exception:
+            self.idle.put(None)
+            raise
+        with self.lock:
+            self.drivers.append(driver)
+        return driver
+
+    def _discard(self, driver):
+        with self.lock:
+            if driver in self.drivers:
+                self.drivers.remove(driver)
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        self.idle.put(None)
+
+    @contextmanager
+    def driver(self):
+        """Borrow a browser for the duration of the with block"""
+        driver = self._acquire()
+        healthy = True
+        try:
+            yield driver
+        except WebDriverException as e:
+            # A page timeout leaves the browser usable, anything else may not
+            healthy = isinstance(e, TimeoutException)
+            raise
+        finally:
+            if healthy:
+                self.idle.put(driver)
+            else:
+                self._discard(driver)
+
+    def run(self, fn, *args):
+        """Call fn(driver, *args) with a borrowed browser"""
+        with self.driver() as driver:
+            return fn(driver, *args)
+
+    def map(self, fn, items):
+        """Call fn(driver, item) for every item across the pool, returning
+        results in input order. Items whose call fails give None."""
+        def call(item):
+            try:
+                return self.run(fn, item)
+            except Exception as e:
+                print(f"Error scraping {item}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=self.size) as executor:
+            return list(executor.map(call, items))
+
+    def close(self):
+        with self.lock:
+            drivers, self.drivers = self.drivers, []
+            self.started = 0
+            self.idle = queue.Queue()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
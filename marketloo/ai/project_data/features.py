@@ -0,0 +1,272 @@
+import argparse
+import json
+import math
+import os
+import numpy as np
+from ai.project_data import DATA_DIR
+from ai.project_data.prize_retrieval import PrizeIndex
+from ai.scraper.frontier import canonicalize
+from ai.scraper.records import Project, Track, load_projects
+
+SCRAPER_DIR = os.path.join(DATA_DIR, '..', 'scraper')
+
+SCRAPER_DATA = os.path.join(SCRAPER_DIR, 'ai', 'scraper', 'data')
+CORPUS_PATHS = [os.path.join(SCRAPER_DATA, name)
+                for name in ['final.json', 'parsed_projects.json', 'projects.json']]
+TRACKS_PATH = os.path.join(SCRAPER_DATA, 'tracks.json')
+PRIORS_PATH = os.path.join(DATA_DIR, "priors.json")
+
+NUMERIC_FEATURES = ['log_likes', 'log_comments', 'team_size', 'technology_count',
+                    'link_count', 'section_count', 'log_section_chars']
+
+# Hand-set weights on the standardized features: a prior to open markets
+# at, not a fitted model. Columns without a weight (technologies, tracks)
+# count for nothing unless weights are passed in.
+DEFAULT_WEIGHTS = {
+    'log_likes': 1.0,
+    'log_comments': 0.5,
+    'team_size': 0.2,
+    'technology_count': 0.2,
+    'link_count': 0.1,
+    'section_count': 0.2,
+    'log_section_chars': 0.3
+}
+
+def merge_corpus(*corpora):
+    """One Project per page across several scraper outputs.
+
+    Records are matched on canonical URL, or on title when one of the two
+    has no URL (parsed_projects.json); two records with different URLs
+    are different projects even if they share a title. Earlier corpora
+    win, later ones only fill in fields that are missing.
+    """
+    merged = []
+    by_url = {}
+    by_title = {}
+    for corpus in corpora:
+        for project in corpus:
+            if project.url:
+                project.url = canonicalize(project.url)
+            title = (project.title or '').strip().lower()
+            existing = by_url.get(project.url) if project.url else None
+            if existing is None and title:
+                candidate = by_title.get(title)
+                if candidate is not None and not (project.url and candidate.url):
+                    existing = candidate
+            if existing is None:
+                merged.append(project)
+                existing = project
+            else:
+                for field in Project.FIELDS:
+                    if getattr(existing, field) is None and getattr(project, field) is not None:
+                        setattr(existing, field, getattr(project, field))
+            if existing.url:
+                by_url.setdefault(existing.url, existing)
+            if title:
+                by_title.setdefault(title, existing)
+    return merged
+
+def load_corpus(paths=CORPUS_PATHS):
+    return merge_corpus(*[load_projects(path) for path in paths if os.path.exists(path)])
+
+def load_tracks(path=TRACKS_PATH):
+    """Tracks from a scraper tracks.json, once per name"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    tracks = {}
+    for track in data['tracks']:
+        tracks.setdefault(track['name'], Track.from_dict(dict(track, hackathon=data.get('hackathon_url'))))
+    return list(tracks.values())
+
+def _name(text):
+    return ' '.join((text or '').split()).casefold()
+
+def _same_hackathon(url, hackathon_url):
+    return bool(url) and canonicalize(url) == canonicalize(hackathon_url)
+
+def for_hackathon(projects, hackathon_url):
+    """The projects that belong to a hackathon.
+
+    A project belongs if its hackathon, or a hackathon it was submitted to
+    (its prizes), is hackathon_url. Projects that name no hackathon at
+    all are kept, as the single-hackathon scraper outputs don't record
+    one; projects that only name other hackathons are dropped.
+    """
+    if not hackathon_url:
+        return list(projects)
+    kept = []
+    for project in projects:
+        named = [project.hackathon] + [s.hackathon_url for s in project.prizes or []]
+        named = [url for url in named if url]
+        if not named or any(_same_hackathon(url, hackathon_url) for url in named):
+            kept.append(project)
+    return kept
+
+def corpus_submissions(projects, tracks):
+    """{project url: track names} from what the corpus records: prizes a
+    project won at the tracks' hackathon and the track the matcher gave it
+    (matched_prize). This is only part of who entered what, so it feeds
+    the track columns but shouldn't limit eligibility."""
+    names = {_name(track.name): track.name for track in tracks}
+    hackathons = {track.hackathon for track in tracks if track.hackathon}
+    submissions = {}
+    for project in projects:
+        if not project.url:
+            continue
+        entered = []
+        for submission in project.prizes or []:
+            if hackathons and submission.hackathon_url and \
+                    not any(_same_hackathon(submission.hackathon_url, h) for h in hackathons):
+                continue
+            entered += [names[_name(prize)] for prize in submission.won or [] if _name(prize) in names]
+        if _name(project.matched_prize) in names:
+            entered.append(names[_name(project.matched_prize)])
+        if entered:
+            submissions[project.url] = list(dict.fromkeys(entered))
+    return submissions
+
+class FeatureMatrix:
+    """Projects as rows of a dense float matrix.
+
+    columns names every column: the numeric features first, then one
+    'tech:<name>' column per technology used by at least min_count
+    projects and one 'track:<name>' column per track a project was
+    submitted to. Rows line up with `projects`.
+    """
+
+    def __init__(self, projects, submissions=None, min_count=2):
+        self.projects = list(projects)
+        submissions = submissions or {}
+        n = len(self.projects)
+
+        def column(values):
+            return np.fromiter(values, dtype=np.float64, count=n)
+
+        numeric = [
+            column(math.log1p(p.likes or 0) for p in self.projects),
+            column(math.log1p(p.comments or 0) for p in self.projects),
+            column(len(p.team_members or []) for p in self.projects),
+            column(len(p.technologies or []) for p in self.projects),
+            column(len(p.links or []) for p in self.projects),
+            column(len(p.sections or {}) for p in self.projects),
+            column(math.log1p(sum(len(t) for t in (p.sections or {}).values()) or len(p.text or ''))
+                   for p in self.projects)
+        ]
+
+        counts = {}
+        for project in self.projects:
+            for technology in set(project.technologies or []):
+                counts[technology] = counts.get(technology, 0) + 1
+        technologies = sorted(t for t, count in counts.items() if count >= min_count)
+        tracks = sorted({t for names in submissions.values() for t in names})
+        self.columns = (NUMERIC_FEATURES + [f"tech:{t}" for t in technologies]
+                        + [f"track:{t}" for t in tracks])
+        self.index = {name: i for i, name in enumerate(self.columns)}
+
+        self.matrix = np.zeros((n, len(self.columns)))
+        self.matrix[:, :len(NUMERIC_FEATURES)] = np.column_stack(numeric)
+        # One-hot columns are filled with a single scatter each
+        rows, cols = [], []
+        for row, project in enumerate(self.projects):
+            for technology in set(project.technologies or []):
+                col = self.index.get(f"tech:{technology}")
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+            for track in submissions.get(project.url, ()):
+                rows.append(row)
+                cols.append(self.index[f"track:{track}"])
+        self.matrix[rows, cols] = 1.0
+
+    def __len__(self):
+        return len(self.projects)
+
+    def standardized(self):
+        """Columns scaled to zero mean and unit variance (constant columns
+        become 0)"""
+        std = self.matrix.std(axis=0)
+        return (self.matrix - self.matrix.mean(axis=0)) / np.where(std == 0, 1, std)
+
+    def weight_vector(self, weights):
+        vector = np.zeros(len(self.columns))
+        for name, weight in weights.items():
+            if name in self.index:
+                vector[self.index[name]] = weight
+        return vector
+
+def project_text(project):
+    return f"{project.title or ''}. {project.tagline or ''} {project.full_text()}"
+
+def prior_probabilities(features, tracks, weights=None, affinity_weight=2.0, temperature=1.0,
+                        eligible=None, smoothing=0.05):
+    """Chance each project wins each track, as a (projects x tracks) array.
+
+    A project's strength is its weighted, standardized features; its fit
+    to a track is the TF-IDF similarity of its text to the track's name
+    and description. Each track's column is a softmax of strength plus
+    affinity_weight * fit over the projects eligible for it (all of them
+    unless `eligible`, a boolean array of the same shape, says otherwise).
+    A `smoothing` share of each column is then spread evenly over its
+    eligible projects, so no market opens at near-zero odds. Every column
+    with an eligible project sums to one.
+    """
+    n, t = len(features), len(tracks)
+    if not n or not t:
+        return np.zeros((n, t))
+    if eligible is None:
+        eligible = np.ones((n, t), dtype=bool)
+    strength = features.standardized() @ features.weight_vector(weights or DEFAULT_WEIGHTS)
+
+    texts = [project_text(p) for p in features.projects]
+    index = PrizeIndex([track.name for track in tracks],
+                       [f"{track.name}. {track.description or ''}" for track in tracks], texts)
+    fit = index.scores(texts)
+
+    logits = np.where(eligible, (strength[:, None] + affinity_weight * fit) / temperature, -np.inf)
+    # Tracks nobody is eligible for come out as all zeros and get no markets
+    with np.errstate(invalid='ignore'):
+        logits -= logits.max(axis=0, keepdims=True)
+        odds = np.exp(logits)
+        softmax = np.nan_to_num(odds / odds.sum(axis=0, keepdims=True))
+    uniform = eligible / np.maximum(eligible.sum(axis=0, keepdims=True), 1)
+    return (1 - smoothing) * softmax + smoothing * uniform
+
+def seed_priors(projects, tracks, submissions=None, weights=None, limit_to_submissions=True, **options):
+    """One {url, title, track, probability} record per project x track, for
+    opening markets in one batch. submissions (url -> track names), when
+    known, fill the track columns and, with limit_to_submissions, limit
+    each track to the projects submitted to it."""
+    features = FeatureMatrix(projects, submissions)
+    eligible = np.ones((len(features), len(tracks)), dtype=bool)
+    if submissions and limit_to_submissions:
+        names = {track.name: j for j, track in enumerate(tracks)}
+        eligible = np.zeros((len(features), len(tracks)), dtype=bool)
+        for i, project in enumerate(features.projects):
+            for name in submissions.get(project.url, ()):
+                if name in names:
+                    eligible[i, names[name]] = True
+    probabilities = prior_probabilities(features, tracks, weights, eligible=eligible, **options)
+    priors = []
+    for i, j in zip(*np.nonzero(eligible)):
+        project = features.projects[i]
+        priors.append({'url': project.url, 'title': project.title, 'track': tracks[j].name,
+                       'probability': round(float(probabilities[i, j]), 6)})
+    return priors
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Price project x track markets from the scraped corpus")
+    parser.add_argument('--projects', nargs='+', default=CORPUS_PATHS,
+                        help="Scraper outputs to merge into the corpus (JSON or JSONL)")
+    parser.add_argument('--tracks', default=TRACKS_PATH, help="Scraper tracks.json")
+    parser.add_argument('--output', default=PRIORS_PATH, help="Where to write the priors")
+    parser.add_argument('--temperature', type=float, default=1.0,
+                        help="Higher spreads the odds more evenly")
+    args = parser.parse_args()
+
+    tracks = load_tracks(args.tracks)
+    projects = for_hackathon(load_corpus(args.projects), tracks[0].hackathon if tracks else None)
+    priors = seed_priors(projects, tracks, corpus_submissions(projects, tracks),
+                         limit_to_submissions=False, temperature=args.temperature)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(priors, f, indent=2, ensure_ascii=False)
+    print(f"Priced {len(priors)} markets ({len(projects)} projects x {len(tracks)} tracks) into {args.output}")
@@ -0,0 +1,80 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from ai.project_data import DATA_DIR
+
+CACHE_PATH = os.path.join(DATA_DIR, "llm_cache.sqlite")
+
+class ResponseCache:
+    """Persistent memo of LLM answers in SQLite.
+
+    Entries are keyed on a hash of the model, temperature and the rendered
+    prompt, plus the prompt templates in use, so an unchanged project is
+    never sent twice and editing a prompt invalidates the old answers.
+    Entries expire after ttl seconds and the least recently used are dropped
+    once there are more than max_entries.
+    """
+
+    def __init__(self, path=CACHE_PATH, ttl=30 * 24 * 3600, max_entries=100000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.db = sqlite3.connect(path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                used_at REAL NOT NULL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_used_at ON responses (used_at)")
+        self.db.commit()
+
+    @staticmethod
+    def key(model, temperature, prompt, templates=''):
+        payload = json.dumps([model, temperature, prompt, templates], ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """The cached answer, or None on a miss or expired entry"""
+        row = self.db.execute("SELECT value, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or (self.ttl is not None and now - row[1] > self.ttl):
+            self.misses += 1
+            return None
+        self.db.execute("UPDATE responses SET used_at = ? WHERE key = ?", (now, key))
+        self.db.commit()
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        now = time.time()
+        self.db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                        (key, json.dumps(value, ensure_ascii=False), now, now))
+        self.db.commit()
+
+    def evict(self):
+        """Drop expired entries, then the least recently used over max_entries"""
+        removed = 0
+        if self.ttl is not None:
+            removed += self.db.execute("DELETE FROM responses WHERE created_at < ?",
+                                       (time.time() - self.ttl,)).rowcount
+        if self.max_entries is not None:
+            removed += self.db.execute("""
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY used_at DESC LIMIT -1 OFFSET ?
+                )
+            """, (self.max_entries,)).rowcount
+        self.db.commit()
+        return removed
+
+    def stats(self):
+        size = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'entries': size}
+
+    def close(self):
+        self.db.close()
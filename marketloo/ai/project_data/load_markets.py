@@ -0,0 +1,259 @@
+import argparse
+import datetime
+import os
+import sqlite3
+import time
+import uuid
+from ai.project_data.features import (CORPUS_PATHS, TRACKS_PATH, _name, canonicalize, corpus_submissions,
+                                      for_hackathon, load_corpus, load_tracks, seed_priors)
+from ai.project_data.match_project_prize import CHECKPOINT_PATH, load_checkpoint
+
+BATCH_SIZE = 500
+OPEN_DAYS = 7
+
+PRICE_DECIMALS = 6
+MIN_PRICE = 0.0001
+# Even a track with a single candidate opens short of certain
+MAX_PRICE = 0.99
+
+# Matches only limit the markets when at least this share of the
+# hackathon's projects was matched to one of its tracks; a partial or
+# foreign checkpoint would otherwise leave most projects out
+MIN_MATCHED_SHARE = 0.5
+
+# Market, option and outcome ids are derived from the hackathon, track and
+# project, so loading the same hackathon again finds the rows it made
+# before instead of adding copies
+ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "https://marketloo/hackathon-markets")
+
+# The tables of sql/full_schema.sql that markets are loaded into, in
+# SQLite's dialect, for tests and dry runs without Postgres
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS markets (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    closes_at TEXT NOT NULL,
+    outcome TEXT,
+    volume NUMERIC DEFAULT 0,
+    user_id TEXT,
+    status TEXT
+);
+CREATE TABLE IF NOT EXISTS outcomes (
+    outcome_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    market_id TEXT REFERENCES markets (id) ON DELETE CASCADE,
+    name TEXT,
+    initial_price NUMERIC,
+    current_price NUMERIC,
+    is_winner BOOLEAN
+);
+CREATE TABLE IF NOT EXISTS options (
+    id TEXT PRIMARY KEY,
+    market_id TEXT REFERENCES markets (id),
+    name TEXT NOT NULL,
+    yes_outcome_id TEXT REFERENCES outcomes (outcome_id),
+    no_outcome_id TEXT REFERENCES outcomes (outcome_id),
+    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+# Parents before children, for the foreign keys
+COLUMNS = {
+    'markets': ('id', 'title', 'description', 'closes_at', 'status'),
+    'outcomes': ('outcome_id', 'market_id', 'name', 'initial_price', 'current_price', 'is_winner'),
+    'options': ('id', 'market_id', 'name', 'yes_outcome_id', 'no_outcome_id')
+}
+KEYS = {'markets': 'id', 'outcomes': 'outcome_id', 'options': 'id'}
+
+def stable_id(*parts):
+    return str(uuid.uuid5(ID_NAMESPACE, '\x1f'.join(parts)))
+
+def yes_price(probability):
+    """Opening price of a Yes outcome, in the (0, 1) units the market
+    scripts use. Prices are numeric columns, so they keep PRICE_DECIMALS
+    places: with hundreds of projects a track's odds are fractions of a
+    percent, which cents would flatten to the floor."""
+    return min(MAX_PRICE, max(MIN_PRICE, round(probability, PRICE_DECIMALS)))
+
+def no_price(yes):
+    return round(1 - yes, PRICE_DECIMALS)
+
+def plan_markets(hackathon_url, tracks, priors, closes_at):
+    """Rows for one market per track with one Yes/No option per project.
+
+    priors are seed_priors() records; a track's options are the projects
+    priced for it. Returns {table: [row tuples in COLUMNS order]}.
+    """
+    by_track = {}
+    for prior in priors:
+        by_track.setdefault(prior['track'], []).append(prior)
+
+    rows = {table: [] for table in COLUMNS}
+    for track in tracks:
+        candidates = by_track.get(track.name)
+        if not candidates:
+            continue
+        market_id = stable_id(hackathon_url, track.name)
+        description = f"Resolves to the project that wins {track.name} at {hackathon_url}."
+        if track.prize_amount:
+            description += f" Prize: ${track.prize_amount}."
+        if track.description:
+            description += f" {track.description}"
+        rows['markets'].append((market_id, f"Who will win {track.name}?", description, closes_at, 'open'))
+
+        for prior in sorted(candidates, key=lambda p: -p['probability']):
+            project_key = prior['url'] or prior['title']
+            yes_id = stable_id(hackathon_url, track.name, project_key, 'Yes')
+            no_id = stable_id(hackathon_url, track.name, project_key, 'No')
+            price = yes_price(prior['probability'])
+            rows['outcomes'].append((yes_id, market_id, 'Yes', price, price, None))
+            rows['outcomes'].append((no_id, market_id, 'No', no_price(price), no_price(price), None))
+            rows['options'].append((stable_id(hackathon_url, track.name, project_key), market_id,
+                                    f"{prior['title'] or prior['url']} Wins", yes_id, no_id))
+    return rows
+
+class MarketLoader:
+    """Writes planned market rows in one transaction of multi-row inserts.
+
+    Rows whose id already exists are skipped (ON CONFLICT DO NOTHING), so
+    re-running a load only adds the markets and options that are new, and
+    never resets the prices of markets that are already trading. Works
+    with a sqlite3 connection (? placeholders) or a Postgres one from
+    psycopg or psycopg2 (%s placeholders).
+    """
+
+    def __init__(self, db, batch_size=BATCH_SIZE):
+        self.db = db
+        self.batch_size = batch_size
+        self.placeholder = '?' if isinstance(db, sqlite3.Connection) else '%s'
+
+    def _insert(self, cursor, table, rows):
+        columns = COLUMNS[table]
+        row_sql = f"({', '.join([self.placeholder] * len(columns))})"
+        inserted = 0
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            cursor.execute(
+                f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([row_sql] * len(batch))} "
+                f"ON CONFLICT ({KEYS[table]}) DO NOTHING",
+                [value for row in batch for value in row])
+            inserted += cursor.rowcount
+        return inserted
+
+    def load(self, rows):
+        """Insert the rows; returns {table: rows actually inserted}"""
+        cursor = self.db.cursor()
+        try:
+            inserted = {table: self._insert(cursor, table, rows[table]) for table in COLUMNS}
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            cursor.close()
+        return inserted
+
+def connect(target):
+    """A SQLite stand-in for *.sqlite / *.db paths (schema created if
+    needed), else a Postgres connection string"""
+    if target.endswith(('.sqlite', '.db')) or target == ':memory:':
+        db = sqlite3.connect(target)
+        db.execute("PRAGMA foreign_keys = ON")
+        db.executescript(SQLITE_SCHEMA)
+        return db
+    try:
+        import psycopg
+    except ImportError:
+        try:
+            import psycopg2 as psycopg
+        except ImportError:
+            raise RuntimeError("Loading into Postgres needs psycopg or psycopg2 installed")
+    return psycopg.connect(target)
+
+def load_matches(tracks, path=CHECKPOINT_PATH):
+    """{track name: [project urls]} from the matcher's checkpoint log.
+
+    Prizes are compared to the track names ignoring case and spacing;
+    matches to anything else (prizes.json names, "None") are dropped.
+    """
+    names = {_name(track.name): track.name for track in tracks}
+    by_track = {}
+    for link, prize in load_checkpoint(path).items():
+        if _name(prize) in names:
+            by_track.setdefault(names[_name(prize)], []).append(canonicalize(link))
+    return by_track
+
+def launch_hackathon(db, tracks, projects, hackathon_url=None, matches=None, closes_at=None,
+                     batch_size=BATCH_SIZE):
+    """Price and load a market per track for one hackathon.
+
+    Only the hackathon's projects are listed (see features.for_hackathon).
+    With matches ({track name: project urls}, see load_matches) covering
+    at least MIN_MATCHED_SHARE of them, each track's market lists the
+    projects matched to it; otherwise every market lists every project,
+    with a warning if matches were given. Returns (planned rows, inserted
+    counts).
+    """
+    hackathon_url = hackathon_url or (tracks[0].hackathon if tracks else '')
+    closes_at = closes_at or (datetime.datetime.now(datetime.timezone.utc)
+                              + datetime.timedelta(days=OPEN_DAYS)).isoformat()
+    projects = for_hackathon(projects, hackathon_url)
+    names = {track.name for track in tracks}
+    urls = {canonicalize(project.url): project.url for project in projects if project.url}
+    submissions = {}
+    for track, matched_urls in (matches or {}).items():
+        if track not in names:
+            continue
+        for url in matched_urls:
+            url = canonicalize(url)
+            if url in urls:
+                submissions.setdefault(urls[url], []).append(track)
+    matched = len(submissions)
+    covered = {track for entered in submissions.values() for track in entered}
+
+    if matches is not None and matched and matched >= MIN_MATCHED_SHARE * len(projects):
+        unmatched = [track.name for track in tracks if track.name not in covered]
+        if unmatched:
+            print(f"Warning: no project was matched to {len(unmatched)} track(s), which get no market: "
+                  f"{', '.join(unmatched)}")
+        if matched < len(projects):
+            print(f"Warning: {len(projects) - matched} project(s) weren't matched to a track and are left out")
+        priors = seed_priors(projects, tracks, submissions)
+    else:
+        if matches is not None:
+            print(f"Warning: the matches cover {matched} of {len(projects)} projects and "
+                  f"{len(covered)} of {len(tracks)} tracks; listing every project in every market instead")
+        # The matches still fill in the track columns
+        for url, entered in corpus_submissions(projects, tracks).items():
+            submissions[url] = list(dict.fromkeys(submissions.get(url, []) + entered))
+        priors = seed_priors(projects, tracks, submissions, limit_to_submissions=False)
+    rows = plan_markets(hackathon_url.rstrip('/'), tracks, priors, closes_at)
+    return rows, MarketLoader(db, batch_size).load(rows)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create a market per track for a hackathon")
+    parser.add_argument('database',
+                        help="Postgres connection string, or a .sqlite/.db file to use as a stand-in")
+    parser.add_argument('--tracks', default=TRACKS_PATH, help="Scraper tracks.json")
+    parser.add_argument('--projects', nargs='+', default=CORPUS_PATHS,
+                        help="Scraper outputs to merge into the corpus (JSON or JSONL)")
+    parser.add_argument('--matches', default=CHECKPOINT_PATH,
+                        help="Matcher checkpoint log; without it every project is listed in every market")
+    parser.add_argument('--hackathon', help="Hackathon URL (default: the one in tracks.json)")
+    parser.add_argument('--closes-at', help=f"When the markets close (default: {OPEN_DAYS} days from now)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    tracks = load_tracks(args.tracks)
+    projects = load_corpus(args.projects)
+    matches = load_matches(tracks, args.matches) if os.path.exists(args.matches) else None
+    db = connect(args.database)
+    try:
+        rows, inserted = launch_hackathon(db, tracks, projects, args.hackathon, matches, args.closes_at)
+    finally:
+        db.close()
+    for table in COLUMNS:
+        print(f"{table}: {inserted[table]} created, {len(rows[table]) - inserted[table]} already there")
+    print(f"Done in {time.perf_counter() - start:.2f}s")
@@ -1,73 +1,343 @@
+import argparse
+import asyncio
+import hashlib
 import json
 import openai
 import os
-from time import sleep
+import time
 from dotenv import load_dotenv
+from ai.project_data import DATA_DIR
+from ai.project_data.llm_cache import ResponseCache
+from ai.project_data.prize_retrieval import PrizeIndex, load_prizes, shortlist
+from ai.scraper import host_control
+from ai.scraper.records import Project
 
 # Load environment variables from .env file
 load_dotenv()
 
-def load_data():
-    with open("projects_data.json", "r", encoding='utf-8') as f:
-        projects = json.load(f)
-    with open("prizes.json", "r", encoding='utf-8') as f:
+MODEL = "gpt-4o-mini"
+TEMPERATURE = 0.3
+CHECKPOINT_PATH = os.path.join(DATA_DIR, "matches.jsonl")
+PROJECTS_PATH = os.path.join(DATA_DIR, "projects_data.json")
+PRIZES_PATH = os.path.join(DATA_DIR, "prizes.json")
+
+def open_store(db_path):
+    from ai.scraper.project_store import ProjectStore
+    return ProjectStore(db_path)
+
+def load_data(store=None, hackathon=None):
+    """Projects (as records) and prizes to match them against"""
+    if store is not None:
+        projects = []
+        for row in store.find_projects(hackathon=hackathon):
+            full = Project.from_dict(row)
+            projects.append(Project(url=full.url, title=full.title or '', text=full.full_text()))
+    else:
+        with open(PROJECTS_PATH, "r", encoding='utf-8') as f:
+            projects = [Project.from_dict(p) for p in json.load(f)]
+    with open(PRIZES_PATH, "r", encoding='utf-8') as f:
         prizes = json.load(f)
     return projects, prizes
 
-def get_matching_prize(project_text, prizes, client):
-    prompt = f"""
+class TokenBucket:
+    """Async token bucket allowing `rate` requests per second on average,
+    with bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+def retry_delay(error, attempt, base=1.0, cap=60.0):
+    """The scraper's backoff (host_control.retry_delay) for an OpenAI error,
+    honoring its Retry-After up to cap"""
+    response = getattr(error, 'response', None)
+    retry_after = response.headers.get('retry-after') if response is not None else None
+    return host_control.retry_delay(attempt, retry_after, base, cap)
+
+async def complete(client, prompt, limiter, max_tokens=200, max_retries=5):
+    """Send one chat completion, retrying rate limits and server errors"""
+    for attempt in range(max_retries + 1):
+        await limiter.acquire()
+        try:
+            response = await client.chat.completions.create(
+                model=MODEL,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=TEMPERATURE,
+                max_tokens=max_tokens
+            )
+            return response.choices[0].message.content.strip()
+        except (openai.RateLimitError, openai.InternalServerError,
+                openai.APIConnectionError) as e:
+            if attempt == max_retries:
+                print(f"OpenAI API error, giving up: {e}")
+                return None
+            delay = retry_delay(e, attempt)
+            print(f"OpenAI API error ({type(e).__name__}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        except Exception as e:
+            print(f"OpenAI API error: {e}")
+            return None
+
+def build_prompt(project_text, prizes):
+    return f"""
 Given this project description:
 "{project_text}"
 
 And these prizes:
 {prizes}
 
-Which prize (if any) does this project best qualify for? Return ONLY the exact prize text that matches best, or "None" if no prizes match well. 
+Which prize (if any) does this project best qualify for? Return ONLY the exact prize text that matches best, or "None" if no prizes match well.
 Consider the project's features and goals when matching to prize criteria.
 """
-    
+
+def build_batch_prompt(project_texts, prizes):
+    numbered = "\n\n".join(f'Project {i + 1}:\n"{text}"' for i, text in enumerate(project_texts))
+    return f"""
+Given these project descriptions:
+{numbered}
+
+And these prizes:
+{prizes}
+
+For each project, which prize (if any) does it best qualify for? Return ONLY a JSON array with one entry per project, in order, each being the exact prize text that matches best or "None" if no prizes match well.
+Consider each project's features and goals when matching to prize criteria.
+"""
+
+# Both templates go into every cache key: an answer may have come from a
+# batch prompt, so a change to either one makes cached answers stale
+PROMPT_TEMPLATES = build_prompt('{project}', '{prizes}') + build_batch_prompt(['{project}'], '{prizes}')
+
+def parse_batch_response(content, count):
+    """Pull the list of prizes out of a batch answer, or None if malformed"""
+    if not content:
+        return None
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
-            temperature=0.3,
-            max_tokens=200
-        )
-        return response.choices[0].message.content.strip()
-    except Exception as e:
-        print(f"OpenAI API error: {e}")
+        answers = json.loads(content[content.index('['):content.rindex(']') + 1])
+    except ValueError:
         return None
+    if not isinstance(answers, list) or len(answers) != count:
+        return None
+    return [str(a).strip() for a in answers]
+
+def project_text(project):
+    # Combine title and text for better context
+    return f"{project.title}. {project.text}"
+
+async def get_matching_prize(project_text, prizes, client, limiter):
+    return await complete(client, build_prompt(project_text, prizes), limiter)
+
+async def get_matching_prizes(project_texts, prizes, client, limiter, cache=None):
+    """Match several projects with one prompt, falling back to one prompt
+    per project if the answer can't be parsed. Projects whose answer is
+    already in the cache are not sent at all."""
+    answers = [None] * len(project_texts)
+    if cache is not None:
+        keys = [ResponseCache.key(MODEL, TEMPERATURE, build_prompt(text, prizes), PROMPT_TEMPLATES)
+                for text in project_texts]
+        answers = [cache.get(key) for key in keys]
+    missing = [i for i, answer in enumerate(answers) if answer is None]
+    if not missing:
+        return answers
+
+    texts = [project_texts[i] for i in missing]
+    if len(texts) == 1:
+        fresh = [await get_matching_prize(texts[0], prizes, client, limiter)]
+    else:
+        content = await complete(client, build_batch_prompt(texts, prizes), limiter,
+                                 max_tokens=200 * len(texts))
+        fresh = parse_batch_response(content, len(texts))
+        if fresh is None:
+            print(f"Could not parse batch answer for {len(texts)} projects, matching one by one")
+            fresh = await asyncio.gather(*[get_matching_prize(text, prizes, client, limiter)
+                                           for text in texts])
+
+    for i, answer in zip(missing, fresh):
+        answers[i] = answer
+        if cache is not None and answer is not None:
+            cache.set(keys[i], answer)
+    return answers
+
+def checkpoint_key(prizes, top_k=None, descriptions=None):
+    """Hash of everything a match depends on besides the project: the
+    prizes offered, the shortlist size, the model and the prompt templates.
+    Checkpoint lines carry it, so changing any of these re-matches."""
+    payload = json.dumps([MODEL, TEMPERATURE, PROMPT_TEMPLATES, list(prizes), descriptions, top_k],
+                         ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def load_checkpoint(path=CHECKPOINT_PATH, key=None):
+    """Matches recorded by earlier runs, keyed by project link. With key
+    (see checkpoint_key), only those recorded against the same prizes and
+    prompts."""
+    matches = {}
+    if not os.path.exists(path):
+        return matches
+    with open(path, "r", encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if key is not None and record.get('key') != key:
+                continue
+            matches[record['link']] = record['matched_prize']
+    return matches
+
+async def match_projects(projects, prizes, client, concurrency=8, rate=5.0,
+                         batch_size=1, checkpoint_path=CHECKPOINT_PATH,
+                         top_k=None, descriptions=None, cache=None):
+    """Match every project not already in the checkpoint log for these
+    prizes, top_k and prompts.
+
+    With top_k set, a local TF-IDF pass resolves obvious matches without
+    the LLM and only sends each remaining project its top_k prizes.
+    descriptions (parallel to prizes) give the retrieval richer text.
+    Answers are looked up in and saved to cache, a ResponseCache, if given.
+    Batches of batch_size projects are sent concurrently (at most
+    `concurrency` in flight, `rate` requests/second) and each result is
+    appended to the checkpoint log as soon as it arrives. Returns all
+    matches, including ones from earlier runs.
+    """
+    key = checkpoint_key(prizes, top_k, descriptions)
+    matches = load_checkpoint(checkpoint_path, key)
+    pending = [p for p in projects if p.url not in matches]
+    print(f"{len(matches)} projects already matched, {len(pending)} to go")
+
+    log = open(checkpoint_path, "a", encoding='utf-8')
+    done = 0
+
+    def record(project, matched_prize):
+        nonlocal done
+        done += 1
+        print(f"[{done}/{len(pending)}] {project.title}: {matched_prize}")
+        if matched_prize is None:
+            return
+        matches[project.url] = matched_prize
+        log.write(json.dumps({'link': project.url, 'matched_prize': matched_prize, 'key': key},
+                             ensure_ascii=False) + '\n')
+
+    # Shortlist prizes locally, resolving the obvious matches outright
+    candidates = {}
+    if top_k and pending:
+        texts = [project_text(p) for p in pending]
+        index = PrizeIndex(prizes, descriptions, texts)
+        unresolved = []
+        for project, (resolved, shortlisted) in zip(pending, shortlist(index, texts, top_k)):
+            if resolved is not None:
+                record(project, resolved)
+            else:
+                candidates[project.url] = shortlisted
+                unresolved.append(project)
+        print(f"Resolved {len(pending) - len(unresolved)} projects locally")
+        log.flush()
+    else:
+        unresolved = pending
+
+    limiter = TokenBucket(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    batches = [unresolved[i:i + batch_size] for i in range(0, len(unresolved), batch_size)]
+
+    async def run_batch(batch):
+        # A batch is offered the union of its projects' shortlists
+        batch_prizes = prizes
+        if candidates:
+            batch_prizes = list(dict.fromkeys(c for p in batch for c in candidates[p.url]))
+        async with semaphore:
+            answers = await get_matching_prizes([project_text(p) for p in batch], batch_prizes,
+                                                client, limiter, cache)
+            return batch, answers
+
+    try:
+        for future in asyncio.as_completed([run_batch(b) for b in batches]):
+            batch, answers = await future
+            for project, matched_prize in zip(batch, answers):
+                record(project, matched_prize)
+            log.flush()
+    finally:
+        log.close()
+
+    return matches
+
+def projects_data_record(project):
+    """A project as a projects_data.json entry: every field it was read
+    with, its URL back under the file's 'link' key"""
+    record = project.to_dict()
+    if 'link' in record:
+        return record
+    return {('link' if key == 'url' else key): value for key, value in record.items()}
+
+def match_projects_to_prizes(concurrency=8, rate=5.0, batch_size=1, top_k=5, tracks_path=None,
+                             db_path=None, hackathon=None):
+    # Initialize OpenAI client; retries are handled by complete()
+    client = openai.AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'),
+                                base_url=os.getenv('OPENAI_BASE_URL'),
+                                max_retries=0)
 
-def match_projects_to_prizes():
-    # Initialize OpenAI client
-    client = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
-    
     # Load data
-    projects, prizes = load_data()
-    
-    # Process each project
-    for i, project in enumerate(projects):
-        print(f"\nProcessing project {i+1}/{len(projects)}: {project['title']}")
-        
-        # Combine title and text for better context
-        project_text = f"{project['title']}. {project['text']}"
-        
-        # Get matching prize
-        matched_prize = get_matching_prize(project_text, prizes, client)
-
-        print(f"Matched prize: {matched_prize}")
-        
-        # Add matched prize to project data
-        project['matched_prize'] = matched_prize
-        
-        # Save after each project in case of interruption
-        with open("projects_data.json", "w", encoding='utf-8') as f:
-            json.dump(projects, f, indent=2, ensure_ascii=False)
-        
-        # Rate limiting
-        sleep(1)
-    
+    store = open_store(db_path) if db_path else None
+    projects, prizes = load_data(store, hackathon)
+    descriptions = None
+    if tracks_path:
+        prizes, descriptions = load_prizes(tracks_path=tracks_path)
+
+    cache = ResponseCache()
+    try:
+        matches = asyncio.run(match_projects(projects, prizes, client, concurrency, rate, batch_size,
+                                             top_k=top_k, descriptions=descriptions, cache=cache))
+        evicted = cache.evict()
+        print(f"Response cache: {cache.stats()}, {evicted} evicted")
+    finally:
+        cache.close()
+
+    # Write the matches back in one go; the checkpoint may also hold
+    # matches for projects of other runs, which are left alone
+    if store is not None:
+        for project in projects:
+            if project.url in matches:
+                store.record_match(project.url, matches[project.url])
+        store.close()
+        print("\nMatching complete! Updated the project store")
+        return
+
+    records = []
+    for project in projects:
+        project.matched_prize = matches.get(project.url, project.matched_prize)
+        records.append(projects_data_record(project))
+    with open(PROJECTS_PATH, "w", encoding='utf-8') as f:
+        json.dump(records, f, indent=2, ensure_ascii=False)
+
     print("\nMatching complete! Updated projects_data.json")
 
 if __name__ == "__main__":
-    match_projects_to_prizes()
+    parser = argparse.ArgumentParser(description="Match projects to prizes")
+    parser.add_argument('--concurrency', type=int, default=8,
+                        help="Requests in flight at once")
+    parser.add_argument('--rate', type=float, default=5.0,
+                        help="Requests per second")
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help="Projects packed into each prompt")
+    parser.add_argument('--top-k', type=int, default=5,
+                        help="Prizes shortlisted locally per project (0 sends every prize)")
+    parser.add_argument('--tracks',
+                        help="Scraper tracks.json to match against instead of prizes.json")
+    parser.add_argument('--db',
+                        help="Read projects from (and record matches in) this project store")
+    parser.add_argument('--hackathon',
+                        help="With --db, only match this hackathon's projects")
+    args = parser.parse_args()
+    match_projects_to_prizes(args.concurrency, args.rate, args.batch_size, args.top_k, args.tracks,
+                             args.db, args.hackathon)
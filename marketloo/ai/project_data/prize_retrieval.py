@@ -0,0 +1,105 @@
+import json
+import os
+import re
+import numpy as np
+from ai.project_data import DATA_DIR
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'best', 'by', 'for', 'from', 'in', 'is',
+    'it', 'of', 'on', 'or', 'our', 'that', 'the', 'this', 'to', 'we', 'with', 'you', 'your'
+}
+
+def tokenize(text):
+    return [t for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS and len(t) > 1]
+
+def load_prizes(prizes_path=os.path.join(DATA_DIR, "prizes.json"), tracks_path=None):
+    """Return (prize texts, descriptions to match against).
+
+    prizes.json is a plain list of prize strings. A scraper tracks.json gives
+    each track a name and a longer description, which matches much better.
+    """
+    if tracks_path:
+        with open(tracks_path, "r", encoding='utf-8') as f:
+            tracks = json.load(f)['tracks']
+        return ([t['name'] for t in tracks],
+                [f"{t['name']}. {t.get('description', '')}" for t in tracks])
+    with open(prizes_path, "r", encoding='utf-8') as f:
+        prizes = json.load(f)
+    return prizes, prizes
+
+class PrizeIndex:
+    """TF-IDF index over prize descriptions.
+
+    IDF is fitted on prizes and projects together so words every project
+    uses ("app", "built") carry little weight. Scoring a whole batch of
+    projects is a single matrix product.
+    """
+
+    def __init__(self, prizes, descriptions=None, corpus=()):
+        self.prizes = list(prizes)
+        descriptions = list(descriptions or prizes)
+        docs = [tokenize(d) for d in descriptions] + [tokenize(t) for t in corpus]
+
+        self.vocab = {}
+        for tokens in docs:
+            for token in tokens:
+                self.vocab.setdefault(token, len(self.vocab))
+        df = np.zeros(len(self.vocab))
+        for tokens in docs:
+            df[[self.vocab[t] for t in set(tokens)]] += 1
+        self.idf = np.log((1 + len(docs)) / (1 + df)) + 1
+        self.matrix = self.vectorize(descriptions)
+
+    def vectorize(self, texts):
+        """L2-normalized TF-IDF rows, one per text"""
+        matrix = np.zeros((len(texts), len(self.vocab)))
+        for row, text in enumerate(texts):
+            for token in tokenize(text):
+                column = self.vocab.get(token)
+                if column is not None:
+                    matrix[row, column] += 1
+        matrix *= self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def scores(self, texts):
+        """Cosine similarity of every text against every prize"""
+        return self.vectorize(texts) @ self.matrix.T
+
+    def top_k(self, texts, k=5, chunk_size=512):
+        """(indices, scores) of the k best prizes per text, best first.
+
+        Texts are scored chunk_size at a time to bound the dense matrix.
+        """
+        k = min(k, len(self.prizes))
+        tops, top_scores = [], []
+        for start in range(0, len(texts), chunk_size):
+            scores = self.scores(texts[start:start + chunk_size])
+            top = np.argsort(-scores, axis=1)[:, :k]
+            tops.append(top)
+            top_scores.append(np.take_along_axis(scores, top, axis=1))
+        if not tops:
+            return np.zeros((0, k), dtype=int), np.zeros((0, k))
+        return np.vstack(tops), np.vstack(top_scores)
+
+def shortlist(index, texts, k=5, resolve_score=0.35, resolve_margin=0.15):
+    """Shortlist prizes for each text.
+
+    Returns one (resolved prize or None, candidate prizes) pair per text. A
+    text is resolved locally when its best prize scores at least
+    resolve_score and beats the runner-up by resolve_margin; otherwise the
+    candidates still need the LLM to decide. With no prizes to choose
+    from, nothing is resolved and nothing is shortlisted.
+    """
+    if not index.prizes:
+        return [(None, []) for _ in texts]
+    top, scores = index.top_k(texts, max(k, 2))
+    results = []
+    for row, row_scores in zip(top, scores):
+        runner_up = row_scores[1] if len(row_scores) > 1 else 0
+        if row_scores[0] >= resolve_score and row_scores[0] - runner_up >= resolve_margin:
+            results.append((index.prizes[row[0]], [index.prizes[row[0]]]))
+        else:
+            results.append((None, [index.prizes[i] for i in row[:k]]))
+    return results
@@ -1,69 +1,89 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from ai.project_data import DATA_DIR
+from ai.project_data.driver_pool import DriverPool, wait_for
+from ai.project_data.static_fetch import HybridFetcher
+import argparse
 import json
+import os
 
-def scrape_project_content(url):
-    driver = None
-    try:
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-        
-        driver.get(url)
-        driver.implicitly_wait(5)
-        
-        # Get the title
-        title = driver.find_element(By.ID, "app-title").text.strip()
-        
-        # Get the content
-        content_div = driver.find_element(By.CSS_SELECTOR, ".large-9.columns > div:nth-child(2)")
-        
-        all_text = ""
-        elements = content_div.find_elements(By.CSS_SELECTOR, "h1, h2, h3, p")
-        
-        for element in elements:
-            text = element.text.strip()
-            if text:
-                all_text += f" {text}"
-        
-        return {
-            "title": title,
-            "link": url,
-            "text": all_text.strip()
-        }
-        
-    except Exception as e:
-        print(f"Error scraping {url}: {e}")
+CONTENT_SELECTOR = ".large-9.columns > div:nth-child(2)"
+
+def parse_project_content(soup, url):
+    """scrape_project_content from server-rendered HTML, or None if the
+    page doesn't have the title and content"""
+    title = soup.select_one("#app-title")
+    content_div = soup.select_one(CONTENT_SELECTOR)
+    if title is None or content_div is None:
         return None
-    finally:
-        if driver:
-            driver.quit()
+    
+    all_text = ""
+    for element in content_div.select("h1, h2, h3, p"):
+        # Collapse whitespace the way the browser's rendered text does
+        text = " ".join(element.get_text(" ").split())
+        if text:
+            all_text += f" {text}"
+    
+    print(f"Scraped {url}")
+    return {
+        "title": title.get_text(strip=True),
+        "link": url,
+        "text": all_text.strip()
+    }
+
+def scrape_project_content(driver, url):
+    driver.get(url)
+    
+    # Get the title
+    title = wait_for(driver, "#app-title").text.strip()
+    
+    # Get the content
+    content_div = driver.find_element(By.CSS_SELECTOR, CONTENT_SELECTOR)
+    
+    all_text = ""
+    elements = content_div.find_elements(By.CSS_SELECTOR, "h1, h2, h3, p")
+    
+    for element in elements:
+        text = element.text.strip()
+        if text:
+            all_text += f" {text}"
+    
+    print(f"Scraped {url}")
+    return {
+        "title": title,
+        "link": url,
+        "text": all_text.strip()
+    }
 
-def process_all_links():
+def process_all_links(pool_size=4, threads=16):
     # Read links from file
     try:
-        with open("links.json", "r") as f:
+        with open(os.path.join(DATA_DIR, "links.json"), "r") as f:
             links = json.load(f)
     except Exception as e:
         print(f"Error reading links.json: {e}")
         return
 
-    # Process each link
-    projects_data = []
-    for i, link in enumerate(links, 1):
-        print(f"Processing {i}/{len(links)}: {link}")
-        project_data = scrape_project_content(link)
-        if project_data:
-            projects_data.append(project_data)
+    # Read each page's HTML directly, starting browsers from the pool only
+    # for pages that need one
+    print(f"Processing {len(links)} links ({threads} fetches, up to {pool_size} browsers)")
+    with DriverPool(pool_size) as pool:
+        fetcher = HybridFetcher(pool)
+        results = fetcher.map(links, parse_project_content, scrape_project_content, threads)
+    projects_data = [project_data for project_data in results if project_data]
+    fetcher.write_log()
+    print(f"Fetch paths: {fetcher.summary()}")
 
     # Save results
-    with open("projects_data.json", "w", encoding='utf-8') as f:
+    with open(os.path.join(DATA_DIR, "projects_data.json"), "w", encoding='utf-8') as f:
         json.dump(projects_data, f, indent=2, ensure_ascii=False)
     
     print(f"\nProcessed {len(projects_data)} projects successfully")
 
 if __name__ == "__main__":
-    process_all_links()
+    parser = argparse.ArgumentParser(description="Scrape project pages")
+    parser.add_argument('--browsers', type=int, default=4,
+                        help="Headless browsers to run at once, for pages that need one")
+    parser.add_argument('--threads', type=int, default=16,
+                        help="Plain HTTP fetches to run at once")
+    args = parser.parse_args()
+    process_all_links(args.browsers, args.threads)
@@ -1,57 +1,91 @@
 import json
-from selenium import webdriver
+import os
+import re
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from ai.project_data import DATA_DIR
+from ai.project_data.driver_pool import DriverPool
 
-def scrape_links(base_url):
-    driver = None
-    try:
-        # Set up Selenium WebDriver with Chrome
-        chrome_options = Options()
-        chrome_options.add_argument("--headless")  # Run in headless mode for performance
-        chrome_options.add_argument("--disable-gpu")
-        chrome_options.add_argument("--no-sandbox")
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-
-        all_links = []
-        page = 1
-        
-        while True:
-            url = f"{base_url}?page={page}"
-            try:
-                driver.get(url)
-                a_tags = driver.find_elements(By.CLASS_NAME, "link-to-software")
-                
-                # If no links found, we've reached the end
-                if not a_tags:
-                    break
-                    
-                page_links = [a.get_attribute("href") for a in a_tags if a.get_attribute("href")]
-                all_links.extend(page_links)
-                print(f"Page {page}: Found {len(page_links)} links")
-                
-                page += 1
-                
-            except Exception as e:
-                print(f"Error on page {page}: {e}")
+def page_links(driver, url):
+    """Project links on one gallery page"""
+    driver.get(url)
+    a_tags = driver.find_elements(By.CLASS_NAME, "link-to-software")
+    return [a.get_attribute("href") for a in a_tags if a.get_attribute("href")]
+
+def page_count(driver):
+    """Number of gallery pages according to the pagination on the loaded
+    page, or None if there is no pagination"""
+    pages = []
+    for a in driver.find_elements(By.CSS_SELECTOR, ".pagination a"):
+        match = re.search(r'[?&]page=(\d+)', a.get_attribute("href") or "")
+        if match:
+            pages.append(int(match.group(1)))
+    return max(pages) if pages else None
+
+def first_page(driver, base_url):
+    links = page_links(driver, f"{base_url}?page=1")
+    return links, page_count(driver)
+
+def collect_links(driver, base_url, page=1):
+    """Walk gallery pages one at a time from `page` until an empty one"""
+    all_links = []
+
+    while True:
+        url = f"{base_url}?page={page}"
+        try:
+            page_links_found = page_links(driver, url)
+
+            # If no links found, we've reached the end
+            if not page_links_found:
                 break
 
+            all_links.extend(page_links_found)
+            print(f"Page {page}: Found {len(page_links_found)} links")
+
+            page += 1
+
+        except Exception as e:
+            print(f"Error on page {page}: {e}")
+            break
+
+    return all_links
+
+def collect_links_parallel(pool, base_url):
+    """Read the page count from page 1 and load the other pages across the
+    pool. Falls back to collect_links when the gallery has no pagination."""
+    all_links, count = pool.run(first_page, base_url)
+    if not all_links:
+        return []
+    print(f"Page 1: Found {len(all_links)} links")
+    if not count:
+        return all_links + pool.run(collect_links, base_url, 2)
+
+    urls = [f"{base_url}?page={page}" for page in range(2, count + 1)]
+    for page, links in enumerate(pool.map(page_links, urls), start=2):
+        print(f"Page {page}: Found {len(links or [])} links")
+        all_links.extend(links or [])
+    # The count is only a hint, so check for pages past it
+    return all_links + pool.run(collect_links, base_url, count + 1)
+
+def scrape_links(base_url, pool=None):
+    # Borrow browsers from the shared pool, or start a one-off pool
+    own_pool = pool is None
+    pool = pool or DriverPool(size=4)
+    try:
+        all_links = collect_links_parallel(pool, base_url)
+
         # Save all collected links
-        with open("links.json", "w") as json_file:
+        with open(os.path.join(DATA_DIR, "links.json"), "w") as json_file:
             json.dump(all_links, json_file, indent=4)
 
         print(f"Total scraped: {len(all_links)} links. Saved to 'links.json'.")
-        
+
     except Exception as e:
         print(f"Error: {e}")
     finally:
-        # Quit the WebDriver
-        if driver:
-            driver.quit()
+        if own_pool:
+            pool.close()
 
 # Example usage
 if __name__ == "__main__":
     base_url = "https://hackthenorth2024.devpost.com/project-gallery"
-    scrape_links(base_url)
\ No newline at end of file
+    scrape_links(base_url)
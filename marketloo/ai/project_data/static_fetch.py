@@ -0,0 +1,93 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import threading
+import time
+import requests
+from ai.project_data import DATA_DIR
+from ai.scraper.html_backend import make_soup
+
+FETCH_TIMEOUT = 10
+FETCH_LOG_PATH = os.path.join(DATA_DIR, "fetch_paths.jsonl")
+
+class HybridFetcher:
+    """Scrape pages with a plain HTTP fetch, falling back to a browser.
+
+    Devpost renders project and prize pages on the server, so most pages
+    can be read straight from the HTML. parse(soup, url) returns the
+    scraped result, or None when the selectors it needs aren't in the
+    HTML; only then is the page loaded with browse(driver, url) on a
+    browser from the pool. Every page records which path it took and how
+    long it took.
+    """
+
+    def __init__(self, pool=None, timeout=FETCH_TIMEOUT):
+        self.pool = pool
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['User-Agent'] = "Mozilla/5.0 (compatible; marketloo-scraper)"
+        self.records = []
+        self.lock = threading.Lock()
+
+    def _record(self, url, path, start, reason=None):
+        record = {'url': url, 'path': path, 'ms': round((time.perf_counter() - start) * 1000, 1)}
+        if reason:
+            record['reason'] = reason
+        with self.lock:
+            self.records.append(record)
+
+    def scrape(self, url, parse, browse):
+        start = time.perf_counter()
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            if response.status_code == 200:
+                result = parse(make_soup(response.text), url)
+                if result is not None:
+                    self._record(url, 'static', start)
+                    return result
+                reason = 'selectors missing'
+            else:
+                reason = f"status {response.status_code}"
+        except requests.RequestException as e:
+            reason = str(e)
+
+        if self.pool is None:
+            print(f"Static fetch of {url} failed ({reason}) and no browser pool was given")
+            self._record(url, 'failed', start, reason)
+            return None
+        result = self.pool.run(browse, url)
+        self._record(url, 'browser', start, reason)
+        return result
+
+    def map(self, urls, parse, browse, threads=16):
+        """scrape() every URL, returning results in input order. URLs that
+        fail both ways give None."""
+        def call(url):
+            start = time.perf_counter()
+            try:
+                return self.scrape(url, parse, browse)
+            except Exception as e:
+                print(f"Error scraping {url}: {e}")
+                self._record(url, 'failed', start, str(e))
+                return None
+
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            return list(executor.map(call, urls))
+
+    def counts(self):
+        counts = {}
+        for record in self.records:
+            counts[record['path']] = counts.get(record['path'], 0) + 1
+        return counts
+
+    def summary(self):
+        parts = []
+        for path, count in sorted(self.counts().items()):
+            ms = sorted(r['ms'] for r in self.records if r['path'] == path)
+            parts.append(f"{count} {path} (median {ms[len(ms) // 2]}ms)")
+        return ', '.join(parts)
+
+    def write_log(self, path=FETCH_LOG_PATH):
+        with open(path, 'w', encoding='utf-8') as f:
+            for record in self.records:
+                f.write(json.dumps(record) + '\n')
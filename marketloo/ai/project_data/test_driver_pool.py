@@ -0,0 +1,132 @@
+import threading
+import time
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from ai.project_data import driver_pool
+from ai.project_data.driver_pool import DriverPool
+
+class FakeDriver:
+    def __init__(self, number):
+        self.number = number
+        self.quit_called = False
+
+    def quit(self):
+        self.quit_called = True
+
+class FakeLauncher:
+    """Stands in for new_driver, numbering the browsers it starts and
+    failing the starts listed in fail_on"""
+
+    def __init__(self, fail_on=()):
+        self.fail_on = set(fail_on)
+        self.calls = 0
+        self.started = []
+
+    def __call__(self, page_timeout):
+        self.calls += 1
+        if self.calls in self.fail_on:
+            raise WebDriverException("chrome failed to start")
+        driver = FakeDriver(self.calls)
+        self.started.append(driver)
+        return driver
+
+def with_launcher(launcher, test):
+    original = driver_pool.new_driver
+    driver_pool.new_driver = launcher
+    try:
+        test()
+    finally:
+        driver_pool.new_driver = original
+
+def test_failed_start_frees_its_slot():
+    launcher = FakeLauncher(fail_on=[1])
+
+    def test():
+        pool = DriverPool(size=1)
+        try:
+            pool.run(lambda driver: driver)
+        except WebDriverException:
+            pass
+        else:
+            assert False, "expected the failed start to raise"
+        # The slot was handed back, so the next caller starts a browser
+        # instead of waiting for one forever
+        driver = pool.run(lambda driver: driver)
+        assert driver.number == 2 and pool.started == 1
+        assert pool.drivers == [driver]
+
+    with_launcher(launcher, test)
+
+def test_broken_browser_is_replaced():
+    launcher = FakeLauncher()
+
+    def fail_with(error):
+        def fn(driver):
+            raise error
+        return fn
+
+    def test():
+        pool = DriverPool(size=1)
+        first = pool.run(lambda driver: driver)
+        # A page timeout leaves the browser in the pool
+        try:
+            pool.run(fail_with(TimeoutException("slow page")))
+        except TimeoutException:
+            pass
+        assert pool.run(lambda driver: driver) is first and not first.quit_called
+
+        # Any other driver error gets it quit and a new one started
+        try:
+            pool.run(fail_with(WebDriverException("tab crashed")))
+        except WebDriverException:
+            pass
+        assert first.quit_called and pool.drivers == []
+        second = pool.run(lambda driver: driver)
+        assert second.number == 2 and pool.drivers == [second]
+
+        pool.close()
+        assert second.quit_called and pool.started == 0
+
+    with_launcher(launcher, test)
+
+def test_concurrency_never_exceeds_size():
+    launcher = FakeLauncher()
+    lock = threading.Lock()
+    active = set()
+    peak = 0
+
+    def visit(driver, item):
+        nonlocal peak
+        with lock:
+            assert driver not in active, "a browser was lent to two callers"
+            active.add(driver)
+            peak = max(peak, len(active))
+        time.sleep(0.01)
+        with lock:
+            active.discard(driver)
+        if item == 3:
+            raise WebDriverException("tab crashed")
+        return item
+
+    def test():
+        with DriverPool(size=3) as pool:
+            results = pool.map(visit, range(20))
+            # Three maps at once are nine threads for three browsers, so
+            # callers have to queue for them
+            threads = [threading.Thread(target=lambda: pool.map(visit, range(10))) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert pool.started <= 3 and len(pool.drivers) <= 3
+        assert results == [i if i != 3 else None for i in range(20)]
+        assert peak <= 3
+        # One browser per slot, plus a replacement per crash
+        assert len(launcher.started) <= 3 + 4
+
+    with_launcher(launcher, test)
+
+if __name__ == "__main__":
+    test_failed_start_frees_its_slot()
+    test_broken_browser_is_replaced()
+    test_concurrency_never_exceeds_size()
+    print("Driver pool tests passed")
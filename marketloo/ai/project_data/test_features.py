@@ -0,0 +1,111 @@
+import numpy as np
+from ai.project_data.features import (FeatureMatrix, corpus_submissions, for_hackathon, merge_corpus,
+                                      prior_probabilities, seed_priors)
+from ai.scraper.records import Project, Submission, Track
+
+TRACKS = [Track(name="Best AI hack", description="machine learning models and llm agents"),
+          Track(name="Best game", description="a fun playable game")]
+
+def make_projects():
+    return [
+        Project(url="https://devpost.com/software/a", title="Agent", likes=50, comments=10,
+                technologies=['python', 'openai'], sections={'Inspiration': 'llm agents and models'},
+                team_members=[]),
+        Project(url="https://devpost.com/software/b", title="Snake", likes=2, comments=0,
+                technologies=['python', 'pygame'], sections={'What it does': 'a playable snake game'}),
+        Project(url="https://devpost.com/software/c", title="Todo", likes=2, comments=1,
+                technologies=['react'], sections={'What it does': 'tracks todos'})
+    ]
+
+def test_feature_matrix():
+    features = FeatureMatrix(make_projects(), submissions={"https://devpost.com/software/b": ["Best game"]})
+    assert features.matrix.shape == (3, len(features.columns))
+    assert 'tech:python' in features.columns and 'tech:react' not in features.columns
+    assert features.matrix[:, features.index['tech:python']].tolist() == [1, 1, 0]
+    assert features.matrix[:, features.index['track:Best game']].tolist() == [0, 1, 0]
+    assert features.matrix[0, features.index['log_likes']] == np.log1p(50)
+
+def test_priors_sum_to_one_per_track():
+    features = FeatureMatrix(make_projects())
+    probabilities = prior_probabilities(features, TRACKS)
+    assert probabilities.shape == (3, 2)
+    assert np.allclose(probabilities.sum(axis=0), 1)
+    assert (probabilities > 0).all()
+    # Popular and on topic wins the AI track; the game does best on the game track
+    assert probabilities[:, 0].argmax() == 0
+    assert probabilities[1, 1] > probabilities[1, 0]
+
+def test_submissions_limit_eligibility():
+    submissions = {"https://devpost.com/software/b": ["Best game"],
+                   "https://devpost.com/software/c": ["Best game", "Best AI hack"]}
+    priors = seed_priors(make_projects(), TRACKS, submissions)
+    pairs = {(p['title'], p['track']) for p in priors}
+    assert pairs == {("Snake", "Best game"), ("Todo", "Best game"), ("Todo", "Best AI hack")}
+    assert [p['probability'] for p in priors if p['track'] == "Best AI hack"] == [1.0]
+
+def test_merge_corpus():
+    with_urls = [Project.from_dict({'title': 'Agent', 'url': 'https://devpost.com/software/a/'})]
+    parsed = [Project.from_dict({'title': 'Agent', 'technologies': ['python']})]
+    listed = [Project.from_dict({'name': 'Agent', 'likes': 3,
+                                 'url': 'https://devpost.comhttps://devpost.com/software/a'})]
+    merged = merge_corpus(with_urls, parsed, listed)
+    assert len(merged) == 1
+    assert merged[0].url == 'https://devpost.com/software/a'
+    assert merged[0].technologies == ['python'] and merged[0].likes == 3
+
+def test_same_title_different_urls_stay_apart():
+    first = [Project(url='https://devpost.com/software/todo-app', title='Todo App', likes=5)]
+    second = [Project(url='https://devpost.com/software/todo-app-2', title='Todo App', likes=9)]
+    parsed = [Project(title='Todo App', technologies=['react'])]
+    merged = merge_corpus(first, second, parsed)
+    assert [(p.url, p.likes) for p in merged] == [('https://devpost.com/software/todo-app', 5),
+                                                  ('https://devpost.com/software/todo-app-2', 9)]
+    # A record without a URL still joins one by title, whichever comes first
+    merged = merge_corpus([Project(title='Todo App', technologies=['react'])], first)
+    assert len(merged) == 1 and merged[0].url == 'https://devpost.com/software/todo-app'
+    assert merged[0].technologies == ['react'] and merged[0].likes == 5
+
+HACKATHON = "https://brainrot.devpost.com/"
+
+def submitted(hackathon_url, *won):
+    return [Submission(hackathon='h', hackathon_url=hackathon_url, won=list(won))]
+
+def test_for_hackathon():
+    projects = [
+        Project(url="https://devpost.com/software/here", prizes=submitted("https://brainrot.devpost.com")),
+        Project(url="https://devpost.com/software/stored", hackathon="https://brainrot.devpost.com"),
+        Project(url="https://devpost.com/software/both", prizes=submitted("https://other.devpost.com/")
+                + submitted(HACKATHON)),
+        Project(url="https://devpost.com/software/unknown"),
+        Project(url="https://devpost.com/software/elsewhere", prizes=submitted("https://other.devpost.com/")),
+        Project(url="https://devpost.com/software/stored-elsewhere", hackathon="https://other.devpost.com")
+    ]
+    kept = [p.url.rsplit('/', 1)[-1] for p in for_hackathon(projects, HACKATHON)]
+    assert kept == ['here', 'stored', 'both', 'unknown']
+
+def test_corpus_submissions_fill_track_columns():
+    tracks = [Track(name="best overall yay :3", hackathon=HACKATHON), Track(name="worst project", hackathon=HACKATHON)]
+    projects = [
+        Project(url="https://devpost.com/software/a", title="A", prizes=submitted(HACKATHON, "Best Overall  yay :3")),
+        Project(url="https://devpost.com/software/b", title="B", matched_prize="worst project",
+                prizes=submitted("https://other.devpost.com", "worst project")),
+        Project(url="https://devpost.com/software/c", title="C")
+    ]
+    submissions = corpus_submissions(projects, tracks)
+    assert submissions == {"https://devpost.com/software/a": ["best overall yay :3"],
+                           "https://devpost.com/software/b": ["worst project"]}
+    features = FeatureMatrix(projects, submissions)
+    assert features.matrix[:, features.index['track:worst project']].tolist() == [0, 1, 0]
+    # Known submissions are partial, so every project stays priced for every track
+    priors = seed_priors(projects, tracks, submissions, limit_to_submissions=False)
+    assert len(priors) == 6
+
+if __name__ == "__main__":
+    test_feature_matrix()
+    test_priors_sum_to_one_per_track()
+    test_submissions_limit_eligibility()
+    test_merge_corpus()
+    test_same_title_different_urls_stay_apart()
+    test_for_hackathon()
+    test_corpus_submissions_fill_track_columns()
+    print("Feature tests passed")
@@ -0,0 +1,111 @@
+import json
+import os
+import tempfile
+from ai.project_data.features import TRACKS_PATH, load_tracks
+from ai.project_data.load_markets import MIN_PRICE, connect, launch_hackathon, load_matches
+from ai.scraper.records import Project, Submission
+
+PROJECTS = [Project(url=f"https://devpost.com/software/p{i}", title=f"Project {i}", likes=i,
+                    technologies=['python']) for i in range(5)]
+
+def count(db, table):
+    return db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+def test_launch_is_idempotent():
+    tracks = load_tracks(TRACKS_PATH)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = connect(os.path.join(tmp, 'markets.sqlite'))
+        rows, inserted = launch_hackathon(db, tracks, PROJECTS, closes_at='2025-02-01T00:00:00+00:00')
+        assert inserted == {'markets': len(tracks), 'outcomes': 2 * 5 * len(tracks),
+                            'options': 5 * len(tracks)}
+
+        # Every option points at a Yes and a No outcome of its own market
+        broken = db.execute("""
+            SELECT COUNT(*) FROM options o
+            JOIN outcomes y ON y.outcome_id = o.yes_outcome_id
+            JOIN outcomes n ON n.outcome_id = o.no_outcome_id
+            WHERE y.market_id != o.market_id OR n.market_id != o.market_id
+               OR y.name != 'Yes' OR n.name != 'No'
+               OR ABS(y.initial_price + n.initial_price - 1) > 1e-9
+        """).fetchone()[0]
+        assert broken == 0 and count(db, 'options') == 5 * len(tracks)
+
+        _, inserted = launch_hackathon(db, tracks, PROJECTS + [Project(url="https://devpost.com/software/new",
+                                                                       title="New")],
+                                       closes_at='2025-02-01T00:00:00+00:00')
+        assert inserted == {'markets': 0, 'outcomes': 2 * len(tracks), 'options': len(tracks)}
+        assert count(db, 'markets') == len(tracks)
+        db.close()
+
+def test_matches_limit_each_market():
+    tracks = load_tracks(TRACKS_PATH)[:2]
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = os.path.join(tmp, 'matches.jsonl')
+        with open(checkpoint, 'w', encoding='utf-8') as f:
+            for i, track in [(0, tracks[0]), (1, tracks[0]), (2, tracks[1])]:
+                f.write(json.dumps({'link': f"https://devpost.com/software/p{i}/",
+                                    'matched_prize': track.name}) + '\n')
+        db = connect(':memory:')
+        rows, _ = launch_hackathon(db, tracks, PROJECTS, matches=load_matches(tracks, checkpoint))
+        by_market = {}
+        for _, market_id, name, _, _ in rows['options']:
+            by_market.setdefault(market_id, []).append(name)
+        assert sorted(len(names) for names in by_market.values()) == [1, 2]
+        # A market with one candidate still opens below certainty
+        assert max(row[3] for row in rows['outcomes'] if row[2] == 'Yes') == 0.99
+
+def test_checkpoint_without_track_names_lists_everyone():
+    tracks = load_tracks(TRACKS_PATH)[:2]
+    with tempfile.TemporaryDirectory() as tmp:
+        checkpoint = os.path.join(tmp, 'matches.jsonl')
+        with open(checkpoint, 'w', encoding='utf-8') as f:
+            # Matched against prizes.json, whose names are no track's
+            for i in range(5):
+                f.write(json.dumps({'link': f"https://devpost.com/software/p{i}",
+                                    'matched_prize': "Groq: Best App Built on Groq"}) + '\n')
+        matches = load_matches(tracks, checkpoint)
+        assert matches == {}
+        rows, inserted = launch_hackathon(connect(':memory:'), tracks, PROJECTS, matches=matches)
+        assert inserted['markets'] == 2 and inserted['options'] == 5 * 2
+
+        # Track names are matched ignoring case and spacing, but a partial
+        # checkpoint (1 of 5 projects) still lists everyone
+        with open(checkpoint, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'link': "https://devpost.com/software/p0",
+                                'matched_prize': f"  {tracks[0].name.upper()} "}) + '\n')
+        matches = load_matches(tracks, checkpoint)
+        assert matches == {tracks[0].name: ["https://devpost.com/software/p0"]}
+        rows, inserted = launch_hackathon(connect(':memory:'), tracks, PROJECTS, matches=matches)
+        assert inserted['markets'] == 2 and inserted['options'] == 5 * 2
+
+def test_prices_survive_a_full_gallery():
+    # A few hundred projects per track, as at a real hackathon
+    tracks = load_tracks(TRACKS_PATH)[:1]
+    projects = [Project(url=f"https://devpost.com/software/g{i}", title=f"Gallery {i}", likes=i % 60,
+                        comments=3, technologies=['python']) for i in range(300)]
+    rows, _ = launch_hackathon(connect(':memory:'), tracks, projects)
+    yes = {row[0]: row[3] for row in rows['outcomes'] if row[2] == 'Yes'}
+    prices = [yes[option[3]] for option in rows['options']]
+    assert len(prices) == 300
+    # The odds still sum to one and still tell the projects apart
+    assert abs(sum(prices) - 1) < 1e-3
+    assert len(set(prices)) >= 50 and min(prices) >= MIN_PRICE
+    assert sum(price == MIN_PRICE for price in prices) == 0
+    price_of = {option[2]: yes[option[3]] for option in rows['options']}
+    # More likes, higher price: 59 likes beats 58, and both beat none
+    assert price_of["Gallery 59 Wins"] > price_of["Gallery 58 Wins"] > price_of["Gallery 60 Wins"]
+
+def test_other_hackathons_are_left_out():
+    tracks = load_tracks(TRACKS_PATH)[:1]
+    elsewhere = Project(url="https://devpost.com/software/elsewhere", title="Elsewhere",
+                        prizes=[Submission(hackathon_url="https://other.devpost.com/", won=[])])
+    rows, _ = launch_hackathon(connect(':memory:'), tracks, PROJECTS + [elsewhere])
+    assert sorted(name for _, _, name, _, _ in rows['options']) == [f"Project {i} Wins" for i in range(5)]
+
+if __name__ == "__main__":
+    test_launch_is_idempotent()
+    test_matches_limit_each_market()
+    test_checkpoint_without_track_names_lists_everyone()
+    test_prices_survive_a_full_gallery()
+    test_other_hackathons_are_left_out()
+    print("Market loader tests passed")
@@ -0,0 +1,192 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import openai
+from ai.project_data import match_project_prize
+from ai.project_data.llm_cache import ResponseCache
+from ai.project_data.prize_retrieval import PrizeIndex, shortlist
+from ai.project_data.match_project_prize import (Project, checkpoint_key, match_projects, load_checkpoint,
+                                                 projects_data_record, retry_delay)
+
+PRIZES = ["Groq: Best App Built on Groq", "MASV"]
+
+class FakeCompletionHandler(BaseHTTPRequestHandler):
+    """Minimal stand-in for the chat completions endpoint.
+
+    The first request is rate limited, every other request answers with
+    the Groq prize for each project in the prompt.
+    """
+    requests_seen = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        with self.lock:
+            FakeCompletionHandler.requests_seen += 1
+            first = FakeCompletionHandler.requests_seen == 1
+        if first:
+            return self._send(429, {'error': {'message': 'slow down'}}, {'Retry-After': '0'})
+
+        prompt = body['messages'][0]['content']
+        projects = prompt.count('\nProject ')
+        content = json.dumps([PRIZES[0]] * projects) if projects else PRIZES[0]
+        self._send(200, {
+            'id': 'fake', 'object': 'chat.completion', 'created': 0, 'model': body['model'],
+            'choices': [{'index': 0, 'finish_reason': 'stop',
+                         'message': {'role': 'assistant', 'content': content}}]
+        })
+
+    def _send(self, status, payload, headers=None):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def start_fake_server():
+    FakeCompletionHandler.requests_seen = 0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeCompletionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = openai.AsyncOpenAI(api_key='test', max_retries=0,
+                                base_url=f"http://127.0.0.1:{server.server_address[1]}/v1")
+    return server, client
+
+def make_projects(text='uses groq'):
+    return [Project(title=f"Project {i}", text=text, url=f"https://devpost.com/software/p{i}")
+            for i in range(7)]
+
+def run_matching(batch_size, top_k=None, text='uses groq'):
+    server, client = start_fake_server()
+    projects = make_projects(text)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = os.path.join(tmp, 'matches.jsonl')
+            matches = asyncio.run(match_projects(projects, PRIZES, client, concurrency=4, rate=100,
+                                                 batch_size=batch_size, checkpoint_path=checkpoint,
+                                                 top_k=top_k))
+            assert load_checkpoint(checkpoint) == matches
+            # A rerun finds everything in the checkpoint and sends nothing
+            seen = FakeCompletionHandler.requests_seen
+            asyncio.run(match_projects(projects, PRIZES, client, checkpoint_path=checkpoint, top_k=top_k))
+            assert FakeCompletionHandler.requests_seen == seen
+    finally:
+        server.shutdown()
+    return matches, FakeCompletionHandler.requests_seen
+
+def test_concurrent_matching_retries_rate_limits():
+    matches, requests_seen = run_matching(batch_size=1)
+    assert len(matches) == 7 and set(matches.values()) == {PRIZES[0]}
+    assert requests_seen == 8
+
+def test_batched_matching_packs_projects():
+    matches, requests_seen = run_matching(batch_size=3)
+    assert len(matches) == 7 and set(matches.values()) == {PRIZES[0]}
+    assert requests_seen == 4
+
+def test_prefilter_resolves_obvious_matches_locally():
+    matches, requests_seen = run_matching(batch_size=1, top_k=2, text='A groq app built on groq')
+    assert len(matches) == 7 and set(matches.values()) == {PRIZES[0]}
+    assert requests_seen == 0
+
+def test_shortlist_without_prizes():
+    assert shortlist(PrizeIndex([], [], ['hello world']), ['hello world']) == [(None, [])]
+
+def test_response_cache_skips_repeat_queries():
+    server, client = start_fake_server()
+    projects = make_projects()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResponseCache(os.path.join(tmp, 'cache.sqlite'))
+            for run in range(2):
+                # A fresh checkpoint each run, as on another machine
+                checkpoint = os.path.join(tmp, f"matches_{run}.jsonl")
+                matches = asyncio.run(match_projects(projects, PRIZES, client, rate=100,
+                                                     checkpoint_path=checkpoint, cache=cache))
+                assert len(matches) == 7
+            assert FakeCompletionHandler.requests_seen == 8
+            assert cache.stats() == {'hits': 7, 'misses': 7, 'entries': 7}
+
+            cache.max_entries = 3
+            assert cache.evict() == 4
+            cache.close()
+    finally:
+        server.shutdown()
+
+def test_prompt_change_invalidates_cached_answers():
+    server, client = start_fake_server()
+    projects = make_projects()
+    templates = match_project_prize.PROMPT_TEMPLATES
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = ResponseCache(os.path.join(tmp, 'cache.sqlite'))
+            for run, edited in enumerate([False, True]):
+                if edited:
+                    match_project_prize.PROMPT_TEMPLATES = templates + "\nAnswer in lowercase."
+                checkpoint = os.path.join(tmp, f"matches_{run}.jsonl")
+                asyncio.run(match_projects(projects, PRIZES, client, rate=100,
+                                           checkpoint_path=checkpoint, cache=cache))
+            assert cache.stats() == {'hits': 0, 'misses': 14, 'entries': 14}
+            cache.close()
+    finally:
+        match_project_prize.PROMPT_TEMPLATES = templates
+        server.shutdown()
+
+def test_prize_change_rematches_checkpointed_projects():
+    server, client = start_fake_server()
+    projects = make_projects()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = os.path.join(tmp, 'matches.jsonl')
+            asyncio.run(match_projects(projects, PRIZES[1:], client, rate=100, checkpoint_path=checkpoint))
+            seen = FakeCompletionHandler.requests_seen
+            # The old matches were made against other prizes, so all 7 go again
+            matches = asyncio.run(match_projects(projects, PRIZES, client, rate=100,
+                                                 checkpoint_path=checkpoint))
+            assert FakeCompletionHandler.requests_seen == seen + 7
+            assert set(matches.values()) == {PRIZES[0]}
+            assert load_checkpoint(checkpoint, checkpoint_key(PRIZES)) == matches
+    finally:
+        server.shutdown()
+
+def test_retry_after_is_capped():
+    class Throttled(Exception):
+        def __init__(self, retry_after):
+            self.response = type('Response', (), {'headers': {'retry-after': retry_after}})()
+
+    assert retry_delay(Throttled('2'), 0) == 2
+    assert retry_delay(Throttled('3600'), 0, cap=60) == 60
+    assert retry_delay(Throttled('Wed, 21 Oct 2099 07:28:00 GMT'), 0, cap=60) == 60
+    assert 0.5 <= retry_delay(Exception(), 0) <= 1
+
+def test_write_back_keeps_every_field():
+    entry = {'title': 'Snake', 'link': 'https://devpost.com/software/snake', 'text': 'a game',
+             'likes': 12, 'technologies': ['c', 'ncurses'], 'team_members': [{'name': 'Hung'}],
+             'thumbnail': 'thumb.png'}
+    project = Project.from_dict(entry)
+    project.matched_prize = PRIZES[1]
+    assert projects_data_record(project) == dict(entry, matched_prize=PRIZES[1])
+
+    # Files that already used 'url' alongside 'link' keep both
+    both = dict(entry, url='https://devpost.com/software/snake-2')
+    assert projects_data_record(Project.from_dict(both)) == both
+
+if __name__ == "__main__":
+    test_concurrent_matching_retries_rate_limits()
+    test_batched_matching_packs_projects()
+    test_prefilter_resolves_obvious_matches_locally()
+    test_shortlist_without_prizes()
+    test_response_cache_skips_repeat_queries()
+    test_prompt_change_invalidates_cached_answers()
+    test_prize_change_rematches_checkpointed_projects()
+    test_retry_after_is_capped()
+    test_write_back_keeps_every_field()
+    print("Matching tests passed")
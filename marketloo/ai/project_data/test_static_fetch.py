@@ -0,0 +1,61 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import threading
+from ai.project_data.static_fetch import HybridFetcher
+from ai.project_data.project_data_scraper import parse_project_content
+from ai.project_data.tracks import parse_prizes
+
+PROJECT_PAGE = """<html><body>
+<div id="software-header"><h1 id="app-title"> TalkTuahTaxer </h1></div>
+<div class="row"><div class="large-9 columns">
+<div id="gallery"></div>
+<div><h2>Inspiration</h2><p>fanum   taxing
+all the way</p><p></p></div>
+</div></div>
+<ul class="no-bullet"><li><label> Best Overall </label></li><li><label>MASV</label></li></ul>
+</body></html>"""
+
+class StubPageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        # /js-only is rendered client side, so the HTML has no content
+        body = "<html><div id='root'></div></html>" if self.path == '/js-only' else PROJECT_PAGE
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+class FakePool:
+    """Stands in for DriverPool, counting browser loads"""
+    def __init__(self):
+        self.runs = []
+
+    def run(self, fn, url):
+        self.runs.append(url)
+        return {'title': 'from browser', 'link': url, 'text': ''}
+
+def test_static_path_with_browser_fallback():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubPageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    pool = FakePool()
+    try:
+        fetcher = HybridFetcher(pool)
+        results = fetcher.map([f"{base_url}/software/taxer", f"{base_url}/js-only"],
+                              parse_project_content, None, threads=2)
+        prizes = fetcher.scrape(f"{base_url}/project-gallery", parse_prizes, None)
+    finally:
+        server.shutdown()
+
+    assert results[0] == {'title': 'TalkTuahTaxer', 'link': f"{base_url}/software/taxer",
+                          'text': 'Inspiration fanum taxing all the way'}
+    assert results[1]['title'] == 'from browser' and pool.runs == [f"{base_url}/js-only"]
+    assert prizes == ['Best Overall', 'MASV']
+    assert fetcher.counts() == {'static': 2, 'browser': 1}
+    assert [r['reason'] for r in fetcher.records if r['path'] == 'browser'] == ['selectors missing']
+
+if __name__ == "__main__":
+    test_static_path_with_browser_fallback()
+    print("Static fetch tests passed")
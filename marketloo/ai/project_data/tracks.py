@@ -1,34 +1,45 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from webdriver_manager.chrome import ChromeDriverManager
+from ai.project_data import DATA_DIR
+from ai.project_data.driver_pool import DriverPool, wait_for
+from ai.project_data.static_fetch import HybridFetcher
 import json
+import os
 
-def scrape_prizes(url):
-    driver = None
+def parse_prizes(soup, url):
+    """read_prizes from server-rendered HTML, or None if the prize list
+    isn't there"""
+    prizes_list = soup.select_one("ul.no-bullet")
+    if prizes_list is None:
+        return None
+    prizes = [" ".join(label.get_text(" ").split()) for label in prizes_list.select("li label")]
+    return [prize for prize in prizes if prize] or None
+
+def read_prizes(driver, url):
+    driver.get(url)
+    
+    # Find the prizes list
+    prizes_list = wait_for(driver, "ul.no-bullet")
+    prize_items = prizes_list.find_elements(By.CSS_SELECTOR, "li label")
+    
+    return [item.text.strip() for item in prize_items if item.text.strip()]
+
+def scrape_prizes(url, pool=None):
+    # Try the plain HTML first; only borrow a browser from the shared pool
+    # (or start a one-off pool) if the prizes aren't in it
+    own_pool = pool is None
+    pool = pool or DriverPool(size=1)
     try:
-        chrome_options = Options()
-        chrome_options.add_argument('--headless')
-        driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-        
-        driver.get(url)
-        driver.implicitly_wait(5)
-        
-        # Find the prizes list
-        prizes_list = driver.find_element(By.CSS_SELECTOR, "ul.no-bullet")
-        prize_items = prizes_list.find_elements(By.CSS_SELECTOR, "li label")
-        
-        prizes = [item.text.strip() for item in prize_items if item.text.strip()]
-        
+        fetcher = HybridFetcher(pool)
+        prizes = fetcher.scrape(url, parse_prizes, read_prizes)
+        print(f"Fetch path: {fetcher.summary()}")
         return prizes
         
     except Exception as e:
         print(f"Error scraping prizes: {e}")
         return []
     finally:
-        if driver:
-            driver.quit()
+        if own_pool:
+            pool.close()
 
 if __name__ == "__main__":
     # Test with the hackathon URL
@@ -36,9 +47,9 @@ if __name__ == "__main__":
     prizes = scrape_prizes(url)
     
     # Save to JSON
-    with open("prizes.json", "w", encoding='utf-8') as f:
+    with open(os.path.join(DATA_DIR, "prizes.json"), "w", encoding='utf-8') as f:
         json.dump(prizes, f, indent=2, ensure_ascii=False)
     
     print("Prizes found:")
     for prize in prizes:
-        print(f"- {prize}")
\ No newline at end of file
+        print(f"- {prize}")
@@ -0,0 +1,260 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from html import escape
+from urllib.parse import urlsplit, parse_qs
+import argparse
+import asyncio
+import glob
+import json
+import os
+import resource
+import subprocess
+import sys
+import threading
+import time
+from crawler import Crawler
+from metrics import Metrics
+from parse_projects import parse_project_html
+from records import Project
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(HERE, 'ai', 'scraper', 'data')
+RESULTS_DIR = os.path.join(HERE, 'bench_results')
+PROJECTS_PER_GALLERY_PAGE = 24
+
+def load_seed_projects():
+    """Project records from the saved scraper outputs"""
+    with open(os.path.join(DATA_DIR, 'final.json'), 'r', encoding='utf-8') as f:
+        projects = json.load(f)
+    with open(os.path.join(DATA_DIR, 'parsed_projects.json'), 'r', encoding='utf-8') as f:
+        parsed = json.load(f)
+    # parsed_projects.json has no URLs but lines up with final.json by title
+    contributions = {p['title']: p.get('team_members', []) for p in parsed}
+    for project in projects:
+        members = contributions.get(project['title'], [])
+        for member, parsed_member in zip(project['team_members'], members):
+            member['contribution'] = parsed_member.get('contribution', '')
+    return projects
+
+def page_shell():
+    """A real saved devpost page split at </body>, so corpus pages carry
+    the same boilerplate weight the parser sees in production"""
+    saved = sorted(glob.glob(os.path.join(HERE, 'scraped_pages', '*.html')))
+    if not saved:
+        return '<html><body>', '</body></html>'
+    with open(saved[0], 'r', encoding='utf-8') as f:
+        html = f.read()
+    end = html.rindex('</body>')
+    return html[:end], html[end:]
+
+def render_project_page(project, shell):
+    """A devpost-style project page for one seed record"""
+    slug = project['url'].rstrip('/').split('/')[-1]
+    title = escape(project['title'])
+    techs = ''.join(f'<li><span class="cp-tag">{escape(t)}</span></li>' for t in project['technologies'])
+    links = ''.join(f'<li><a href="{escape(l["url"])}"><span>{escape(l["text"])}</span></a></li>'
+                    for l in project.get('links') or [])
+    team = ''.join(
+        f'<li class="software-team-member"><a class="user-profile-link" href="{escape(m.get("profile_url") or "")}">'
+        f'<img src="avatar.png"></a><a class="user-profile-link" href="{escape(m.get("profile_url") or "")}">'
+        f'{escape(m.get("name") or "")}</a><p class="bubble">{escape(m.get("contribution") or "")}</p></li>'
+        for m in project['team_members'])
+    sections = ''.join(
+        f'<h2>{heading}</h2><p>{title} {heading.lower()} paragraph one.</p><p>More about {slug}.</p>'
+        for heading in ['Inspiration', 'What it does', 'How we built it', 'Challenges we ran into'])
+    body = f"""
+<div id="software-header"><h1 id="app-title">{title}</h1><p class="large">{title} tagline</p></div>
+<div class="row"><div class="large-9 columns" id="app-details-left">
+<div id="gallery"><img src="shot.png"></div>
+<div>{sections}</div>
+<div id="built-with"><h2>Built With</h2><ul class="no-bullet inline-list">{techs}</ul></div>
+<nav class="app-links"><ul data-role="software-urls">{links}</ul></nav>
+</div></div>
+<section id="app-team"><ul class="app-team">{team}</ul></section>
+"""
+    return shell[0] + body + shell[1]
+
+def render_gallery_page(paths, page_count=0):
+    links = ''.join(f'<a class="block-wrapper-link" href="{path}">{path}</a>' for path in paths)
+    pagination = ''.join(f'<li><a href="/submissions/search?page={n}">{n}</a></li>'
+                         for n in range(1, page_count + 1))
+    return f'<html><body>{links}<ul class="pagination">{pagination}</ul></body></html>'
+
+def build_corpus(repeat=1):
+    """Map of URL path -> HTML for the gallery and project pages"""
+    shell = page_shell()
+    projects = load_seed_projects()
+    pages = {}
+    for copy in range(repeat):
+        for project in projects:
+            path = urlsplit(project['url']).path
+            if copy:
+                path = f"{path}-{copy}"
+            pages[path] = render_project_page(project, shell)
+    project_paths = list(pages)
+    page_count = -(-len(project_paths) // PROJECTS_PER_GALLERY_PAGE)
+    for i in range(0, len(project_paths), PROJECTS_PER_GALLERY_PAGE):
+        page = i // PROJECTS_PER_GALLERY_PAGE + 1
+        pages[f"/submissions/search?page={page}"] = render_gallery_page(
+            project_paths[i:i + PROJECTS_PER_GALLERY_PAGE], page_count)
+    return pages
+
+class CorpusHandler(BaseHTTPRequestHandler):
+    pages = {}
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        key = parts.path
+        if parts.path == '/submissions/search':
+            key = f"{parts.path}?page={parse_qs(parts.query).get('page', ['1'])[0]}"
+        body = self.pages.get(key)
+        if body is None:
+            # Past the last gallery page devpost serves an empty gallery
+            status, body = (200, render_gallery_page([])) if parts.path == '/submissions/search' else (404, '')
+        else:
+            status = 200
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def process_peak_rss_mb():
+    """The process's memory high-water mark so far. It never goes down, so
+    a stage only shows its own peak if that is higher than every earlier
+    stage's."""
+    # ru_maxrss is in KB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def stage_result(pages, elapsed, latencies, output_bytes):
+    return {
+        'pages': pages,
+        'seconds': round(elapsed, 4),
+        'pages_per_sec': round(pages / elapsed, 2) if elapsed else None,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'output_bytes': output_bytes,
+        'process_peak_rss_mb': round(process_peak_rss_mb(), 1)
+    }
+
+def bench_crawl(base_url, workers):
+    """Gallery walk plus project downloads against the local stub"""
+    metrics = Metrics(slow_page_seconds=float('inf'))
+    pages = {}
+
+    async def run():
+        async with Crawler(base_url=base_url, workers=workers, metrics=metrics) as crawler:
+            await crawler.crawl(base_url, lambda url, html: pages.__setitem__(url, html))
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    elapsed = time.perf_counter() - start
+    latencies = [r['ms'] / 1000 for r in metrics.pages if r['stage'] == 'download']
+    return pages, stage_result(len(pages), elapsed, latencies, sum(len(h.encode('utf-8')) for h in pages.values()))
+
+def bench_parse(pages):
+    """parse_project_html over every downloaded page"""
+    latencies = []
+    projects = []
+    start = time.perf_counter()
+    for url, html in pages.items():
+        page_start = time.perf_counter()
+        project = parse_project_html(html)
+        latencies.append(time.perf_counter() - page_start)
+        if project:
+            projects.append(Project.from_dict(dict(project, url=url)))
+    elapsed = time.perf_counter() - start
+    output_bytes = sum(len(json.dumps(p.to_dict()).encode('utf-8')) for p in projects)
+    return projects, stage_result(len(pages), elapsed, latencies, output_bytes)
+
+def bench_match(projects):
+    """Local prize retrieval of every parsed project against tracks.json"""
+    sys.path.insert(0, os.path.join(HERE, '..', 'project_data'))
+    from prize_retrieval import PrizeIndex, load_prizes, shortlist
+
+    prizes, descriptions = load_prizes(tracks_path=os.path.join(DATA_DIR, 'tracks.json'))
+    texts = [f"{p.title} {p.full_text()}" for p in projects]
+    start = time.perf_counter()
+    index = PrizeIndex(prizes, descriptions, texts)
+    results = shortlist(index, texts)
+    elapsed = time.perf_counter() - start
+    output_bytes = len(json.dumps(results).encode('utf-8'))
+    return stage_result(len(texts), elapsed, [elapsed / max(1, len(texts))] * len(texts), output_bytes)
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(previous_path, results):
+    """Print how each stage moved against an earlier results file"""
+    with open(previous_path, 'r', encoding='utf-8') as f:
+        previous = json.load(f)
+    print(f"\nCompared with {previous.get('commit')} ({previous_path}):")
+    for stage, now in results['stages'].items():
+        before = previous['stages'].get(stage)
+        if not before:
+            continue
+        for metric in ['pages_per_sec', 'p50_ms', 'p99_ms', 'output_bytes', 'process_peak_rss_mb']:
+            if before.get(metric) and now.get(metric) is not None:
+                change = (now[metric] - before[metric]) / before[metric] * 100
+                print(f"  {stage:6} {metric:14} {before[metric]:>12} -> {now[metric]:>12} ({change:+.1f}%)")
+
+def main(repeat=1, workers=16, output=None, previous=None):
+    pages = build_corpus(repeat)
+    CorpusHandler.pages = pages
+    server = ThreadingHTTPServer(('127.0.0.1', 0), CorpusHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    print(f"Serving {len(pages)} corpus pages at {base_url}")
+
+    try:
+        downloaded, crawl_stats = bench_crawl(base_url, workers)
+    finally:
+        server.shutdown()
+    projects, parse_stats = bench_parse(downloaded)
+    match_stats = bench_match(projects)
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': time.strftime("%Y-%m-%d %H:%M:%S"),
+        'corpus_pages': len(pages),
+        'stages': {'crawl': crawl_stats, 'parse': parse_stats, 'match': match_stats}
+    }
+    for stage, stats in results['stages'].items():
+        print(f"{stage:6} {stats['pages']:>6} pages  {stats['pages_per_sec']:>9} pages/s  "
+              f"p50 {stats['p50_ms']:>8}ms  p99 {stats['p99_ms']:>8}ms  "
+              f"{stats['output_bytes']:>10} bytes  process peak RSS {stats['process_peak_rss_mb']}MB")
+
+    output = output or os.path.join(RESULTS_DIR, f"{results['commit'] or 'local'}.json")
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nSaved results to {output}")
+
+    if previous:
+        compare(previous, results)
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the scraping pipeline on a fixed local corpus")
+    parser.add_argument('--repeat', type=int, default=1,
+                        help="Copies of the seed corpus to serve")
+    parser.add_argument('--workers', type=int, default=16,
+                        help="Crawler download workers")
+    parser.add_argument('--output', help="Where to write the results JSON")
+    parser.add_argument('--compare', help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+    main(args.repeat, args.workers, args.output, args.compare)
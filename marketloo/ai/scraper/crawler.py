@@ -0,0 +1,366 @@
+from html_backend import make_soup
+from frontier import DEVPOST_URL, canonicalize
+from host_control import RETRYABLE, HostControl, retry_delay
+import aiohttp
+import asyncio
+import inspect
+import re
+import time
+import traceback
+from contextlib import nullcontext
+from urllib.parse import urlsplit
+
+def project_urls_from_gallery(html, base_url=DEVPOST_URL):
+    """Pull canonical project URLs out of a gallery page"""
+    soup = make_soup(html)
+    urls = []
+    for entry in soup.find_all('a', class_='block-wrapper-link'):
+        href = entry.get('href')
+        if href:
+            urls.append(canonicalize(href, base_url))
+    return urls
+
+def gallery_url(hackathon_url, page):
+    return f"{hackathon_url}/submissions/search?page={page}"
+
+def gallery_page_count(html):
+    """The number of gallery pages according to the pagination links on a
+    gallery page, or None if the page has no pagination"""
+    soup = make_soup(html)
+    pages = [int(match.group(1))
+             for link in soup.select('.pagination a[href]')
+             for match in [re.search(r'[?&]page=(\d+)', link['href'])] if match]
+    return max(pages) if pages else None
+
+class Crawler:
+    """Asyncio crawl engine with a pooled keep-alive session.
+
+    Gallery pages are walked by a producer that feeds a bounded queue, while
+    a set of download workers drain it, so pagination and project downloads
+    overlap. Every host gets its own concurrency limit and every request has
+    a timeout, so one slow socket can't stall the crawl.
+
+    With a PageCache, project pages are fetched conditionally and pages whose
+    content is unchanged are skipped; their URLs are collected in
+    self.unchanged instead of being passed to on_page.
+
+    With a Metrics object, every request is recorded (stage, status, bytes,
+    ms) along with per-host in-flight and download queue depth gauges.
+
+    With a Frontier, every URL's state is persisted as it is fetched: pages
+    already done are not fetched again, and pending pages left over from an
+    interrupted crawl are queued alongside the gallery walk.
+
+    Each host's concurrency starts at half of max_per_host and adapts with
+    AIMD to its latency and error rate. Rate limits, server errors and
+    timeouts are retried up to max_retries times with jittered backoff (or
+    the server's Retry-After), and a host that keeps failing trips a circuit
+    breaker that pauses requests to it.
+    """
+
+    def __init__(self, base_url=DEVPOST_URL, max_connections=50, max_per_host=8,
+                 workers=16, queue_size=100, timeout=30, cache=None, metrics=None,
+                 frontier=None, max_retries=4, breaker_threshold=5, breaker_timeout=10.0):
+        self.base_url = base_url
+        self.max_connections = max_connections
+        self.max_per_host = max_per_host
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=10, sock_read=timeout)
+        self.cache = cache
+        self.metrics = metrics
+        self.frontier = frontier
+        self.max_retries = max_retries
+        self.breaker_threshold = breaker_threshold
+        self.breaker_timeout = breaker_timeout
+        self.unchanged = []
+        self.session = None
+        self.hosts = {}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_connections,
+                                         limit_per_host=self.max_per_host,
+                                         keepalive_timeout=30)
+        self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+        self.session = None
+        if self.cache is not None:
+            self.cache.save()
+        if self.frontier is not None:
+            self.frontier.commit()
+
+    def host_control(self, host):
+        if host not in self.hosts:
+            self.hosts[host] = HostControl(self.max_per_host, threshold=self.breaker_threshold,
+                                           reset_timeout=self.breaker_timeout)
+        return self.hosts[host]
+
+    async def _request(self, url, headers, host, control):
+        """One attempt: (status, text, headers, bytes, seconds)"""
+        status, text, response_headers = None, None, {}
+        size = 0
+        in_flight = self.metrics.in_flight('http_in_flight', host=host) if self.metrics else nullcontext()
+        async with control.limiter:
+            start = time.perf_counter()
+            try:
+                with in_flight:
+                    async with self.session.get(url, headers=headers) as response:
+                        body = await response.read()
+                        size = len(body)
+                        status, response_headers = response.status, response.headers
+                        text = body.decode(response.get_encoding(), errors='replace')
+            except asyncio.TimeoutError:
+                print(f"Timed out fetching {url}")
+            except aiohttp.ClientError as e:
+                print(f"Error fetching {url}: {str(e)}")
+            return status, text, response_headers, size, time.perf_counter() - start
+
+    async def _get(self, url, headers=None, stage='download'):
+        host = urlsplit(url).netloc
+        control = self.host_control(host)
+        start = time.perf_counter()
+        for attempt in range(self.max_retries + 1):
+            await control.breaker.wait()
+            status, text, response_headers, size, latency = await self._request(url, headers, host, control)
+            healthy = status not in RETRYABLE
+            control.limiter.record(latency, healthy)
+            if healthy:
+                control.breaker.record_success()
+            elif control.breaker.record_failure():
+                print(f"Circuit breaker open for {host} for {control.breaker.timeout:.0f}s")
+                if self.metrics is not None:
+                    self.metrics.inc('circuit_breaker_trips_total', host=host)
+            if self.metrics is not None:
+                self.metrics.inc('http_requests_total', stage=stage, status=str(status))
+                self.metrics.inc('http_bytes_total', size, stage=stage)
+                self.metrics.set_gauge('host_concurrency_limit', int(control.limiter.limit), host=host)
+            if healthy or attempt == self.max_retries:
+                break
+
+            retry_after = response_headers.get('Retry-After')
+            delay = retry_delay(attempt, retry_after)
+            if retry_after:
+                # The server asked the whole host to back off, not just this URL
+                control.breaker.hold(delay)
+            if self.metrics is not None:
+                self.metrics.inc('http_retries_total', stage=stage, status=str(status))
+            await asyncio.sleep(delay)
+        if self.metrics is not None:
+            self.metrics.record_page(url, stage, time.perf_counter() - start, status, size, retries=attempt)
+        return status, text, response_headers
+
+    async def fetch(self, url, stage='download'):
+        """Fetch a URL, returning (status, text) or (None, None) on error"""
+        status, text, _ = await self._get(url, stage=stage)
+        return status, text
+
+    async def fetch_changed(self, url):
+        """Fetch a project page through the cache.
+
+        Returns the HTML if the page is new or changed, otherwise None.
+        """
+        _, html = await self._fetch_project(url)
+        return html
+
+    async def _fetch_project(self, url):
+        """Returns ('changed', html), ('unchanged', None) or ('failed', status)"""
+        if self.cache is None:
+            status, html = await self.fetch(url)
+            if status != 200:
+                print(f"Failed to fetch {url}: {status}")
+                return 'failed', status
+            return 'changed', html
+
+        outcome, result = await self.revalidate(url)
+        if outcome == 'failed':
+            print(f"Failed to fetch {url}: {result}")
+        elif outcome == 'unchanged':
+            return self._unchanged(url)
+        return outcome, result
+
+    async def revalidate(self, url, stage='download'):
+        """Conditionally fetch any URL through the cache.
+
+        Returns ('changed', html), ('unchanged', None) or ('failed', status).
+        A 304 and a 200 whose body hashes the same as the cached one both
+        count as unchanged.
+        """
+        status, html, headers = await self._get(url, self.cache.conditional_headers(url), stage)
+        if status == 304:
+            self.cache.touch(url)
+            return 'unchanged', None
+        if status != 200:
+            return 'failed', status
+        if not self.cache.store(url, html, headers):
+            return 'unchanged', None
+        return 'changed', html
+
+    def _unchanged(self, url):
+        self.unchanged.append(url)
+        if self.metrics is not None:
+            self.metrics.inc('pages_unchanged_total')
+        return 'unchanged', None
+
+    async def _gallery_page(self, hackathon_url, page):
+        """Fetch one gallery page, returning (page, html or None)"""
+        url = gallery_url(hackathon_url, page)
+        if self.frontier is not None:
+            self.frontier.add(url, 'gallery')
+        status, html = await self.fetch(url, stage='discover')
+        if self.frontier is not None:
+            if status == 200:
+                self.frontier.done(url)
+            else:
+                self.frontier.fail(url, status)
+        if status in RETRYABLE:
+            # Not the end of the gallery, so say the walk is incomplete
+            # rather than silently stopping short
+            print(f"Gallery page {page} of {hackathon_url} failed ({status}) after retries; "
+                  f"projects on it and later pages may be missing")
+            if self.metrics is not None:
+                self.metrics.inc('gallery_pages_failed_total')
+        return page, html if status == 200 else None
+
+    async def _found(self, urls, projects, queue, seen):
+        # A project can show up on two pages if the gallery shifts mid-walk,
+        # and with a frontier, pages already fetched aren't queued again
+        for project_url in urls:
+            if project_url in seen:
+                continue
+            seen.add(project_url)
+            projects.append(project_url)
+            if queue is not None and (self.frontier is None or self.frontier.add(project_url)):
+                await queue.put(project_url)
+        if self.metrics is not None:
+            self.metrics.inc('projects_discovered_total', len(urls))
+            if queue is not None:
+                self.metrics.set_gauge('download_queue_depth', queue.qsize())
+
+    async def walk_gallery(self, hackathon_url, queue=None):
+        """Walk the gallery, putting project URLs on the queue as they are found.
+
+        The page count is read from the pagination on page 1 and the rest of
+        the pages are fetched concurrently; URLs go on the queue in the order
+        pages arrive. The count is only a hint, so pages after it (or every
+        page, when there is no pagination) are probed one at a time until an
+        empty one.
+
+        Returns the list of every URL found, in gallery order.
+        """
+        _, html = await self._gallery_page(hackathon_url, 1)
+        urls = project_urls_from_gallery(html, self.base_url) if html else []
+        if not urls:
+            return []
+        seen = set()
+        by_page = {1: []}
+        await self._found(urls, by_page[1], queue, seen)
+        print(f"Found {len(urls)} projects on page 1")
+
+        page_count = gallery_page_count(html) or 1
+        fetches = [self._gallery_page(hackathon_url, page) for page in range(2, page_count + 1)]
+        for fetch in asyncio.as_completed(fetches):
+            page, html = await fetch
+            urls = project_urls_from_gallery(html, self.base_url) if html else []
+            by_page[page] = []
+            await self._found(urls, by_page[page], queue, seen)
+            print(f"Found {len(urls)} projects on page {page} of {page_count}")
+
+        # An empty page inside the advertised range means the count was off
+        page = page_count + 1 if all(by_page.values()) else None
+        while page is not None:
+            _, html = await self._gallery_page(hackathon_url, page)
+            urls = project_urls_from_gallery(html, self.base_url) if html else []
+            if not urls:
+                break
+            by_page[page] = []
+            await self._found(urls, by_page[page], queue, seen)
+            print(f"Found {len(urls)} projects on page {page}")
+            page += 1
+
+        return [url for page in sorted(by_page) for url in by_page[page]]
+
+    async def download(self, url, on_page=None):
+        """Fetch one project page and hand it to on_page if it changed.
+
+        Returns (outcome, on_page's result), where outcome is 'changed',
+        'unchanged' or 'failed'. The outcome is recorded in the frontier.
+        """
+        result = None
+        try:
+            outcome, html = await self._fetch_project(url)
+            if outcome == 'changed' and on_page is not None:
+                result = on_page(url, html)
+                if inspect.isawaitable(result):
+                    result = await result
+            if self.frontier is not None:
+                if outcome == 'failed':
+                    self.frontier.fail(url, html)
+                else:
+                    self.frontier.done(url)
+        except Exception as e:
+            print(f"Error handling {url}: {str(e)}")
+            print(traceback.format_exc())
+            outcome = 'failed'
+            if self.frontier is not None:
+                self.frontier.fail(url, e)
+        return outcome, result
+
+    async def _download_worker(self, queue, on_page, results, skip):
+        while True:
+            url = await queue.get()
+            try:
+                if url is None:
+                    return
+                if skip is not None and skip(url):
+                    continue
+                _, result = await self.download(url, on_page)
+                if result is not None:
+                    results.append(result)
+            finally:
+                queue.task_done()
+
+    async def _requeue_pending(self, queue):
+        """Queue pages a previous, interrupted crawl didn't get to"""
+        if self.frontier is None:
+            return
+        pending = self.frontier.pending(kinds=['project', 'profile'])
+        if pending:
+            print(f"Resuming {len(pending)} pending pages")
+        for url in pending:
+            await queue.put(url)
+
+    async def crawl(self, hackathon_url, on_page, skip=None):
+        """Crawl a hackathon, calling on_page(url, html) for each project page.
+
+        on_page may be a plain function or a coroutine function; non-None
+        return values are collected and returned. Project URLs for which
+        skip(url) is true are not downloaded.
+        """
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        results = []
+        workers = [asyncio.create_task(self._download_worker(queue, on_page, results, skip))
+                   for _ in range(self.workers)]
+        try:
+            await asyncio.gather(self.walk_gallery(hackathon_url, queue), self._requeue_pending(queue))
+        finally:
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        return results
+
+def get_project_urls(hackathon_url, **crawler_options):
+    """Blocking helper that only walks the gallery"""
+    async def run():
+        async with Crawler(**crawler_options) as crawler:
+            return await crawler.walk_gallery(hackathon_url)
+    return asyncio.run(run())
+
+def crawl(hackathon_url, on_page, **crawler_options):
+    """Blocking helper that crawls a whole hackathon"""
+    async def run():
+        async with Crawler(**crawler_options) as crawler:
+            return await crawler.crawl(hackathon_url, on_page)
+    return asyncio.run(run())
@@ -0,0 +1,140 @@
+import bs4
+from bs4.element import CData, NavigableString, Tag
+
+HEADER_TAGS = {'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+
+# The strings get_text() counts in ordinary tags. Comments, doctypes and
+# the like are NavigableString subclasses it leaves out, as are the
+# strings of the tags below, which bs4's HTML builders give types of
+# their own and which only count their own kind of string.
+TEXT_STRING_TYPES = (NavigableString, CData)
+OWN_STRING_TAGS = {'script', 'style', 'template'}
+
+# Building markup in one pass needs Tag._format_tag and
+# NavigableString.output_ready, which aren't public. They are only used
+# on the bs4 releases test_document_walk.py checks them against; on any
+# other, html() falls back to str(tag).
+FAST_MARKUP_VERSIONS = ((4, 13), (4, 16))
+
+def _bs4_version():
+    return tuple(int(part) for part in bs4.__version__.split('.')[:2] if part.isdigit())
+
+FAST_MARKUP = (FAST_MARKUP_VERSIONS[0] <= _bs4_version() < FAST_MARKUP_VERSIONS[1]
+               and hasattr(Tag, '_format_tag') and hasattr(NavigableString, 'output_ready'))
+
+class DocumentWalk:
+    """Everything the project extractors need from a tree, in one pass.
+
+    The walk visits each node of root once. Stripped strings go into one
+    shared buffer and every tag remembers the slice of it that it covers,
+    so a tag's text is a join over its slice instead of another traversal
+    of its subtree. Headers and the siblings that follow them are grouped
+    into sections along the way, and tags are indexed by name. With
+    html=True the serialized markup is built into a second shared buffer
+    the same way, so nested tags aren't serialized once per ancestor.
+
+    text() and html() give the same results as get_text(separator,
+    strip=True) and str() on the tag. Without FAST_MARKUP, html() is
+    str() on the tag.
+    """
+
+    def __init__(self, root, html=False):
+        self.root = root
+        self.strings = []
+        self.pieces = [] if html and FAST_MARKUP else None
+        self.spans = {}
+        self.tags = []
+        self.by_name = {}
+        self.sections = []
+        self._headers = {}
+        self._formatter = root.formatter_for_name('minimal') if self.pieces is not None else None
+        self._walk()
+
+    def _walk(self):
+        open_sections = {}
+        stack = [self.root]
+        for node in self.root.descendants:
+            while node.parent is not stack[-1]:
+                self._close(stack.pop(), open_sections)
+            if isinstance(node, NavigableString):
+                if type(node) in TEXT_STRING_TYPES:
+                    stripped = node.strip()
+                    if stripped:
+                        self.strings.append(stripped)
+                if self.pieces is not None:
+                    self.pieces.append(node.output_ready(self._formatter))
+                continue
+
+            self.tags.append(node)
+            self.by_name.setdefault(node.name, []).append(node)
+            parent = id(node.parent)
+            if node.name in HEADER_TAGS:
+                # A header ends the section before it, whether or not it
+                # starts one of its own. Its text is known once it closes.
+                open_sections[parent] = None
+                self._headers[id(node)] = len(self.sections)
+                self.sections.append((None, []))
+            elif open_sections.get(parent) is not None:
+                open_sections[parent][1].append(node)
+            self.spans[id(node)] = [len(self.strings), None, self._piece_count(), None]
+            if self.pieces is not None:
+                self.pieces.append(node._format_tag('utf-8', self._formatter, opening=True))
+            if node.is_empty_element:
+                self._end(node)
+            else:
+                stack.append(node)
+        while len(stack) > 1:
+            self._close(stack.pop(), open_sections)
+
+    def _piece_count(self):
+        return len(self.pieces) if self.pieces is not None else 0
+
+    def _end(self, tag):
+        span = self.spans[id(tag)]
+        span[1] = len(self.strings)
+        span[3] = self._piece_count()
+
+    def _close(self, tag, open_sections):
+        if self.pieces is not None:
+            self.pieces.append(tag._format_tag('utf-8', self._formatter, opening=False))
+        self._end(tag)
+        open_sections.pop(id(tag), None)
+        if tag.name in HEADER_TAGS:
+            header_text = self.text(tag)
+            if header_text:
+                index = self._headers[id(tag)]
+                self.sections[index] = (header_text, self.sections[index][1])
+                open_sections[id(tag.parent)] = self.sections[index]
+
+    def text(self, tag, separator=''):
+        """tag.get_text(separator, strip=True)"""
+        if tag.name in OWN_STRING_TAGS:
+            # Their strings aren't in the shared buffer
+            return tag.get_text(separator, strip=True)
+        start, end, _, _ = self.spans[id(tag)]
+        return separator.join(self.strings[start:end])
+
+    def html(self, tag):
+        """str(tag)"""
+        if self.pieces is None:
+            return str(tag)
+        _, _, start, end = self.spans[id(tag)]
+        return ''.join(self.pieces[start:end])
+
+    def find_all(self, *names):
+        """Tags with any of these names, in document order"""
+        if len(names) == 1:
+            return self.by_name.get(names[0], [])
+        return [tag for tag in self.tags if tag.name in names]
+
+    def section_texts(self):
+        """{header text: text of the elements after it, up to the next
+        header}. A header that appears twice keeps its first position and
+        its last content, as assigning into a dict in document order would."""
+        sections = {}
+        for header_text, siblings in self.sections:
+            if header_text is None:
+                continue
+            content = [self.text(sibling, '\n') for sibling in siblings]
+            sections[header_text] = '\n'.join(text for text in content if text)
+        return sections
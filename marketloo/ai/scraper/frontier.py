@@ -0,0 +1,185 @@
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+import os
+import re
+import sqlite3
+import time
+
+FRONTIER_PATH = "ai/scraper/data/frontier.sqlite"
+DEVPOST_URL = "https://devpost.com"
+
+# Lower is fetched first
+PRIORITIES = {'gallery': 0, 'project': 1, 'profile': 2, 'other': 3}
+
+# Query parameters devpost adds for its own analytics
+TRACKING_PARAMS = {'ref_content', 'ref_feature', 'ref_medium', 'ref_source'}
+
+# A scheme and host with another scheme straight after, as in
+# https://devpost.comhttps://devpost.com/software/...
+DOUBLED_PREFIX = re.compile(r'https?://[^/?#]*?(?=https?://)', re.IGNORECASE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS frontier (
+    url TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    priority INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    added_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS frontier_next ON frontier (state, priority, added_at);
+"""
+
+def canonicalize(url, base_url=DEVPOST_URL):
+    """One spelling per page: absolute, lowercase scheme and host, no
+    fragment, default port, tracking parameters or trailing slash, and
+    sorted query parameters.
+
+    Also repairs URLs mangled by a naive base + href join, like
+    https://devpost.comhttps://devpost.com/software/talktuahtaxer.
+    """
+    url = url.strip()
+    # Only a scheme and host glued straight onto another URL is a bad join;
+    # a URL further on, e.g. in a query parameter, is part of the page's
+    while True:
+        doubled = DOUBLED_PREFIX.match(url)
+        if not doubled:
+            break
+        url = url[doubled.end():]
+    parts = urlsplit(urljoin(base_url + '/', url))
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and (scheme, parts.port) not in [('http', 80), ('https', 443)]:
+        host = f"{host}:{parts.port}"
+    path = parts.path.rstrip('/') or '/'
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if k not in TRACKING_PARAMS and not k.startswith('utm_')))
+    return urlunsplit((scheme, host, path, query, ''))
+
+def page_kind(url):
+    """gallery, project, profile or other, from the shape of a devpost URL"""
+    parts = urlsplit(url)
+    path = parts.path.rstrip('/')
+    if path.endswith('/submissions/search') or path.endswith('/project-gallery') or path == '/submissions':
+        return 'gallery'
+    if path.startswith('/software/'):
+        return 'project'
+    if parts.hostname == 'devpost.com' and path.count('/') == 1 and len(path) > 1:
+        return 'profile'
+    return 'other'
+
+class Frontier:
+    """Persistent, deduplicating set of URLs to crawl.
+
+    Every URL is canonicalized and kept once, with its page kind, priority
+    and state (pending, done or failed). State lives in SQLite, so an
+    interrupted crawl can pick up its pending URLs on the next run; seen
+    URLs are also held in memory so membership checks don't touch disk.
+    Writes are batched: call commit() (or close the frontier) to persist
+    them.
+    """
+
+    def __init__(self, path=FRONTIER_PATH, base_url=DEVPOST_URL, max_attempts=3, commit_every=100):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.base_url = base_url
+        self.max_attempts = max_attempts
+        self.commit_every = commit_every
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.executescript(SCHEMA)
+        self.states = dict(self.db.execute("SELECT url, state FROM frontier"))
+        self.uncommitted = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, url):
+        return canonicalize(url, self.base_url) in self.states
+
+    def __len__(self):
+        return len(self.states)
+
+    def _changed(self):
+        self.uncommitted += 1
+        if self.uncommitted >= self.commit_every:
+            self.commit()
+
+    def commit(self):
+        self.db.commit()
+        self.uncommitted = 0
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def clear(self):
+        """Forget everything, for a crawl that starts from scratch"""
+        self.db.execute("DELETE FROM frontier")
+        self.db.commit()
+        self.states = {}
+
+    def add(self, url, kind=None):
+        """Add a URL if it hasn't been seen. Returns its canonical form, or
+        None if it was already in the frontier."""
+        url = canonicalize(url, self.base_url)
+        if url in self.states:
+            return None
+        kind = kind or page_kind(url)
+        now = time.time()
+        self.db.execute("INSERT OR IGNORE INTO frontier (url, kind, priority, added_at, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?)", (url, kind, PRIORITIES.get(kind, PRIORITIES['other']), now, now))
+        self.states[url] = 'pending'
+        self._changed()
+        return url
+
+    def state(self, url):
+        return self.states.get(canonicalize(url, self.base_url))
+
+    def urls(self, state, kinds=None, limit=None):
+        """URLs in a state, galleries first, then projects, then profiles,
+        optionally only of the given kinds"""
+        sql = "SELECT url FROM frontier WHERE state = ?"
+        params = [state]
+        if kinds is not None:
+            sql += f" AND kind IN ({', '.join('?' for _ in kinds)})"
+            params.extend(kinds)
+        sql += " ORDER BY priority, added_at"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [row[0] for row in self.db.execute(sql, params)]
+
+    def pending(self, kinds=None, limit=None):
+        return self.urls('pending', kinds, limit)
+
+    def done(self, url):
+        url = canonicalize(url, self.base_url)
+        self.db.execute("UPDATE frontier SET state = 'done', error = NULL, updated_at = ? WHERE url = ?",
+                        (time.time(), url))
+        self.states[url] = 'done'
+        self._changed()
+
+    def fail(self, url, error=None):
+        """Record a failed fetch. The URL stays pending until it has failed
+        max_attempts times."""
+        url = canonicalize(url, self.base_url)
+        self.db.execute("""
+            UPDATE frontier SET attempts = attempts + 1, error = ?, updated_at = ?,
+                state = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END
+            WHERE url = ?
+        """, (str(error) if error is not None else None, time.time(), self.max_attempts, url))
+        row = self.db.execute("SELECT state FROM frontier WHERE url = ?", (url,)).fetchone()
+        if row:
+            self.states[url] = row[0]
+        self._changed()
+
+    def counts(self):
+        """Number of URLs in each state"""
+        counts = {'pending': 0, 'done': 0, 'failed': 0}
+        for state in self.states.values():
+            counts[state] = counts.get(state, 0) + 1
+        return counts
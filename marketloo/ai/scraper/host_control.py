@@ -0,0 +1,127 @@
+from email.utils import parsedate_to_datetime
+import asyncio
+import random
+import time
+
+# Responses worth retrying: rate limits, server trouble and (status None)
+# timeouts or dropped connections
+RETRYABLE = {None, 429, 500, 502, 503, 504}
+
+def retry_delay(attempt, retry_after=None, base=0.5, cap=60.0):
+    """Honor Retry-After (seconds or an HTTP date) when the server sends it,
+    else jittered exponential backoff"""
+    if retry_after:
+        try:
+            return min(cap, max(0.0, float(retry_after)))
+        except ValueError:
+            try:
+                return min(cap, max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time()))
+            except (TypeError, ValueError):
+                pass
+    return min(cap, base * 2 ** attempt) * (0.5 + random.random() / 2)
+
+class AdaptiveLimiter:
+    """Async concurrency limit that adjusts itself with AIMD.
+
+    Every healthy response grows the limit by 1/limit, so it rises by about
+    one per round trip. A throttled or failed response, or one much slower
+    than the best latency seen, halves it, at most once per `cooldown`
+    seconds so one burst of errors doesn't collapse it to the minimum.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=16, slow_factor=3.0, cooldown=1.0):
+        self.limit = float(min(maximum, max(minimum, initial)))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.slow_factor = slow_factor
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.best_latency = None
+        self.decreased_at = 0.0
+        self.changed = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self.changed:
+            await self.changed.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        async with self.changed:
+            self.in_flight -= 1
+            self.changed.notify_all()
+
+    def record(self, latency, ok):
+        """Feed back one response: ok is False for throttling or failures"""
+        if ok and latency is not None:
+            self.best_latency = latency if self.best_latency is None else min(self.best_latency, latency)
+            ok = latency <= self.best_latency * self.slow_factor + 0.05
+        if ok:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        else:
+            self.backoff()
+
+    def backoff(self):
+        now = time.monotonic()
+        if now - self.decreased_at >= self.cooldown:
+            self.limit = max(self.minimum, self.limit / 2)
+            self.decreased_at = now
+
+class CircuitBreaker:
+    """Stops traffic to a host after `threshold` failures in a row.
+
+    While open, callers wait out the cool-down instead of sending requests.
+    After it, requests are let through again (half-open); one more failure
+    reopens the breaker for twice as long, a success closes it.
+    """
+
+    def __init__(self, threshold=5, reset_timeout=10.0, max_timeout=300.0):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.max_timeout = max_timeout
+        self.timeout = reset_timeout
+        self.failures = 0
+        self.open_until = 0.0
+        self.trips = 0
+
+    @property
+    def state(self):
+        if self.failures < self.threshold:
+            return 'closed'
+        return 'open' if time.monotonic() < self.open_until else 'half-open'
+
+    async def wait(self):
+        """Sleep until the breaker lets requests through"""
+        delay = self.open_until - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def record_success(self):
+        self.failures = 0
+        self.timeout = self.reset_timeout
+
+    def record_failure(self):
+        """Returns True if this failure opened the breaker"""
+        if self.failures >= self.threshold and time.monotonic() < self.open_until:
+            # Requests already in flight when it opened
+            return False
+        self.failures += 1
+        if self.failures < self.threshold:
+            return False
+        if self.failures > self.threshold:
+            # Failed again while half-open
+            self.timeout = min(self.max_timeout, self.timeout * 2)
+        self.open_until = time.monotonic() + self.timeout
+        self.trips += 1
+        return True
+
+    def hold(self, seconds):
+        """Keep the breaker shut for at least `seconds` (e.g. a Retry-After)"""
+        self.open_until = max(self.open_until, time.monotonic() + seconds)
+
+class HostControl:
+    """Adaptive limit plus circuit breaker for one host"""
+
+    def __init__(self, max_concurrency=8, **breaker_options):
+        self.limiter = AdaptiveLimiter(initial=max(1, max_concurrency // 2), maximum=max_concurrency)
+        self.breaker = CircuitBreaker(**breaker_options)
@@ -0,0 +1,27 @@
+from bs4 import BeautifulSoup
+import importlib.util
+import os
+
+# Tree builders in order of preference. lxml is compiled and several times
+# faster than the pure-Python html.parser, which is always available.
+BACKENDS = ['lxml', 'html.parser']
+
+def available_backends():
+    """Tree builders that can be used in this environment"""
+    return [b for b in BACKENDS if b == 'html.parser' or importlib.util.find_spec(b)]
+
+def default_backend():
+    """The SCRAPER_HTML_BACKEND override if set, else the fastest installed"""
+    override = os.getenv('SCRAPER_HTML_BACKEND')
+    if override:
+        if override not in available_backends():
+            print(f"HTML backend {override} is not installed, falling back")
+        else:
+            return override
+    return available_backends()[0]
+
+DEFAULT_BACKEND = default_backend()
+
+def make_soup(content, backend=None):
+    """Build a BeautifulSoup tree with the chosen (or default) backend"""
+    return BeautifulSoup(content, backend or DEFAULT_BACKEND)
@@ -0,0 +1,93 @@
+import json
+import os
+
+def read_jsonl(path):
+    """Yield records from a JSONL file, skipping lines a crash left torn"""
+    if not os.path.exists(path):
+        return
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                print(f"Skipping unreadable line in {path}")
+
+class JsonlSink:
+    """Append-only JSONL writer for parsed projects.
+
+    Each record is written as one line the moment it is produced and the file
+    is flushed every flush_every records, so a crash only loses the last few.
+    Keys (the 'url' field by default) already in the file are loaded on open
+    so a resumed run can skip them.
+    """
+
+    def __init__(self, path, key='url', flush_every=20):
+        self.path = path
+        self.key = key
+        self.flush_every = flush_every
+        self.seen = {record.get(key) for record in read_jsonl(path)}
+        self.seen.discard(None)
+        self.written = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, 'a', encoding='utf-8')
+        # Terminate a line torn by a crash so the next record starts clean
+        if self._file.tell() > 0:
+            with open(path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    self._file.write('\n')
+
+    def __contains__(self, key):
+        return key in self.seen
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.seen.add(record.get(self.key))
+        self.written += 1
+        if self.written % self.flush_every == 0:
+            self.flush()
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+def compact(jsonl_path, json_path, key='url'):
+    """Turn a JSONL file into the legacy indented JSON array.
+
+    When a key appears more than once the last record wins. Records are
+    streamed from disk, so only the keys are held in memory.
+    """
+    latest = {}
+    for i, record in enumerate(read_jsonl(jsonl_path)):
+        k = record.get(key)
+        latest[k if k is not None else ('line', i)] = i
+    keep = set(latest.values())
+
+    count = 0
+    tmp_path = f"{json_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write('[')
+        for i, record in enumerate(read_jsonl(jsonl_path)):
+            if i not in keep:
+                continue
+            f.write(',\n' if count else '\n')
+            f.write('  ' + json.dumps(record, indent=2).replace('\n', '\n  '))
+            count += 1
+        f.write('\n]' if count else ']')
+    os.replace(tmp_path, json_path)
+    return count
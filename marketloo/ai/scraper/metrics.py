@@ -0,0 +1,145 @@
+from contextlib import contextmanager
+import json
+import os
+import threading
+import time
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+def _format_labels(key):
+    if not key:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in key) + '}'
+
+class Metrics:
+    """Counters, gauges and timers for a pipeline run.
+
+    Timers keep count/sum/max per stage, gauges track things in flight, and
+    every page gets a record (stage, status, bytes, retries, ms). Pages
+    slower than slow_page_seconds are also kept in a slow-page log. The
+    whole lot can be written as a JSON snapshot or a Prometheus text file.
+    """
+
+    def __init__(self, slow_page_seconds=2.0, prefix='scraper'):
+        self.slow_page_seconds = slow_page_seconds
+        self.prefix = prefix
+        self.counters = {}
+        self.gauges = {}
+        self.timers = {}
+        self.pages = []
+        self.slow_pages = []
+        self.started = time.time()
+        self.lock = threading.Lock()
+
+    def inc(self, name, value=1, **labels):
+        with self.lock:
+            key = (name, _label_key(labels))
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        with self.lock:
+            self.gauges[(name, _label_key(labels))] = value
+
+    def add_gauge(self, name, delta, **labels):
+        with self.lock:
+            key = (name, _label_key(labels))
+            self.gauges[key] = self.gauges.get(key, 0) + delta
+
+    @contextmanager
+    def in_flight(self, name, **labels):
+        """Gauge that is raised for the duration of the with block"""
+        self.add_gauge(name, 1, **labels)
+        try:
+            yield
+        finally:
+            self.add_gauge(name, -1, **labels)
+
+    def observe(self, stage, seconds):
+        with self.lock:
+            timer = self.timers.setdefault(stage, {'count': 0, 'sum': 0.0, 'max': 0.0})
+            timer['count'] += 1
+            timer['sum'] += seconds
+            timer['max'] = max(timer['max'], seconds)
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def record_page(self, url, stage, seconds, status=None, size=0, retries=0):
+        """Record one page going through a stage"""
+        record = {
+            'url': url,
+            'stage': stage,
+            'status': status,
+            'bytes': size,
+            'retries': retries,
+            'ms': round(seconds * 1000, 2)
+        }
+        self.observe(stage, seconds)
+        with self.lock:
+            self.pages.append(record)
+            if seconds >= self.slow_page_seconds:
+                self.slow_pages.append(record)
+        if seconds >= self.slow_page_seconds:
+            print(f"Slow {stage}: {url} took {seconds:.2f}s")
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'started_at': self.started,
+                'elapsed_seconds': round(time.time() - self.started, 3),
+                'counters': [{'name': n, 'labels': dict(l), 'value': v}
+                             for (n, l), v in self.counters.items()],
+                'gauges': [{'name': n, 'labels': dict(l), 'value': v}
+                           for (n, l), v in self.gauges.items()],
+                'timers': {stage: dict(t) for stage, t in self.timers.items()},
+                'slow_pages': list(self.slow_pages),
+                'pages': list(self.pages)
+            }
+
+    def prometheus(self):
+        """Prometheus text exposition of the counters, gauges and timers"""
+        lines = []
+        with self.lock:
+            for kind, values in [('counter', self.counters), ('gauge', self.gauges)]:
+                seen = set()
+                for (name, labels), value in sorted(values.items()):
+                    metric = f"{self.prefix}_{name}"
+                    if metric not in seen:
+                        lines.append(f"# TYPE {metric} {kind}")
+                        seen.add(metric)
+                    lines.append(f"{metric}{_format_labels(labels)} {value}")
+            if self.timers:
+                metric = f"{self.prefix}_stage_seconds"
+                lines.append(f"# TYPE {metric} summary")
+                for stage, t in sorted(self.timers.items()):
+                    labels = _format_labels((('stage', stage),))
+                    lines.append(f"{metric}_count{labels} {t['count']}")
+                    lines.append(f"{metric}_sum{labels} {t['sum']:.6f}")
+                    lines.append(f"{self.prefix}_stage_max_seconds{labels} {t['max']:.6f}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, directory):
+        """Write metrics.json, metrics.prom and slow_pages.jsonl to directory"""
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, 'metrics.json'), 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, indent=2)
+        with open(os.path.join(directory, 'metrics.prom'), 'w', encoding='utf-8') as f:
+            f.write(self.prometheus())
+        with open(os.path.join(directory, 'slow_pages.jsonl'), 'w', encoding='utf-8') as f:
+            for record in self.slow_pages:
+                f.write(json.dumps(record) + '\n')
+
+    def summary(self):
+        """One line per stage for the console"""
+        lines = []
+        for stage, t in sorted(self.timers.items()):
+            mean = t['sum'] / t['count'] if t['count'] else 0
+            lines.append(f"{stage:10} {t['count']:>6} calls  total {t['sum']:8.2f}s  "
+                         f"mean {mean * 1000:8.1f}ms  max {t['max'] * 1000:8.1f}ms")
+        return '\n'.join(lines)
@@ -0,0 +1,328 @@
+import hashlib
+import mmap
+import os
+import struct
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+ARCHIVE_SUFFIX = '.arc'
+MAGIC = b'PGA1'
+CODECS = {'zlib': 0, 'zstd': 1}
+
+# Every record is a header followed by the compressed page:
+# magic, codec, compressed length, raw length, sha256 of the raw bytes
+HEADER = struct.Struct('<4sBQQ32s')
+# The index holds one fixed-width entry per record: sha256, offset, record
+# length, raw length
+INDEX_ENTRY = struct.Struct('<32sQQQ')
+
+def default_codec():
+    """zstd when the zstandard package is installed, zlib otherwise"""
+    return 'zstd' if zstandard is not None else 'zlib'
+
+def compress(data, codec):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return zlib.compress(data, 6)
+
+def decompress(data, codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("This archive has zstd records but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+class PageArchive:
+    """Append-only, compressed single-file store of pages keyed by sha256.
+
+    Records are appended to one data file and located through a
+    fixed-width offset index next to it, so a page is one seek into an
+    mmap rather than an open() of its own file. The headers carry enough
+    to rebuild the index, and a record torn by a crash mid-append is
+    dropped the next time the archive is written to. Bodies are
+    deduplicated by hash.
+
+    Opening an archive never changes it: only a writer holding the
+    archive's lock file (taken on the first put) truncates torn data or
+    extends the index, so readers in other processes can open it while it
+    is being written. read_only archives never take the lock.
+    """
+
+    def __init__(self, path, codec=None, read_only=False):
+        self.path = path
+        self.index_path = path + '.idx'
+        self.lock_path = path + '.lock'
+        self.codec = codec or default_codec()
+        self.read_only = read_only
+        self.entries = {}
+        self.end = 0
+        self._lock = None
+        self._writer = None
+        self._index_writer = None
+        self._file = None
+        self._map = None
+        self._load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, digest):
+        return digest in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def _load(self, recover=False):
+        """Read the index and pick up complete records appended after it.
+        With recover (only while holding the lock), also drop torn data and
+        write the picked-up records to the index."""
+        self.entries, self.end = {}, 0
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'rb') as f:
+                data = f.read()
+            usable = len(data) - len(data) % INDEX_ENTRY.size
+            for digest, offset, length, raw_length in INDEX_ENTRY.iter_unpack(data[:usable]):
+                self.entries[digest.hex()] = (offset, length, raw_length)
+                self.end = max(self.end, offset + length)
+            if recover and usable != len(data):
+                self._truncate(self.index_path, usable)
+        if not os.path.exists(self.path):
+            return
+
+        size = os.path.getsize(self.path)
+        if self.end > size:
+            # The index is ahead of the data, so rebuild it from the headers
+            self.entries, self.end = {}, 0
+            if recover:
+                print(f"Rebuilding the index of {self.path}")
+                self._truncate(self.index_path, 0)
+
+        recovered = []
+        with open(self.path, 'rb') as f:
+            offset = self.end
+            while offset + HEADER.size <= size:
+                f.seek(offset)
+                magic, _, compressed_length, raw_length, digest = HEADER.unpack(f.read(HEADER.size))
+                length = HEADER.size + compressed_length
+                if magic != MAGIC or offset + length > size:
+                    break
+                self.entries.setdefault(digest.hex(), (offset, length, raw_length))
+                recovered.append(INDEX_ENTRY.pack(digest, offset, length, raw_length))
+                offset += length
+        self.end = offset
+        if not recover:
+            # Anything past here is torn or still being written by another
+            # process; leave it to the writer
+            return
+        if offset < size:
+            print(f"Dropping {size - offset} bytes of torn data from {self.path}")
+            self._truncate(self.path, offset)
+        if recovered:
+            with open(self.index_path, 'ab') as f:
+                f.write(b''.join(recovered))
+
+    def _acquire_lock(self):
+        if self._lock is not None:
+            return
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._lock = open(self.lock_path, 'a')
+        if fcntl is None:
+            return
+        try:
+            fcntl.flock(self._lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            print(f"Waiting for another process writing to {self.path}")
+            fcntl.flock(self._lock.fileno(), fcntl.LOCK_EX)
+
+    def _release_lock(self):
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+
+    @staticmethod
+    def _truncate(path, size):
+        with open(path, 'r+b') as f:
+            f.truncate(size)
+
+    def _open_writers(self):
+        if self.read_only:
+            raise PermissionError(f"{self.path} was opened read-only")
+        if self._writer is None:
+            self._acquire_lock()
+            # Other writers may have appended since we loaded, or crashed
+            # mid-record; with the lock held, a torn tail really is torn
+            self._load(recover=True)
+            self._writer = open(self.path, 'ab')
+            self._index_writer = open(self.index_path, 'ab')
+
+    def put(self, data):
+        """Append a page (bytes) unless it is already stored. Returns its sha256."""
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in self.entries:
+            return digest
+        self._open_writers()
+        payload = compress(data, self.codec)
+        record = HEADER.pack(MAGIC, CODECS[self.codec], len(payload), len(data), bytes.fromhex(digest))
+        self._writer.write(record + payload)
+        length = HEADER.size + len(payload)
+        self._index_writer.write(INDEX_ENTRY.pack(bytes.fromhex(digest), self.end, length, len(data)))
+        self.entries[digest] = (self.end, length, len(data))
+        self.end += length
+        return digest
+
+    def _view(self, end):
+        """An mmap covering at least the first `end` bytes of the data file"""
+        if self._map is None or len(self._map) < end:
+            if self._writer is not None:
+                self._writer.flush()
+            if self._map is not None:
+                self._map.close()
+                self._file.close()
+            self._file = open(self.path, 'rb')
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _decode(self, view, offset, length):
+        _, codec, _, _, _ = HEADER.unpack_from(view, offset)
+        codec = 'zstd' if codec == CODECS['zstd'] else 'zlib'
+        return decompress(view[offset + HEADER.size:offset + length], codec)
+
+    def get(self, digest):
+        """The stored bytes for a sha256, or None"""
+        entry = self.entries.get(digest)
+        if entry is None:
+            return None
+        offset, length, _ = entry
+        return self._decode(self._view(offset + length), offset, length)
+
+    def raw_size(self, digest):
+        entry = self.entries.get(digest)
+        return entry[2] if entry else None
+
+    def stored_bytes(self, digests=None):
+        """Bytes on disk taken by the given records (default: all of them)"""
+        digests = self.entries if digests is None else digests
+        return sum(self.entries[d][1] for d in digests if d in self.entries)
+
+    def ref(self, digest):
+        """A string naming one record, usable with read_page()"""
+        return f"{self.path}#{digest}"
+
+    def __iter__(self):
+        """(sha256, bytes) for every record, in file order"""
+        if not self.entries:
+            return
+        view = self._view(self.end)
+        for digest, (offset, length, _) in sorted(self.entries.items(), key=lambda item: item[1][0]):
+            yield digest, self._decode(view, offset, length)
+
+    def flush(self):
+        if self._writer is not None:
+            for f in [self._writer, self._index_writer]:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def compact(self, keep):
+        """Rewrite the archive with only the records whose sha256 is in
+        keep. Returns the number of bytes reclaimed."""
+        self._open_writers()
+        before = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        for leftover in [self.path + '.tmp', self.path + '.tmp.idx']:
+            if os.path.exists(leftover):
+                os.remove(leftover)
+        tmp = PageArchive(self.path + '.tmp', self.codec)
+        for digest, (offset, length, raw_length) in sorted(self.entries.items(), key=lambda item: item[1][0]):
+            if digest not in keep:
+                continue
+            # Records are copied as they are, without recompressing
+            view = self._view(offset + length)
+            tmp._open_writers()
+            tmp._writer.write(view[offset:offset + length])
+            tmp._index_writer.write(INDEX_ENTRY.pack(bytes.fromhex(digest), tmp.end, length, raw_length))
+            tmp.entries[digest] = (tmp.end, length, raw_length)
+            tmp.end += length
+        tmp.flush()
+        tmp.close()
+        self._close_files()
+        for src, dst in [(tmp.path, self.path), (tmp.index_path, self.index_path)]:
+            if os.path.exists(src):
+                os.replace(src, dst)
+            elif os.path.exists(dst):
+                os.remove(dst)
+        if os.path.exists(tmp.lock_path):
+            os.remove(tmp.lock_path)
+        self.entries, self.end = tmp.entries, tmp.end
+        self._release_lock()
+        return before - self.end
+
+    def close(self):
+        self._close_files()
+        self._release_lock()
+
+    def _close_files(self):
+        self.flush()
+        for f in [self._writer, self._index_writer]:
+            if f is not None:
+                f.close()
+        self._writer = self._index_writer = None
+        if self._map is not None:
+            self._map.close()
+            self._file.close()
+        self._map = self._file = None
+
+_readers = {}
+
+def is_archive_ref(source):
+    path, _, digest = source.rpartition('#')
+    return path.endswith(ARCHIVE_SUFFIX) and len(digest) == 64
+
+def _reader(path):
+    # Each parse worker process keeps its own read-only view per archive
+    archive = _readers.get(path)
+    if archive is None:
+        archive = _readers[path] = PageArchive(path, read_only=True)
+    return archive
+
+def read_page(source):
+    """HTML for an archive ref (path.arc#sha256) or a plain file path"""
+    if is_archive_ref(source):
+        path, _, digest = source.rpartition('#')
+        archive = _reader(path)
+        data = archive.get(digest)
+        if data is None:
+            # Written after this process opened the archive
+            archive.close()
+            archive = _readers[path] = PageArchive(path, read_only=True)
+            data = archive.get(digest)
+        if data is None:
+            raise FileNotFoundError(source)
+        return data.decode('utf-8')
+    with open(source, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def page_digest(source):
+    """sha256 of a page's bytes. Free for archive refs, which carry it."""
+    if is_archive_ref(source):
+        return source.rpartition('#')[2]
+    with open(source, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def page_size(source):
+    """Uncompressed size of an archive ref or a plain file"""
+    if is_archive_ref(source):
+        path, _, digest = source.rpartition('#')
+        return _reader(path).raw_size(digest) or 0
+    return os.path.getsize(source)
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import time
+from page_archive import PageArchive, read_page
+
+CACHE_DIR = "ai/scraper/data/page_cache"
+
+# Rewrite the archive once more than this share of it is evicted pages
+COMPACT_RATIO = 0.5
+
+class PageCache:
+    """Content-addressed on-disk cache of downloaded pages.
+
+    The index maps each URL to its validators (ETag / Last-Modified) and the
+    sha256 of its body. Bodies are compressed into a single append-only
+    PageArchive keyed by that hash, so a page that comes back byte-identical
+    is never written twice. Bodies from older caches, stored as one file per
+    hash under objects/, are still read and are moved into the archive by
+    migrate().
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self.objects_dir = os.path.join(cache_dir, 'objects')
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        self.archive = PageArchive(os.path.join(cache_dir, 'pages.arc'))
+        self.index = {}
+        self.dirty = False
+        if os.path.exists(self.index_path):
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], f"{digest}.html")
+
+    def _has_body(self, digest):
+        return digest in self.archive or os.path.exists(self._object_path(digest))
+
+    def conditional_headers(self, url):
+        """Headers for a conditional GET of a previously cached URL"""
+        entry = self.index.get(url)
+        headers = {}
+        if entry and self._has_body(entry['sha256']):
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def path_for(self, url):
+        """Where a URL's body lives: an archive ref (pages.arc#sha256) or,
+        for unmigrated caches, a file. Either can be passed to read_page()."""
+        entry = self.index.get(url)
+        if not entry:
+            return None
+        if entry['sha256'] in self.archive:
+            return self.archive.ref(entry['sha256'])
+        return self._object_path(entry['sha256'])
+
+    def read(self, url):
+        path = self.path_for(url)
+        if not path or not self._has_body(self.index[url]['sha256']):
+            return None
+        self.archive.flush()
+        return read_page(path)
+
+    def paths(self):
+        """(url, path) pairs for every cached page whose body is stored"""
+        return [(url, self.path_for(url)) for url, entry in self.index.items()
+                if self._has_body(entry['sha256'])]
+
+    def touch(self, url):
+        """Record that a URL was revalidated without change"""
+        if url in self.index:
+            self.index[url]['checked_at'] = time.time()
+            self.dirty = True
+
+    def store(self, url, body, headers=None):
+        """Cache a fetched body. Returns True if the content changed."""
+        headers = headers or {}
+        data = body.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        previous = self.index.get(url)
+        changed = previous is None or previous['sha256'] != digest
+
+        if not self._has_body(digest):
+            self.archive.put(data)
+
+        now = time.time()
+        self.index[url] = {
+            'sha256': digest,
+            'size': len(data),
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'fetched_at': now if changed else previous['fetched_at'],
+            'checked_at': now
+        }
+        self.dirty = True
+        return changed
+
+    def migrate(self):
+        """Move one-file-per-page bodies into the archive. Returns the
+        number of files moved."""
+        moved = 0
+        for entry in self.index.values():
+            path = self._object_path(entry['sha256'])
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    self.archive.put(f.read())
+                moved += 1
+        if moved:
+            self.archive.flush()
+            self._collect_garbage()
+        return moved
+
+    def evict(self, max_bytes=None, max_age=None):
+        """Drop entries older than max_age seconds, then the least recently
+        checked ones until the cache fits in max_bytes. Returns the number of
+        entries removed."""
+        removed = 0
+        if max_age is not None:
+            cutoff = time.time() - max_age
+            for url in [u for u, e in self.index.items() if e['checked_at'] < cutoff]:
+                del self.index[url]
+                removed += 1
+
+        if max_bytes is not None:
+            # Objects can be shared between URLs, so only count them once
+            refs = {}
+            sizes = {}
+            for entry in self.index.values():
+                refs[entry['sha256']] = refs.get(entry['sha256'], 0) + 1
+                sizes[entry['sha256']] = entry['size']
+            total = sum(sizes.values())
+            for url, entry in sorted(self.index.items(), key=lambda item: item[1]['checked_at']):
+                if total <= max_bytes:
+                    break
+                del self.index[url]
+                removed += 1
+                refs[entry['sha256']] -= 1
+                if refs[entry['sha256']] == 0:
+                    total -= entry['size']
+
+        if removed:
+            self.dirty = True
+            self._collect_garbage()
+        return removed
+
+    def _collect_garbage(self):
+        """Delete bodies no longer referenced by the index. Old object files
+        go straight away; the archive is rewritten once enough of it is dead."""
+        live = {entry['sha256'] for entry in self.index.values()}
+        if os.path.exists(self.objects_dir):
+            for root, _, files in os.walk(self.objects_dir):
+                for name in files:
+                    if name.endswith('.html') and (name[:-len('.html')] not in live
+                                                   or name[:-len('.html')] in self.archive):
+                        os.remove(os.path.join(root, name))
+        stored = self.archive.stored_bytes()
+        if stored and stored - self.archive.stored_bytes(live & set(self.archive.entries)) > stored * COMPACT_RATIO:
+            self.archive.compact(live)
+
+    def save(self):
+        self.archive.flush()
+        if not self.dirty:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.index, f)
+        os.replace(tmp_path, self.index_path)
+        self.dirty = False
+
+    def close(self):
+        """Save the index and close the archive, releasing its write lock"""
+        self.save()
+        self.archive.close()
@@ -1,116 +1,149 @@
-from bs4 import BeautifulSoup
-import requests
-import json
+import argparse
+import asyncio
 import os
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import traceback
-from parse_projects import parse_saved_html_file
+from contextlib import ExitStack
+from parse_projects import EXTRACTOR_VERSION, parse_html_files
+from parse_cache import ParseCache
+from crawler import get_project_urls
+from page_cache import PageCache
+from jsonl_sink import JsonlSink, compact
+from project_store import ProjectStore
+from metrics import Metrics
+from frontier import Frontier
+from scheduler import BatchScheduler, hackathon_slug
+
+CACHE_MAX_BYTES = 500 * 1024 * 1024
+CACHE_MAX_AGE = 30 * 24 * 3600
+OUTPUT_JSONL = 'ai/scraper/data/new_final.jsonl'
+OUTPUT_JSON = 'ai/scraper/data/new_final.json'
+METRICS_DIR = 'ai/scraper/data/metrics'
+BATCH_DIR = 'ai/scraper/data/hackathons'
+HACKATHON_URL = "https://brainrot-jia-seed-hackathon.devpost.com"
 
 def get_all_project_urls(hackathon_url):
     """Get URLs of all projects from the hackathon gallery"""
-    projects = []
-    page = 1
-    while True:
-        url = f"{hackathon_url}/submissions/search?page={page}"
-        response = requests.get(url)
-        if response.status_code != 200:
-            break
-            
-        soup = BeautifulSoup(response.text, 'html.parser')
-        entries = soup.find_all('a', class_='block-wrapper-link')
-        
-        if not entries:
-            break
-            
-        for entry in entries:
-            href = entry.get('href')
-            if href:
-                project_url = 'https://devpost.com' + href if not href.startswith('http') else href
-                projects.append(project_url)
-                
-        page += 1
-        print(f"Found {len(projects)} projects on page {page-1}")
-        
-    return projects
+    return get_project_urls(hackathon_url)
 
-def download_project_page(url):
-    """Download and save raw HTML for a project page"""
-    try:
-        print(f"Downloading {url}...")
-        response = requests.get(url)
-        if response.status_code != 200:
-            print(f"Failed to fetch {url}: {response.status_code}")
-            return None
-            
-        # Create a safe filename from the URL
-        safe_filename = url.split('/')[-1].replace('-', '_')
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        filename = f"ai/scraper/data/raw_html/{safe_filename}_{timestamp}.html"
-        
-        # Save the raw HTML
-        os.makedirs('ai/scraper/data/raw_html', exist_ok=True)
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(response.text)
-            
-        print(f"Saved {url} to {filename}")
-        return filename
-        
-    except Exception as e:
-        print(f"Error downloading {url}: {str(e)}")
-        print(traceback.format_exc())
-        return None
+def output_paths(hackathon_url, partitioned):
+    """(jsonl, json) outputs for a hackathon. A single hackathon writes the
+    legacy new_final files; a batch gets one directory per hackathon."""
+    if not partitioned:
+        return OUTPUT_JSONL, OUTPUT_JSON
+    directory = os.path.join(BATCH_DIR, hackathon_slug(hackathon_url))
+    return os.path.join(directory, 'projects.jsonl'), os.path.join(directory, 'projects.json')
 
-def main():
-    hackathon_url = "https://brainrot-jia-seed-hackathon.devpost.com"
-    
-    # Step 1: Get all project URLs
-    print("Getting project URLs...")
-    project_urls = get_all_project_urls(hackathon_url)
-    print(f"Found {len(project_urls)} total projects")
-    
-    # Step 2: Download all HTML files in parallel
-    print("\nDownloading project pages...")
-    html_files = []
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_url = {executor.submit(download_project_page, url): url 
-                        for url in project_urls}
-        
-        for future in as_completed(future_to_url):
-            url = future_to_url[future]
-            try:
-                filename = future.result()
-                if filename:
-                    html_files.append(filename)
-            except Exception as e:
-                print(f"Failed to download {url}: {str(e)}")
-    
-    print(f"\nDownloaded {len(html_files)} HTML files")
-    
-    # Step 3: Parse all HTML files into JSON using parse_projects.py
-    print("\nParsing HTML files...")
-    projects = []
-    with ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_file = {executor.submit(parse_saved_html_file, filename): filename 
-                         for filename in html_files}
-        
-        for future in as_completed(future_to_file):
-            filename = future_to_file[future]
-            try:
-                project = future.result()
-                if project:
-                    projects.append(project)
-                    print(f"Parsed {filename}")
-            except Exception as e:
-                print(f"Failed to parse {filename}: {str(e)}")
-    
-    # Step 4: Save final JSON
-    output_path = 'ai/scraper/data/new_final.json'
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(projects, f, indent=2)
-        
-    print(f"\nSaved {len(projects)} projects to {output_path}")
-    print(f"Raw HTML files are saved in ai/scraper/data/raw_html/")
+def main(hackathon_urls=None, workers=None, full=False, resume=False, metrics_dir=METRICS_DIR,
+         max_connections=50, max_per_host=8, use_parse_cache=True):
+    hackathon_urls = [h.rstrip('/') for h in hackathon_urls or [HACKATHON_URL]]
+    partitioned = len(hackathon_urls) > 1
+    metrics = Metrics()
+    with PageCache() as cache:
+        # Start each output over unless resuming an interrupted run; the
+        # unchanged pages are parsed back in (from the parse cache) below
+        if not resume:
+            for hackathon_url in hackathon_urls:
+                jsonl_path = output_paths(hackathon_url, partitioned)[0]
+                if os.path.exists(jsonl_path):
+                    os.remove(jsonl_path)
+        sinks = {h: JsonlSink(output_paths(h, partitioned)[0]) for h in hackathon_urls}
+        frontier = Frontier()
+
+        # Steps 1 & 2: Walk the galleries and download new or changed project
+        # pages, all hackathons sharing one set of connection budgets. When
+        # resuming, projects already in the output or fetched by the
+        # interrupted crawl aren't fetched at all, and its pending pages are.
+        print(f"Crawling {len(hackathon_urls)} hackathon(s) and downloading project pages...")
+        skip = None
+        if resume:
+            skip = lambda url: any(url in sink for sink in sinks.values())
+        else:
+            frontier.clear()
+        scheduler = BatchScheduler(hackathon_urls, cache, metrics=metrics, frontier=frontier,
+                                   max_connections=max_connections, max_per_host=max_per_host)
+        with frontier, metrics.timer('crawl'):
+            partitions = asyncio.run(scheduler.run(skip))
+            counts = frontier.counts()
+
+        print(f"\n{scheduler.progress()}")
+        print(f"Frontier: {counts['done']} done, {counts['pending']} pending, {counts['failed']} failed")
+
+        # Step 3: Parse the changed HTML files using parse_projects.py, plus any
+        # cached pages missing from a hackathon's output (unchanged ones, or ones
+        # an interrupted run downloaded but never parsed). Cache files are
+        # content-addressed, so several URLs can share one file, and one pool
+        # parses the whole batch.
+        print("\nParsing HTML files...")
+        to_parse = {}
+        for hackathon_url, (changed, unchanged) in partitions.items():
+            for url, filename in changed:
+                to_parse.setdefault(filename, []).append((hackathon_url, url))
+            for url in unchanged:
+                if url not in sinks[hackathon_url]:
+                    to_parse.setdefault(cache.path_for(url), []).append((hackathon_url, url))
+
+        # Step 4: Stream each project to its hackathon's JSONL output and the
+        # project store as it is parsed. Pages this extractor version has parsed
+        # before come from the parse cache.
+        parse_cache = ParseCache() if use_parse_cache else None
+        if parse_cache is not None:
+            parse_cache.prune(EXTRACTOR_VERSION)
+        with ExitStack() as stack, ProjectStore() as store:
+            for sink in sinks.values():
+                stack.enter_context(sink)
+            if parse_cache is not None:
+                stack.enter_context(parse_cache)
+            for filename, project in parse_html_files(to_parse, workers, full, metrics, parse_cache):
+                if not project:
+                    continue
+                for hackathon_url, url in to_parse[filename]:
+                    with metrics.timer('save'):
+                        sinks[hackathon_url].write(dict(project, url=url))
+                        store.upsert_project(dict(project, url=url), hackathon_url)
+                    print(f"Parsed {url}")
+
+        cache.migrate()
+        evicted = cache.evict(max_bytes=CACHE_MAX_BYTES, max_age=CACHE_MAX_AGE)
+        cache.save()
+
+        # Step 5: Compact into the legacy JSON arrays
+        print()
+        for hackathon_url, sink in sinks.items():
+            jsonl_path, json_path = output_paths(hackathon_url, partitioned)
+            count = compact(jsonl_path, json_path)
+            print(f"Saved {count} projects to {json_path} ({sink.written} written this run)")
+        print(f"Raw HTML is cached in {cache.cache_dir} ({evicted} entries evicted)")
+
+        metrics.write(metrics_dir)
+        print(f"\n{metrics.summary()}")
+        print(f"Metrics written to {metrics_dir}")
+
+def read_hackathon_list(path):
+    """Hackathon URLs from a file, one per line, ignoring blanks and # comments"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith('#')]
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Crawl and parse hackathon galleries")
+    parser.add_argument('hackathons', nargs='*',
+                        help=f"Hackathon URLs to crawl (default: {HACKATHON_URL})")
+    parser.add_argument('--hackathon-file',
+                        help="File with one hackathon URL per line, added to the ones given")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Parser processes to use (default: CPU count)")
+    parser.add_argument('--full', action='store_true',
+                        help="Also dump every element on the page (slow, for debugging)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Pick up an interrupted crawl, skipping projects already fetched or in the output")
+    parser.add_argument('--metrics-dir', default=METRICS_DIR,
+                        help="Where to write metrics.json, metrics.prom and slow_pages.jsonl")
+    parser.add_argument('--no-parse-cache', action='store_true',
+                        help="Reparse every page instead of reusing cached results")
+    parser.add_argument('--max-connections', type=int, default=50,
+                        help="Open connections across the whole batch")
+    parser.add_argument('--max-per-host', type=int, default=8,
+                        help="Concurrent requests to any one host")
+    args = parser.parse_args()
+    
+    hackathons = args.hackathons + (read_hackathon_list(args.hackathon_file) if args.hackathon_file else [])
+    main(hackathons, args.workers, args.full, args.resume, args.metrics_dir,
+         args.max_connections, args.max_per_host, not args.no_parse_cache)
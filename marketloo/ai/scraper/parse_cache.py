@@ -0,0 +1,78 @@
+import json
+import os
+import sqlite3
+import time
+
+CACHE_PATH = "ai/scraper/data/parse_cache.sqlite"
+
+class ParseCache:
+    """Persistent memo of parsed project records in SQLite.
+
+    Entries are keyed on the sha256 of the page HTML, the extractor version
+    (see parse_projects.EXTRACTOR_VERSION) and whether it was a full parse,
+    so a page is only handed to BeautifulSoup again when its bytes or the
+    extraction code change. Writes are batched: call commit() (or close the
+    cache) to persist them.
+    """
+
+    def __init__(self, path=CACHE_PATH, commit_every=100):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.commit_every = commit_every
+        self.uncommitted = 0
+        self.hits = 0
+        self.misses = 0
+        self.db = sqlite3.connect(path)
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS parsed (
+                html_sha256 TEXT NOT NULL,
+                version TEXT NOT NULL,
+                full INTEGER NOT NULL,
+                record TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (html_sha256, version, full)
+            )
+        """)
+        self.db.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def get(self, digest, version, full=False):
+        """The cached record, or None on a miss"""
+        row = self.db.execute("SELECT record FROM parsed WHERE html_sha256 = ? AND version = ? AND full = ?",
+                              (digest, version, int(full))).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, digest, version, full, record):
+        self.db.execute("INSERT OR REPLACE INTO parsed VALUES (?, ?, ?, ?, ?)",
+                        (digest, version, int(full), json.dumps(record, ensure_ascii=False), time.time()))
+        self.uncommitted += 1
+        if self.uncommitted >= self.commit_every:
+            self.commit()
+
+    def prune(self, version):
+        """Drop records made by any other extractor version"""
+        removed = self.db.execute("DELETE FROM parsed WHERE version != ?", (version,)).rowcount
+        self.db.commit()
+        return removed
+
+    def stats(self):
+        size = self.db.execute("SELECT COUNT(*) FROM parsed").fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'entries': size}
+
+    def commit(self):
+        self.db.commit()
+        self.uncommitted = 0
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
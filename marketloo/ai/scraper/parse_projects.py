@@ -1,184 +1,276 @@
-from bs4 import BeautifulSoup
+import hashlib
 import json
 import time
 import traceback
 import os
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import bs4
+from page_cache import PageCache
+from page_archive import read_page, page_digest, page_size
+from parse_cache import ParseCache
+from html_backend import DEFAULT_BACKEND, make_soup
+from jsonl_sink import JsonlSink, compact
+from document_walk import DocumentWalk
 
-def parse_project_html(content):
-    """Parse EVERYTHING from the HTML content"""
+# Which fields to pull out of a project page. Each rule names a CSS selector
+# and how to turn the matched elements into a value; set 'html': True on a
+# rule to also keep the serialized elements under '<field>_html'.
+PROJECT_SPEC = {
+    'title': {'selector': '#app-title', 'type': 'text'},
+    'tagline': {'selector': '#software-header p.large', 'type': 'text'},
+    'sections': {'selector': '#app-details-left > div:not([id])', 'type': 'sections'},
+    'technologies': {'selector': '#built-with .cp-tag', 'type': 'text_list'},
+    'links': {'selector': '[data-role="software-urls"] a', 'type': 'links'},
+    'team_members': {'selector': '#app-team .software-team-member', 'type': 'team'},
+    'prizes': {'selector': '#submissions .software-list-content', 'type': 'prizes'}
+}
+
+def extract_text(elements):
+    return elements[0].get_text(strip=True) if elements else ''
+
+def extract_text_list(elements):
+    return [text for text in (e.get_text(strip=True) for e in elements) if text]
+
+def extract_links(elements):
+    return [{'text': a.get_text(strip=True), 'url': a.get('href')}
+            for a in elements if a.get('href')]
+
+def extract_sections(elements):
+    """Map each header to the text that follows it, up to the next header"""
+    sections = {}
+    for container in elements:
+        sections.update(DocumentWalk(container).section_texts())
+    return sections
+
+def extract_team(elements):
+    team = []
+    for member in elements:
+        profile_links = member.select('a.user-profile-link')
+        name = next((a.get_text(strip=True) for a in profile_links if a.get_text(strip=True)), '')
+        contribution = member.select_one('.bubble')
+        team.append({
+            'name': name,
+            'profile_url': profile_links[0].get('href') if profile_links else None,
+            'contribution': contribution.get_text(strip=True) if contribution else ''
+        })
+    return team
+
+def extract_prizes(elements):
+    """Hackathons the project was submitted to and any prizes it won there"""
+    submissions = []
+    for entry in elements:
+        hackathon = entry.find('a')
+        won = []
+        for li in entry.find_all('li'):
+            if li.find(class_='winner'):
+                won.append(li.get_text(' ', strip=True).replace('Winner', '', 1).strip())
+        submissions.append({
+            'hackathon': hackathon.get_text(strip=True) if hackathon else '',
+            'hackathon_url': hackathon.get('href') if hackathon else None,
+            'won': won
+        })
+    return submissions
+
+EXTRACTORS = {
+    'text': extract_text,
+    'text_list': extract_text_list,
+    'links': extract_links,
+    'sections': extract_sections,
+    'team': extract_team,
+    'prizes': extract_prizes
+}
+
+def parse_project_html(content, spec=None, full=False, backend=None):
+    """Extract the fields in spec (PROJECT_SPEC by default) from the HTML content.
+
+    Only the traversals the spec asks for are run. full=True additionally
+    dumps everything on the page under 'everything', which is slow and
+    large, for debugging.
+    backend picks the HTML tree builder (see html_backend).
+    """
     try:
-        soup = BeautifulSoup(content, 'html.parser')
+        soup = make_soup(content, backend)
         
-        # Initialize project dictionary
-        project = {
-            'scraped_at': time.strftime("%Y-%m-%d %H:%M:%S"),
-            'raw_data': {}  # We'll store everything here
-        }
+        project = {'scraped_at': time.strftime("%Y-%m-%d %H:%M:%S")}
+        for field, rule in (spec or PROJECT_SPEC).items():
+            elements = soup.select(rule['selector'])
+            project[field] = EXTRACTORS[rule['type']](elements)
+            if rule.get('html'):
+                project[f"{field}_html"] = [str(e) for e in elements]
+        
+        if full:
+            # Nested so the dump's own 'links' etc. don't replace the spec's fields
+            project['everything'] = parse_everything(soup)
+        
+        return project
+        
+    except Exception as e:
+        print(f"Error parsing project: {str(e)}")
+        print(traceback.format_exc())
+        return None
+
+def parse_everything(soup):
+    """Parse EVERYTHING from the soup (debug mode)"""
+    # One walk over the page gives every element's text and HTML
+    walk = DocumentWalk(soup, html=True)
+    project = {
+        'raw_data': {}  # We'll store everything here
+    }
 
-        # Get literally everything with an ID
-        for element in soup.find_all(id=True):
+    # Get literally everything with an ID
+    for element in walk.tags:
+        if element.get('id') is not None:
             project['raw_data'][element['id']] = {
                 'tag': element.name,
-                'text': element.get_text(separator='\n', strip=True),
+                'text': walk.text(element, '\n'),
                 'classes': element.get('class', []),
                 'attributes': {k:v for k,v in element.attrs.items() if k != 'class'},
-                'html': str(element)
+                'html': walk.html(element)
             }
 
-        # Get all headers and their content
-        headers = {}
-        for h in soup.find_all(['h1', 'h2', 'h3', 'h4', 'h5', 'h6']):
-            header_text = h.get_text(strip=True)
-            if header_text:
-                # Get all content until next header
-                content = []
-                for sibling in h.next_siblings:
-                    if sibling.name in ['h1', 'h2', 'h3', 'h4', 'h5', 'h6']:
-                        break
-                    if sibling.name:  # Only get elements with tags
-                        content.append({
-                            'tag': sibling.name,
-                            'text': sibling.get_text(separator='\n', strip=True),
-                            'classes': sibling.get('class', []),
-                            'html': str(sibling)
-                        })
-                headers[header_text] = content
-
-        project['headers'] = headers
-
-        # Get all divs with classes
-        project['divs'] = {}
-        for div in soup.find_all('div', class_=True):
-            for class_name in div.get('class', []):
-                if class_name not in project['divs']:
-                    project['divs'][class_name] = []
-                project['divs'][class_name].append({
-                    'text': div.get_text(separator='\n', strip=True),
-                    'html': str(div),
-                    'attributes': {k:v for k,v in div.attrs.items() if k != 'class'}
-                })
+    # Get all headers and their content
+    headers = {}
+    for header_text, siblings in walk.sections:
+        if header_text:
+            headers[header_text] = [{
+                'tag': sibling.name,
+                'text': walk.text(sibling, '\n'),
+                'classes': sibling.get('class', []),
+                'html': walk.html(sibling)
+            } for sibling in siblings]
 
-        # Get all meta tags
-        project['meta'] = {}
-        for meta in soup.find_all('meta'):
-            name = meta.get('name') or meta.get('property') or meta.get('http-equiv')
-            if name:
-                project['meta'][name] = meta.get('content')
-
-        # Get all links
-        project['links'] = []
-        for a in soup.find_all('a'):
-            project['links'].append({
-                'text': a.get_text(strip=True),
-                'href': a.get('href'),
-                'classes': a.get('class', []),
-                'id': a.get('id'),
-                'html': str(a)
-            })
+    project['headers'] = headers
 
-        # Get all images
-        project['images'] = []
-        for img in soup.find_all('img'):
-            project['images'].append({
-                'src': img.get('src'),
-                'alt': img.get('alt'),
-                'classes': img.get('class', []),
-                'id': img.get('id'),
-                'html': str(img)
-            })
+    # Get all divs with classes. A div with several classes shares one entry.
+    project['divs'] = {}
+    for div in walk.find_all('div'):
+        if div.get('class') is None:
+            continue
+        entry = {
+            'text': walk.text(div, '\n'),
+            'html': walk.html(div),
+            'attributes': {k:v for k,v in div.attrs.items() if k != 'class'}
+        }
+        for class_name in div.get('class', []):
+            project['divs'].setdefault(class_name, []).append(entry)
 
-        # Get all forms
-        project['forms'] = []
-        for form in soup.find_all('form'):
-            project['forms'].append({
-                'action': form.get('action'),
-                'method': form.get('method'),
-                'classes': form.get('class', []),
-                'id': form.get('id'),
-                'inputs': [{'type': i.get('type'), 'name': i.get('name'), 'id': i.get('id')} 
-                          for i in form.find_all('input')],
-                'html': str(form)
-            })
+    # Get all meta tags
+    project['meta'] = {}
+    for meta in walk.find_all('meta'):
+        name = meta.get('name') or meta.get('property') or meta.get('http-equiv')
+        if name:
+            project['meta'][name] = meta.get('content')
 
-        # Get all scripts
-        project['scripts'] = []
-        for script in soup.find_all('script'):
-            project['scripts'].append({
-                'src': script.get('src'),
-                'type': script.get('type'),
-                'content': script.string if script.string else None,
-                'html': str(script)
-            })
+    # Get all links
+    project['links'] = []
+    for a in walk.find_all('a'):
+        project['links'].append({
+            'text': walk.text(a),
+            'href': a.get('href'),
+            'classes': a.get('class', []),
+            'id': a.get('id'),
+            'html': walk.html(a)
+        })
 
-        # Get all iframes
-        project['iframes'] = []
-        for iframe in soup.find_all('iframe'):
-            project['iframes'].append({
-                'src': iframe.get('src'),
-                'classes': iframe.get('class', []),
-                'id': iframe.get('id'),
-                'html': str(iframe)
-            })
+    # Get all images
+    project['images'] = []
+    for img in walk.find_all('img'):
+        project['images'].append({
+            'src': img.get('src'),
+            'alt': img.get('alt'),
+            'classes': img.get('class', []),
+            'id': img.get('id'),
+            'html': walk.html(img)
+        })
 
-        # Get all lists
-        project['lists'] = {
-            'ul': [],
-            'ol': []
-        }
-        for list_type in ['ul', 'ol']:
-            for lst in soup.find_all(list_type):
-                items = [{'text': li.get_text(strip=True), 'html': str(li)} 
-                        for li in lst.find_all('li')]
-                project['lists'][list_type].append({
-                    'items': items,
-                    'classes': lst.get('class', []),
-                    'id': lst.get('id'),
-                    'html': str(lst)
-                })
+    # Get all forms
+    project['forms'] = []
+    for form in walk.find_all('form'):
+        project['forms'].append({
+            'action': form.get('action'),
+            'method': form.get('method'),
+            'classes': form.get('class', []),
+            'id': form.get('id'),
+            'inputs': [{'type': i.get('type'), 'name': i.get('name'), 'id': i.get('id')} 
+                      for i in form.find_all('input')],
+            'html': walk.html(form)
+        })
+
+    # Get all scripts
+    project['scripts'] = []
+    for script in walk.find_all('script'):
+        project['scripts'].append({
+            'src': script.get('src'),
+            'type': script.get('type'),
+            'content': script.string if script.string else None,
+            'html': walk.html(script)
+        })
 
-        # Get all tables
-        project['tables'] = []
-        for table in soup.find_all('table'):
-            rows = []
-            for tr in table.find_all('tr'):
-                cells = []
-                for td in tr.find_all(['td', 'th']):
-                    cells.append({
-                        'text': td.get_text(strip=True),
-                        'html': str(td),
-                        'is_header': td.name == 'th'
-                    })
-                rows.append(cells)
-            project['tables'].append({
-                'rows': rows,
-                'classes': table.get('class', []),
-                'id': table.get('id'),
-                'html': str(table)
+    # Get all iframes
+    project['iframes'] = []
+    for iframe in walk.find_all('iframe'):
+        project['iframes'].append({
+            'src': iframe.get('src'),
+            'classes': iframe.get('class', []),
+            'id': iframe.get('id'),
+            'html': walk.html(iframe)
+        })
+
+    # Get all lists
+    project['lists'] = {
+        'ul': [],
+        'ol': []
+    }
+    for list_type in ['ul', 'ol']:
+        for lst in walk.find_all(list_type):
+            items = [{'text': walk.text(li), 'html': walk.html(li)} 
+                    for li in lst.find_all('li')]
+            project['lists'][list_type].append({
+                'items': items,
+                'classes': lst.get('class', []),
+                'id': lst.get('id'),
+                'html': walk.html(lst)
             })
 
-        # Get structured data (JSON-LD)
-        project['structured_data'] = []
-        for script in soup.find_all('script', type='application/ld+json'):
-            try:
-                if script.string:
-                    project['structured_data'].append(json.loads(script.string))
-            except:
-                pass
+    # Get all tables
+    project['tables'] = []
+    for table in walk.find_all('table'):
+        rows = []
+        for tr in table.find_all('tr'):
+            cells = []
+            for td in tr.find_all(['td', 'th']):
+                cells.append({
+                    'text': walk.text(td),
+                    'html': walk.html(td),
+                    'is_header': td.name == 'th'
+                })
+            rows.append(cells)
+        project['tables'].append({
+            'rows': rows,
+            'classes': table.get('class', []),
+            'id': table.get('id'),
+            'html': walk.html(table)
+        })
 
-        return project
-        
-    except Exception as e:
-        print(f"Error parsing project: {str(e)}")
-        print(traceback.format_exc())
-        return None
+    # Get structured data (JSON-LD)
+    project['structured_data'] = []
+    for script in walk.find_all('script'):
+        if script.get('type') != 'application/ld+json':
+            continue
+        try:
+            if script.string:
+                project['structured_data'].append(json.loads(script.string))
+        except:
+            pass
+
+    return project
 
-def parse_saved_html_file(filename):
-    """Parse a saved HTML file"""
+def parse_saved_html_file(filename, full=False):
+    """Parse a saved HTML file or archived page"""
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            content = f.read()
-            
-        project = parse_project_html(content)
+        content = read_page(filename)
+        project = parse_project_html(content, full=full)
         if project:
             project['source_file'] = filename
             print(f"Successfully parsed {filename}")
@@ -189,36 +281,130 @@ def parse_saved_html_file(filename):
         print(traceback.format_exc())
         return None
 
+def parse_file_timed(filename, full=False):
+    """parse_saved_html_file plus how long it took, for the process pool"""
+    start = time.perf_counter()
+    project = parse_saved_html_file(filename, full)
+    return project, time.perf_counter() - start
+
+# Local modules whose code decides what a page parses to: the spec and
+# extractors here, the walk they share, and how trees are built
+EXTRACTOR_MODULES = ('parse_projects', 'document_walk', 'html_backend')
+
+def extractor_version(modules=EXTRACTOR_MODULES):
+    """Hash of everything that decides what a page parses to: the source
+    of the extractor modules, the HTML backend and bs4's version. Editing
+    any of them changes it, which invalidates the parse cache."""
+    digest = hashlib.sha256()
+    here = os.path.dirname(os.path.abspath(__file__))
+    for module in modules:
+        with open(os.path.join(here, f"{module}.py"), 'rb') as f:
+            digest.update(f.read())
+    digest.update(f"|{DEFAULT_BACKEND}|{bs4.__version__}".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+EXTRACTOR_VERSION = extractor_version()
+
+def parse_html_files(filenames, workers=None, full=False, metrics=None, cache=None):
+    """Parse saved HTML files across a process pool.
+
+    Workers get file paths rather than HTML, and (filename, project) pairs
+    are yielded in completion order. workers defaults to the CPU count.
+    With a Metrics object, per-file parse time and the number of files in
+    flight are recorded. With a ParseCache, pages whose HTML was already
+    parsed by this extractor version are answered from it, and the pool is
+    only started for the rest.
+    """
+    digests = {}
+    misses = {}
+    for filename in filenames:
+        if cache is None:
+            misses[filename] = [filename]
+            continue
+        digest = digests[filename] = page_digest(filename)
+        project = cache.get(digest, EXTRACTOR_VERSION, full)
+        if project is None:
+            # Pages with identical HTML are parsed once
+            misses.setdefault(digest, []).append(filename)
+            continue
+        if metrics is not None:
+            metrics.inc('pages_parsed_total', status='cached')
+        yield filename, dict(project, source_file=filename)
+    if not misses:
+        return
+    
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        future_to_files = {executor.submit(parse_file_timed, files[0], full): files
+                          for files in misses.values()}
+        pending = len(future_to_files)
+        
+        for future in as_completed(future_to_files):
+            files = future_to_files[future]
+            filename = files[0]
+            pending -= 1
+            try:
+                project, seconds = future.result()
+            except Exception as e:
+                print(f"Failed to parse {filename}: {str(e)}")
+                project, seconds = None, None
+            if cache is not None and project:
+                cache.set(digests[filename], EXTRACTOR_VERSION, full, project)
+            if metrics is not None:
+                metrics.set_gauge('parse_in_flight', pending)
+                metrics.inc('pages_parsed_total', status='ok' if project else 'failed')
+                if seconds is not None:
+                    metrics.record_page(filename, 'parse', seconds, size=page_size(filename))
+            for other in files:
+                yield other, dict(project, source_file=other) if project else project
+
 if __name__ == "__main__":
-    # Get all HTML files from the raw_html directory
+    parser = argparse.ArgumentParser(description="Parse saved project pages")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Parser processes to use (default: CPU count)")
+    parser.add_argument('--full', action='store_true',
+                        help="Also dump every element on the page (slow, for debugging)")
+    parser.add_argument('--resume', action='store_true',
+                        help="Skip files already in the output")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="Reparse every page instead of reusing cached results")
+    args = parser.parse_args()
+    output_jsonl = "ai/scraper/data/parsed_projects.jsonl"
+    output_file = "ai/scraper/data/parsed_projects.json"
+    
+    # Get all HTML files from the raw_html directory and the page cache
     raw_html_dir = "ai/scraper/data/raw_html"
-    if not os.path.exists(raw_html_dir):
-        print(f"Directory {raw_html_dir} does not exist!")
-        exit(1)
-        
-    # Get all HTML files
-    html_files = [f for f in os.listdir(raw_html_dir) if f.endswith('.html')]
+    html_files = []
+    if os.path.exists(raw_html_dir):
+        html_files += [os.path.join(raw_html_dir, f) for f in os.listdir(raw_html_dir) if f.endswith('.html')]
+    with PageCache() as cache:
+        html_files += [path for _, path in cache.paths()]
     if not html_files:
-        print(f"No HTML files found in {raw_html_dir}")
+        print(f"No HTML files found in {raw_html_dir} or the page cache")
         exit(1)
         
+    # Start over unless resuming an interrupted run
+    if not args.resume and os.path.exists(output_jsonl):
+        os.remove(output_jsonl)
+    sink = JsonlSink(output_jsonl, key='source_file')
+    html_files = [f for f in html_files if f not in sink]
+        
     print(f"Found {len(html_files)} HTML files to parse")
     
-    # Parse each file
-    projects = []
-    for filename in html_files:
-        full_path = os.path.join(raw_html_dir, filename)
-        print(f"\nProcessing {filename}...")
-        
-        project = parse_saved_html_file(full_path)
-        if project:
-            projects.append(project)
+    # Parse the files across a process pool, streaming each to the output.
+    # Pages parsed before by the same extractor come from the parse cache.
+    cache = None if args.no_cache else ParseCache()
+    if cache is not None:
+        cache.prune(EXTRACTOR_VERSION)
+    with sink:
+        for full_path, project in parse_html_files(html_files, args.workers, args.full, cache=cache):
+            if project:
+                sink.write(project)
+    if cache is not None:
+        cache.close()
+        print(f"Parse cache: {cache.hits} hits, {cache.misses} parsed")
             
-    # Save all parsed projects to a JSON file
-    output_file = "ai/scraper/data/parsed_projects.json"
-    print(f"\nSaving {len(projects)} projects to {output_file}")
-    
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(projects, f, indent=2)
+    # Compact into the legacy JSON array
+    count = compact(output_jsonl, output_file, key='source_file')
+    print(f"\nSaved {count} projects to {output_file}")
         
-    print("Done!") 
\ No newline at end of file
+    print("Done!")
\ No newline at end of file
@@ -0,0 +1,295 @@
+import argparse
+import json
+import os
+import sqlite3
+import time
+
+DB_PATH = "ai/scraper/data/projects.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id INTEGER PRIMARY KEY,
+    url TEXT NOT NULL UNIQUE,
+    hackathon TEXT,
+    title TEXT,
+    tagline TEXT,
+    text TEXT,
+    sections TEXT,
+    likes INTEGER,
+    comments INTEGER,
+    scraped_at TEXT,
+    source_file TEXT
+);
+CREATE INDEX IF NOT EXISTS projects_hackathon ON projects (hackathon);
+
+CREATE TABLE IF NOT EXISTS project_hackathons (
+    project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    hackathon TEXT NOT NULL,
+    PRIMARY KEY (project_id, hackathon)
+);
+CREATE INDEX IF NOT EXISTS project_hackathons_hackathon ON project_hackathons (hackathon, project_id);
+
+CREATE TABLE IF NOT EXISTS technologies (
+    project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    PRIMARY KEY (project_id, name)
+);
+CREATE INDEX IF NOT EXISTS technologies_name ON technologies (name, project_id);
+
+CREATE TABLE IF NOT EXISTS team_members (
+    project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    name TEXT,
+    profile_url TEXT,
+    contribution TEXT
+);
+CREATE INDEX IF NOT EXISTS team_members_project ON team_members (project_id);
+CREATE INDEX IF NOT EXISTS team_members_profile ON team_members (profile_url);
+
+CREATE TABLE IF NOT EXISTS tracks (
+    id INTEGER PRIMARY KEY,
+    hackathon TEXT NOT NULL,
+    name TEXT NOT NULL,
+    prize_amount INTEGER,
+    description TEXT,
+    original_text TEXT,
+    UNIQUE (hackathon, name)
+);
+
+CREATE TABLE IF NOT EXISTS submissions (
+    project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    track_id INTEGER NOT NULL REFERENCES tracks (id) ON DELETE CASCADE,
+    won INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (project_id, track_id)
+);
+CREATE INDEX IF NOT EXISTS submissions_track ON submissions (track_id, project_id);
+
+CREATE TABLE IF NOT EXISTS prize_matches (
+    project_id INTEGER NOT NULL REFERENCES projects (id) ON DELETE CASCADE,
+    prize TEXT NOT NULL,
+    source TEXT,
+    matched_at REAL NOT NULL,
+    PRIMARY KEY (project_id, prize)
+);
+CREATE INDEX IF NOT EXISTS prize_matches_prize ON prize_matches (prize, project_id);
+"""
+
+# Bumped by each migration below; stored in PRAGMA user_version
+SCHEMA_VERSION = 1
+
+def hackathon_key(url):
+    """Hackathon URLs are stored without a trailing slash"""
+    return url.rstrip('/') if url else url
+
+class ProjectStore:
+    """Embedded SQLite store for scraped hackathon data.
+
+    Projects, technologies, team members, tracks, track submissions and
+    prize matches live in typed, indexed tables. Writes are upserts keyed on
+    project URL and (hackathon, track name), so re-running a scraper stage
+    updates rows in place. Writes are batched: call commit() (or close the
+    store) to persist them.
+    """
+
+    def __init__(self, path=DB_PATH):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA foreign_keys = ON")
+        self.db.execute("PRAGMA journal_mode = WAL")
+        self.db.executescript(SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        version = self.db.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            # Stores from before project_hackathons only have projects.hackathon
+            self.db.execute("""
+                INSERT OR IGNORE INTO project_hackathons
+                SELECT id, hackathon FROM projects WHERE hackathon IS NOT NULL
+            """)
+        if version < SCHEMA_VERSION:
+            self.db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            self.db.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def commit(self):
+        self.db.commit()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def _project_id(self, url):
+        row = self.db.execute("SELECT id FROM projects WHERE url = ?", (url,)).fetchone()
+        return row['id'] if row else None
+
+    def _track_id(self, hackathon, name):
+        hackathon = hackathon_key(hackathon)
+        self.db.execute("INSERT OR IGNORE INTO tracks (hackathon, name) VALUES (?, ?)",
+                        (hackathon, name))
+        return self.db.execute("SELECT id FROM tracks WHERE hackathon = ? AND name = ?",
+                               (hackathon, name)).fetchone()['id']
+
+    def upsert_project(self, project, hackathon=None):
+        """Insert or update a parsed project (keyed on its 'url' or 'link').
+
+        Technologies, team members and won prizes are replaced with the
+        ones in the record. A project can be listed by several hackathons:
+        each one is linked to it, and projects.hackathon keeps the first.
+        Returns the project id.
+        """
+        url = project.get('url') or project.get('link')
+        hackathon = hackathon_key(hackathon)
+        sections = project.get('sections')
+        self.db.execute("""
+            INSERT INTO projects (url, hackathon, title, tagline, text, sections, likes,
+                                  comments, scraped_at, source_file)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET
+                hackathon = COALESCE(hackathon, excluded.hackathon),
+                title = COALESCE(excluded.title, title),
+                tagline = COALESCE(excluded.tagline, tagline),
+                text = COALESCE(excluded.text, text),
+                sections = COALESCE(excluded.sections, sections),
+                likes = COALESCE(excluded.likes, likes),
+                comments = COALESCE(excluded.comments, comments),
+                scraped_at = COALESCE(excluded.scraped_at, scraped_at),
+                source_file = COALESCE(excluded.source_file, source_file)
+        """, (url, hackathon, project.get('title') or project.get('name'), project.get('tagline'), project.get('text'),
+              json.dumps(sections) if sections is not None else None,
+              project.get('likes'), project.get('comments'),
+              project.get('scraped_at'), project.get('source_file')))
+        project_id = self._project_id(url)
+        if hackathon:
+            self.db.execute("INSERT OR IGNORE INTO project_hackathons VALUES (?, ?)", (project_id, hackathon))
+
+        if 'technologies' in project:
+            self.db.execute("DELETE FROM technologies WHERE project_id = ?", (project_id,))
+            self.db.executemany("INSERT OR IGNORE INTO technologies VALUES (?, ?)",
+                                [(project_id, t) for t in project['technologies'] or []])
+        if 'team_members' in project:
+            self.db.execute("DELETE FROM team_members WHERE project_id = ?", (project_id,))
+            self.db.executemany("INSERT INTO team_members VALUES (?, ?, ?, ?)",
+                                [(project_id, m.get('name'), m.get('profile_url'), m.get('contribution'))
+                                 for m in project['team_members'] or []])
+        for submission in project.get('prizes') or []:
+            for prize in submission.get('won', []):
+                track_id = self._track_id(submission.get('hackathon_url') or hackathon, prize)
+                self.db.execute("""
+                    INSERT INTO submissions VALUES (?, ?, 1)
+                    ON CONFLICT (project_id, track_id) DO UPDATE SET won = 1
+                """, (project_id, track_id))
+        return project_id
+
+    def upsert_tracks(self, hackathon, tracks):
+        """Insert or update a hackathon's tracks (scraper tracks.json format)"""
+        hackathon = hackathon_key(hackathon)
+        for track in tracks:
+            self.db.execute("""
+                INSERT INTO tracks (hackathon, name, prize_amount, description, original_text)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (hackathon, name) DO UPDATE SET
+                    prize_amount = excluded.prize_amount,
+                    description = excluded.description,
+                    original_text = excluded.original_text
+            """, (hackathon, track['name'], track.get('prize_amount'), track.get('description'),
+                  track.get('original_text')))
+
+    def add_submission(self, url, hackathon, track, won=False):
+        """Record that a project was submitted to a track"""
+        project_id = self._project_id(url)
+        track_id = self._track_id(hackathon, track)
+        self.db.execute("""
+            INSERT INTO submissions VALUES (?, ?, ?)
+            ON CONFLICT (project_id, track_id) DO UPDATE SET won = MAX(won, excluded.won)
+        """, (project_id, track_id, int(won)))
+
+    def record_match(self, url, prize, source='llm'):
+        """Record a project -> prize match, creating a stub project if needed"""
+        project_id = self._project_id(url)
+        if project_id is None:
+            project_id = self.upsert_project({'url': url})
+        self.db.execute("INSERT OR REPLACE INTO prize_matches VALUES (?, ?, ?, ?)",
+                        (project_id, prize, source, time.time()))
+
+    def _to_dict(self, row):
+        project = dict(row)
+        project['sections'] = json.loads(project['sections']) if project['sections'] else {}
+        project['technologies'] = [r['name'] for r in self.db.execute(
+            "SELECT name FROM technologies WHERE project_id = ? ORDER BY name", (row['id'],))]
+        project['team_members'] = [dict(r) for r in self.db.execute(
+            "SELECT name, profile_url, contribution FROM team_members WHERE project_id = ?", (row['id'],))]
+        project['matched_prizes'] = [r['prize'] for r in self.db.execute(
+            "SELECT prize FROM prize_matches WHERE project_id = ?", (row['id'],))]
+        project['hackathons'] = [r['hackathon'] for r in self.db.execute(
+            "SELECT hackathon FROM project_hackathons WHERE project_id = ? ORDER BY hackathon", (row['id'],))]
+        return project
+
+    def get_project(self, url):
+        row = self.db.execute("SELECT * FROM projects WHERE url = ?", (url,)).fetchone()
+        return self._to_dict(row) if row else None
+
+    def find_projects(self, hackathon=None, technology=None, track=None, prize=None):
+        """Projects matching every filter given, e.g.
+        find_projects(track='best overall yay :3', technology='react')"""
+        joins, params = [], []
+        if hackathon is not None:
+            joins.append("JOIN project_hackathons h ON h.project_id = p.id AND h.hackathon = ?")
+            params.append(hackathon_key(hackathon))
+        if technology is not None:
+            joins.append("JOIN technologies t ON t.project_id = p.id AND t.name = ?")
+            params.append(technology)
+        if track is not None:
+            joins.append("JOIN submissions s ON s.project_id = p.id "
+                         "JOIN tracks k ON k.id = s.track_id AND k.name = ?")
+            params.append(track)
+            if hackathon is not None:
+                # The project may have entered a track of that name elsewhere
+                joins[-1] += " AND k.hackathon = ?"
+                params.append(hackathon_key(hackathon))
+        if prize is not None:
+            joins.append("JOIN prize_matches m ON m.project_id = p.id AND m.prize = ?")
+            params.append(prize)
+        sql = "SELECT p.* FROM projects p " + " ".join(joins)
+        rows = self.db.execute(sql + " ORDER BY p.id", params)
+        return [self._to_dict(row) for row in rows]
+
+    def tracks(self, hackathon):
+        return [dict(r) for r in self.db.execute(
+            "SELECT * FROM tracks WHERE hackathon = ? ORDER BY id", (hackathon_key(hackathon),))]
+
+def import_json(store, path, hackathon=None):
+    """Load one of the scraper's JSON outputs into the store.
+
+    Handles tracks.json and the project lists (final.json, new_final.json,
+    projects.json, projects_data.json). Records without a URL are skipped.
+    Returns the number of records loaded.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict) and 'tracks' in data:
+        store.upsert_tracks(hackathon or data.get('hackathon_url'), data['tracks'])
+        return len(data['tracks'])
+    loaded = 0
+    for project in data:
+        if project.get('url') or project.get('link'):
+            store.upsert_project(project, hackathon)
+            loaded += 1
+    return loaded
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load scraper JSON outputs into the project store")
+    parser.add_argument('files', nargs='+', help="JSON files to import")
+    parser.add_argument('--hackathon', help="Hackathon URL the projects belong to")
+    parser.add_argument('--db', default=DB_PATH, help="Store to write to")
+    args = parser.parse_args()
+    
+    with ProjectStore(args.db) as store:
+        for path in args.files:
+            print(f"Loaded {import_json(store, path, args.hackathon)} records from {path}")
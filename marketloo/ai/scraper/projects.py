@@ -1,5 +1,5 @@
 import requests
-from bs4 import BeautifulSoup
+from html_backend import make_soup
 import json
 import os
 
@@ -20,7 +20,7 @@ def test_project_page():
         print("\nHTML content saved to ai/scraper/data/project_page.html")
         
         # Parse some basic project info as a test
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = make_soup(response.text)
         
         project_info = {}
         
@@ -0,0 +1,143 @@
+import json
+import sys
+
+def shared(value):
+    """One copy of a string that recurs across the corpus (technology
+    names, profile URLs, hackathons, prize names...)"""
+    return sys.intern(value) if isinstance(value, str) else value
+
+def _extra(data, known):
+    extra = {k: v for k, v in data.items() if k not in known}
+    return extra or None
+
+class Record:
+    """Base for the slotted record types.
+
+    Each subclass lists its JSON fields in FIELDS, in output order, and
+    which of them hold repeated values to intern in SHARED. Keys a record
+    doesn't know are kept in `extra` and written back out, so loading and
+    dumping a file loses nothing. Fields that are None are left out of
+    to_dict().
+    """
+    __slots__ = ('extra',)
+    FIELDS = ()
+    SHARED = ()
+
+    def __init__(self, **fields):
+        for field in self.FIELDS:
+            value = fields.pop(field, None)
+            setattr(self, field, shared(value) if field in self.SHARED else value)
+        self.extra = fields or None
+
+    @classmethod
+    def from_dict(cls, data):
+        fields = {field: data.get(field) for field in cls.FIELDS}
+        record = cls(**fields)
+        record.extra = _extra(data, cls.FIELDS)
+        return record
+
+    def to_dict(self):
+        data = {field: getattr(self, field) for field in self.FIELDS if getattr(self, field) is not None}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        fields = ', '.join(f"{f}={getattr(self, f)!r}" for f in self.FIELDS[:2])
+        return f"{type(self).__name__}({fields})"
+
+class Link(Record):
+    __slots__ = ('text', 'url')
+    FIELDS = ('text', 'url')
+    SHARED = ('text',)
+
+class TeamMember(Record):
+    __slots__ = ('name', 'profile_url', 'contribution')
+    FIELDS = ('name', 'profile_url', 'contribution')
+    SHARED = ('name', 'profile_url')
+
+class Submission(Record):
+    """A hackathon a project was submitted to and the prizes it won there"""
+    __slots__ = ('hackathon', 'hackathon_url', 'won')
+    FIELDS = ('hackathon', 'hackathon_url', 'won')
+    SHARED = ('hackathon', 'hackathon_url')
+
+    @classmethod
+    def from_dict(cls, data):
+        record = super().from_dict(data)
+        if record.won is not None:
+            record.won = [shared(prize) for prize in record.won]
+        return record
+
+class Track(Record):
+    """A prize track (scraper tracks.json format)"""
+    __slots__ = ('name', 'prize_amount', 'description', 'original_text', 'hackathon')
+    FIELDS = ('name', 'prize_amount', 'description', 'original_text', 'hackathon')
+    SHARED = ('name', 'hackathon')
+
+class Project(Record):
+    """A scraped project.
+
+    Reads every project format the scrapers write (parse output, the
+    project store, projects_data.json), taking 'link' as the URL and
+    'name' as the title like ProjectStore.upsert_project does. Links, team
+    members and submissions become records of their own; technology names
+    and section headers are interned.
+    """
+    __slots__ = ('url', 'title', 'tagline', 'text', 'sections', 'technologies', 'links',
+                 'team_members', 'prizes', 'likes', 'comments', 'hackathon', 'matched_prize',
+                 'scraped_at', 'source_file')
+    FIELDS = __slots__
+    SHARED = ('hackathon', 'matched_prize')
+    ALIASES = {'link': 'url', 'name': 'title'}
+    NESTED = {'links': Link, 'team_members': TeamMember, 'prizes': Submission}
+
+    @classmethod
+    def from_dict(cls, data):
+        fields = {field: data.get(field) for field in cls.FIELDS}
+        for alias, field in cls.ALIASES.items():
+            if fields[field] is None and data.get(alias) is not None:
+                fields[field] = data[alias]
+        for field, record_type in cls.NESTED.items():
+            if fields[field] is not None:
+                fields[field] = [record_type.from_dict(item) for item in fields[field]]
+        if fields['technologies'] is not None:
+            fields['technologies'] = [shared(t) for t in fields['technologies']]
+        if fields['sections'] is not None:
+            fields['sections'] = {shared(header): text for header, text in fields['sections'].items()}
+        project = cls(**fields)
+        project.extra = _extra(data, set(cls.FIELDS) | {a for a, f in cls.ALIASES.items()
+                                                        if data.get(f) is None})
+        return project
+
+    def to_dict(self):
+        data = super().to_dict()
+        for field in self.NESTED:
+            if data.get(field) is not None:
+                data[field] = [item.to_dict() for item in data[field]]
+        return data
+
+    def full_text(self):
+        """The scraped text, or the tagline and sections when there is none"""
+        if self.text:
+            return self.text
+        return ' '.join([self.tagline or ''] + list((self.sections or {}).values()))
+
+def load_projects(path):
+    """Projects from a JSON array or a JSONL file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            return [Project.from_dict(json.loads(line)) for line in f if line.strip()]
+        return [Project.from_dict(item) for item in json.load(f)]
+
+def dump_projects(projects, path):
+    """Write projects as a JSON array, or one per line for .jsonl paths"""
+    with open(path, 'w', encoding='utf-8') as f:
+        if path.endswith('.jsonl'):
+            for project in projects:
+                f.write(json.dumps(project.to_dict(), ensure_ascii=False) + '\n')
+        else:
+            json.dump([project.to_dict() for project in projects], f, indent=2, ensure_ascii=False)
@@ -0,0 +1,202 @@
+from collections import deque
+from urllib.parse import urlsplit
+import asyncio
+import time
+from crawler import Crawler
+
+def hackathon_slug(hackathon_url):
+    """brainrot-jia-seed-hackathon for https://brainrot-jia-seed-hackathon.devpost.com"""
+    parts = urlsplit(hackathon_url if '//' in hackathon_url else f"https://{hackathon_url}")
+    host = parts.hostname or ''
+    slug = host[:-len('.devpost.com')] if host.endswith('.devpost.com') else host
+    path = parts.path.strip('/').replace('/', '-')
+    return '-'.join(p for p in [slug, path] if p) or 'hackathon'
+
+class FairQueue:
+    """A set of bounded queues, one per key, drained round-robin.
+
+    get() takes from the next key that has items, so a hackathon with
+    thousands of projects can't starve one with ten. Each key's producer
+    calls close(key) when it is done; get() returns None once every key is
+    closed and empty.
+    """
+
+    def __init__(self, maxsize=100):
+        self.maxsize = maxsize
+        self.queues = {}
+        self.keys = []
+        self.open = set()
+        self.cursor = 0
+        self.changed = asyncio.Condition()
+
+    def add_key(self, key):
+        if key not in self.queues:
+            self.queues[key] = deque()
+            self.keys.append(key)
+        self.open.add(key)
+
+    def partition(self, key):
+        """Queue-like view of one key, for Crawler.walk_gallery"""
+        return _Partition(self, key)
+
+    async def put(self, key, item):
+        async with self.changed:
+            await self.changed.wait_for(lambda: len(self.queues[key]) < self.maxsize)
+            self.queues[key].append(item)
+            self.changed.notify_all()
+
+    async def close(self, key):
+        async with self.changed:
+            self.open.discard(key)
+            self.changed.notify_all()
+
+    def _next(self):
+        for i in range(len(self.keys)):
+            key = self.keys[(self.cursor + i) % len(self.keys)]
+            if self.queues[key]:
+                self.cursor = (self.cursor + i + 1) % len(self.keys)
+                return key, self.queues[key].popleft()
+        return None
+
+    async def get(self):
+        """The next (key, item), or None when everything is drained"""
+        async with self.changed:
+            await self.changed.wait_for(lambda: not self.open or any(self.queues.values()))
+            item = self._next()
+            self.changed.notify_all()
+            return item
+
+    def qsize(self):
+        return sum(len(q) for q in self.queues.values())
+
+class _Partition:
+    def __init__(self, fair_queue, key):
+        self.fair_queue = fair_queue
+        self.key = key
+
+    async def put(self, item):
+        await self.fair_queue.put(self.key, item)
+
+    def qsize(self):
+        return len(self.fair_queue.queues[self.key])
+
+class BatchScheduler:
+    """Crawl several hackathons at once under shared budgets.
+
+    All hackathons share one Crawler, so its connection pool, worker count
+    and per-host limits are the global and per-host budgets for the whole
+    batch. Every gallery is walked concurrently into its own partition of a
+    FairQueue, and the download workers take from the partitions in turn.
+
+    A project can belong to more than one hackathon; it is downloaded once
+    and attributed to every hackathon whose gallery lists it.
+    """
+
+    def __init__(self, hackathon_urls, cache, metrics=None, frontier=None,
+                 progress_every=10, **crawler_options):
+        self.hackathon_urls = list(dict.fromkeys(u.rstrip('/') for u in hackathon_urls))
+        self.cache = cache
+        self.metrics = metrics
+        self.frontier = frontier
+        self.progress_every = progress_every
+        self.crawler_options = crawler_options
+        self.found = {}
+        self.outcomes = {}
+        self.fetched = {h: 0 for h in self.hackathon_urls}
+
+    async def _walk(self, crawler, queue, hackathon_url):
+        try:
+            self.found[hackathon_url] = await crawler.walk_gallery(hackathon_url, queue.partition(hackathon_url))
+        except Exception as e:
+            print(f"Error walking {hackathon_url}: {str(e)}")
+            self.found[hackathon_url] = []
+        finally:
+            await queue.close(hackathon_url)
+
+    async def _requeue_pending(self, queue):
+        # Pending pages from an interrupted batch don't know their hackathon;
+        # they are attributed once the galleries have been walked
+        try:
+            for url in self.frontier.pending(kinds=['project', 'profile']):
+                await queue.put(None, url)
+        finally:
+            await queue.close(None)
+
+    async def _worker(self, crawler, queue, skip):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            hackathon_url, url = item
+            if url in self.outcomes or (skip is not None and skip(url)):
+                continue
+            self.outcomes[url] = 'pending'
+            outcome, _ = await crawler.download(url)
+            self.outcomes[url] = outcome
+            if hackathon_url is not None:
+                self.fetched[hackathon_url] += 1
+            if self.metrics is not None:
+                self.metrics.inc('batch_pages_total', hackathon=hackathon_slug(hackathon_url or 'resumed'),
+                                 outcome=outcome)
+
+    def progress(self):
+        """One line per hackathon: projects found so far and downloaded"""
+        lines = []
+        for hackathon_url in self.hackathon_urls:
+            found = len(self.found.get(hackathon_url) or [])
+            state = 'walked' if hackathon_url in self.found else 'walking'
+            lines.append(f"{hackathon_slug(hackathon_url):40} {state:8} "
+                         f"{found:>6} found  {self.fetched[hackathon_url]:>6} downloaded")
+        return '\n'.join(lines)
+
+    async def _report(self):
+        start = time.time()
+        while True:
+            await asyncio.sleep(self.progress_every)
+            print(f"\n[{time.time() - start:.0f}s] {sum(self.fetched.values())} pages downloaded\n{self.progress()}")
+
+    async def run(self, skip=None):
+        """Crawl every hackathon. Returns {hackathon_url: (changed, unchanged)}
+        where changed is [(url, cached file)] for new or changed pages and
+        unchanged is the other cached pages the gallery lists."""
+        queue = FairQueue(self.crawler_options.get('queue_size', 100))
+        # Open every partition before the workers start, so they don't see
+        # an empty, closed queue and exit
+        for hackathon_url in self.hackathon_urls:
+            queue.add_key(hackathon_url)
+        if self.frontier is not None:
+            queue.add_key(None)
+        async with Crawler(cache=self.cache, metrics=self.metrics, frontier=self.frontier,
+                           **self.crawler_options) as crawler:
+            producers = [self._walk(crawler, queue, h) for h in self.hackathon_urls]
+            if self.frontier is not None:
+                producers.append(self._requeue_pending(queue))
+            workers = [asyncio.create_task(self._worker(crawler, queue, skip))
+                       for _ in range(crawler.workers)]
+            reporter = asyncio.create_task(self._report()) if self.progress_every else None
+            try:
+                await asyncio.gather(*producers)
+                await asyncio.gather(*workers)
+            finally:
+                for task in workers + ([reporter] if reporter else []):
+                    task.cancel()
+        return self.partitions()
+
+    def partitions(self):
+        partitions = {}
+        for hackathon_url in self.hackathon_urls:
+            changed, unchanged = [], []
+            for url in self.found.get(hackathon_url, []):
+                path = self.cache.path_for(url)
+                if not path:
+                    continue
+                if self.outcomes.get(url) == 'changed':
+                    changed.append((url, path))
+                else:
+                    unchanged.append(url)
+            partitions[hackathon_url] = (changed, unchanged)
+        return partitions
+
+def crawl_batch(hackathon_urls, cache, skip=None, **options):
+    """Blocking helper around BatchScheduler.run"""
+    return asyncio.run(BatchScheduler(hackathon_urls, cache, **options).run(skip))
@@ -1,5 +1,5 @@
 import requests
-from bs4 import BeautifulSoup
+from html_backend import make_soup
 import os
 
 def test_scrape():
@@ -20,7 +20,7 @@ def test_scrape():
         print("\nHTML content saved to ai/scraper/data/devpost_page.html")
         
         # Still try to parse some projects as a test
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = make_soup(response.text)
         projects = soup.find_all('div', class_='software-entry-name')
         
         if projects:
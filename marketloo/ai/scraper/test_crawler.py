@@ -0,0 +1,153 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+import asyncio
+import tempfile
+import threading
+import time
+from crawler import Crawler, crawl
+from page_cache import PageCache
+
+PROJECTS_PER_PAGE = 5
+GALLERY_PAGES = 3
+
+class StubDevpostHandler(BaseHTTPRequestHandler):
+    """Serves a tiny fake gallery and project pages"""
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == '/submissions/search':
+            page = int(parse_qs(parts.query).get('page', ['1'])[0])
+            links = ''
+            if page <= GALLERY_PAGES:
+                for i in range(PROJECTS_PER_PAGE):
+                    slug = f"project-{page}-{i}"
+                    links += f'<a class="block-wrapper-link" href="/software/{slug}">{slug}</a>'
+            self._send(200, f"<html><body>{links}</body></html>")
+        elif parts.path == '/software/slow-project':
+            time.sleep(3)
+            self._send(200, "<html><h1 id='app-title'>too slow</h1></html>")
+        elif parts.path.startswith('/software/'):
+            slug = parts.path.split('/')[-1]
+            etag = f'"{slug}"'
+            if self.headers.get('If-None-Match') == etag:
+                self._send(304, "", etag=etag)
+            else:
+                self._send(200, f"<html><h1 id='app-title'>{slug}</h1></html>", etag=etag)
+        else:
+            self._send(404, "not found")
+
+    def _send(self, status, body, etag=None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        if etag:
+            self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+class PaginatedDevpostHandler(StubDevpostHandler):
+    """Gallery with pagination links and a slow response per page"""
+    pages = 6
+    requested = []
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path != '/submissions/search':
+            return super().do_GET()
+        page = int(parse_qs(parts.query).get('page', ['1'])[0])
+        self.requested.append(page)
+        time.sleep(0.3)
+        links = ''
+        if page <= self.pages:
+            links = ''.join(f'<a class="block-wrapper-link" href="/software/p-{page}-{i}">p</a>'
+                            for i in range(PROJECTS_PER_PAGE))
+        pagination = ''.join(f'<li><a href="/submissions/search?page={n}">{n}</a></li>'
+                             for n in range(1, self.pages + 1))
+        self._send(200, f'<html><body>{links}<ul class="pagination">{pagination}</ul></body></html>')
+
+def start_stub_server(handler=StubDevpostHandler):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def test_crawl_against_stub_server():
+    server, base_url = start_stub_server()
+    try:
+        pages = crawl(base_url, lambda url, html: (url, html), base_url=base_url,
+                      max_per_host=4, workers=4, queue_size=2)
+    finally:
+        server.shutdown()
+
+    urls = sorted(url for url, _ in pages)
+    assert len(urls) == PROJECTS_PER_PAGE * GALLERY_PAGES
+    assert urls[0] == f"{base_url}/software/project-1-0"
+    assert all('app-title' in html for _, html in pages)
+
+def test_paginated_gallery_is_fetched_concurrently():
+    PaginatedDevpostHandler.requested = []
+    server, base_url = start_stub_server(PaginatedDevpostHandler)
+
+    async def run():
+        async with Crawler(base_url=base_url) as crawler:
+            return await crawler.walk_gallery(base_url)
+
+    try:
+        start = time.perf_counter()
+        urls = asyncio.run(run())
+        elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+
+    pages = PaginatedDevpostHandler.pages
+    assert len(urls) == PROJECTS_PER_PAGE * pages
+    assert urls[0].endswith('/software/p-1-0') and urls[-1].endswith(f'/software/p-{pages}-4')
+    # Page 1, the rest in parallel, then one probe past the advertised count
+    assert sorted(PaginatedDevpostHandler.requested) == list(range(1, pages + 2))
+    assert elapsed < 0.3 * pages
+
+def test_slow_page_times_out():
+    server, base_url = start_stub_server()
+
+    async def run():
+        async with Crawler(base_url=base_url, timeout=1, max_retries=0) as crawler:
+            return await crawler.fetch(f"{base_url}/software/slow-project")
+
+    try:
+        assert asyncio.run(run()) == (None, None)
+    finally:
+        server.shutdown()
+
+def test_recrawl_skips_unchanged_pages():
+    server, base_url = start_stub_server()
+
+    async def run(cache):
+        async with Crawler(base_url=base_url, cache=cache) as crawler:
+            changed = await crawler.crawl(base_url, lambda url, html: url)
+            return changed, crawler.unchanged
+
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with PageCache(cache_dir) as cache:
+                changed, unchanged = asyncio.run(run(cache))
+            assert len(changed) == PROJECTS_PER_PAGE * GALLERY_PAGES and not unchanged
+
+            with PageCache(cache_dir) as cache:
+                changed, unchanged = asyncio.run(run(cache))
+                assert not changed and len(unchanged) == PROJECTS_PER_PAGE * GALLERY_PAGES
+                assert 'project-1-0' in cache.read(f"{base_url}/software/project-1-0")
+
+                assert cache.evict(max_bytes=0) == PROJECTS_PER_PAGE * GALLERY_PAGES
+                assert cache.path_for(f"{base_url}/software/project-1-0") is None
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_crawl_against_stub_server()
+    test_paginated_gallery_is_fetched_concurrently()
+    test_slow_page_times_out()
+    test_recrawl_skips_unchanged_pages()
+    print("Crawler tests passed")
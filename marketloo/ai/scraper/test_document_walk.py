@@ -0,0 +1,53 @@
+import document_walk
+from document_walk import DocumentWalk
+from html_backend import available_backends, make_soup
+from parse_projects import extract_sections
+
+PAGE = """<!DOCTYPE html><html><head><meta charset="utf-8"><title>T &amp; x</title>
+<style>p { color: red }</style><script>var s = "<p>";</script></head><body>
+<div id="app-details-left"><div>
+<h2>Inspiration</h2><p>a &lt; b <!-- hidden --> c</p><br><img src="x.png" alt='say "hi"'>
+<h2></h2><p>after an empty header</p>
+<h3>What it <b>does</b></h3><div class="x y"><h4>Nested</h4><p>deep</p></div>
+<p>more</p><h2>Inspiration</h2><p>again</p>
+<ul><li>a<ul><li>b</li></ul></li></ul><template><p>t</p></template>tail
+</div></div></body></html>"""
+
+def test_text_and_html_match_bs4():
+    for backend in available_backends():
+        soup = make_soup(PAGE, backend)
+        walk = DocumentWalk(soup, html=True)
+        assert walk.tags == soup.find_all(True)
+        for tag in walk.tags:
+            assert walk.text(tag) == tag.get_text(strip=True), tag.name
+            assert walk.text(tag, '\n') == tag.get_text('\n', strip=True), tag.name
+            assert walk.html(tag) == str(tag), tag.name
+
+def test_markup_without_the_fast_path():
+    # As on a bs4 release the one-pass markup hasn't been checked against
+    fast = document_walk.FAST_MARKUP
+    document_walk.FAST_MARKUP = False
+    try:
+        soup = make_soup(PAGE)
+        walk = DocumentWalk(soup, html=True)
+        assert walk.pieces is None
+        for tag in walk.tags:
+            assert walk.text(tag, '\n') == tag.get_text('\n', strip=True), tag.name
+            assert walk.html(tag) == str(tag), tag.name
+    finally:
+        document_walk.FAST_MARKUP = fast
+
+def test_sections():
+    for backend in available_backends():
+        soup = make_soup(PAGE, backend)
+        sections = extract_sections(soup.select('#app-details-left > div:not([id])'))
+        assert list(sections) == ['Inspiration', 'What itdoes', 'Nested']
+        assert sections['Inspiration'] == 'again\na\nb\nt'
+        assert sections['What itdoes'] == 'Nested\ndeep\nmore'
+        assert sections['Nested'] == 'deep'
+
+if __name__ == "__main__":
+    test_text_and_html_match_bs4()
+    test_markup_without_the_fast_path()
+    test_sections()
+    print("Document walk tests passed")
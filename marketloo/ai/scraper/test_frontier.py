@@ -0,0 +1,78 @@
+import asyncio
+import os
+import tempfile
+from crawler import Crawler
+from frontier import Frontier, canonicalize, page_kind
+from test_crawler import PROJECTS_PER_PAGE, GALLERY_PAGES, start_stub_server
+
+def test_canonicalize():
+    assert canonicalize("https://devpost.comhttps://devpost.com/software/talktuahtaxer") == \
+        "https://devpost.com/software/talktuahtaxer"
+    assert canonicalize("/software/talktuahtaxer/?ref_content=gallery&utm_source=x#team") == \
+        "https://devpost.com/software/talktuahtaxer"
+    assert canonicalize("HTTPS://Brainrot.Devpost.com:443/submissions/search?page=2&sort=new") == \
+        "https://brainrot.devpost.com/submissions/search?page=2&sort=new"
+    assert canonicalize("https://devpost.comhttps://devpost.comhttps://devpost.com/software/x/") == \
+        "https://devpost.com/software/x"
+    # A URL-valued query parameter is not a doubled prefix
+    assert canonicalize("https://devpost.com/software/x?ref=https://twitter.com/a") == \
+        "https://devpost.com/software/x?ref=https%3A%2F%2Ftwitter.com%2Fa"
+    assert canonicalize("/software/x?next=http://example.com") == \
+        "https://devpost.com/software/x?next=http%3A%2F%2Fexample.com"
+    assert page_kind("https://x.devpost.com/submissions/search?page=2") == 'gallery'
+    assert page_kind("https://devpost.com/software/snake") == 'project'
+    assert page_kind("https://devpost.com/umaru909") == 'profile'
+
+def test_frontier_state_persists():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'frontier.sqlite')
+        with Frontier(path, max_attempts=2) as frontier:
+            assert frontier.add("https://devpost.com/umaru909")
+            assert frontier.add("https://devpost.com/software/snake/")
+            assert frontier.add("https://x.devpost.com/submissions/search?page=1")
+            assert not frontier.add("https://devpost.comhttps://devpost.com/software/snake")
+            frontier.fail("https://devpost.com/umaru909", 503)
+
+        with Frontier(path, max_attempts=2) as frontier:
+            assert "https://devpost.com/software/snake" in frontier
+            assert frontier.pending() == ["https://x.devpost.com/submissions/search?page=1",
+                                          "https://devpost.com/software/snake",
+                                          "https://devpost.com/umaru909"]
+            frontier.fail("https://devpost.com/umaru909", 503)
+            frontier.done("https://devpost.com/software/snake")
+            assert frontier.counts() == {'pending': 1, 'done': 1, 'failed': 1}
+
+def test_interrupted_crawl_resumes():
+    server, base_url = start_stub_server()
+    crashed = {'left': 4}
+
+    def flaky(url, html):
+        if crashed['left'] > 0:
+            crashed['left'] -= 1
+            raise RuntimeError("worker died")
+        return url
+
+    async def run(frontier, on_page):
+        async with Crawler(base_url=base_url, workers=2, frontier=frontier) as crawler:
+            return await crawler.crawl(base_url, on_page)
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'frontier.sqlite')
+            with Frontier(path, base_url) as frontier:
+                first = asyncio.run(run(frontier, flaky))
+            assert len(first) == PROJECTS_PER_PAGE * GALLERY_PAGES - 4
+
+            # Only the pages that failed are fetched again
+            with Frontier(path, base_url) as frontier:
+                second = asyncio.run(run(frontier, lambda url, html: url))
+                assert frontier.counts()['pending'] == 0
+            assert len(second) == 4 and not set(first) & set(second)
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_canonicalize()
+    test_frontier_state_persists()
+    test_interrupted_crawl_resumes()
+    print("Frontier tests passed")
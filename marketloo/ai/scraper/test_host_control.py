@@ -0,0 +1,108 @@
+from urllib.parse import urlsplit
+import asyncio
+import time
+from crawler import Crawler
+from host_control import AdaptiveLimiter, CircuitBreaker, retry_delay
+from metrics import Metrics
+from test_crawler import StubDevpostHandler, start_stub_server
+
+class FlakyDevpostHandler(StubDevpostHandler):
+    """Rate limits or errors on the first requests to each page"""
+    failures = {}
+
+    def do_GET(self):
+        path = urlsplit(self.path).path
+        remaining = self.failures.get(path, 0)
+        if remaining:
+            self.failures[path] = remaining - 1
+            if remaining % 2:
+                return self._send_retry_after()
+            return self._send(503, "try again")
+        super().do_GET()
+
+    def _send_retry_after(self):
+        self.send_response(429)
+        self.send_header('Retry-After', '0')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+def test_retry_delay():
+    assert retry_delay(0, '3') == 3.0
+    assert retry_delay(0, '600', cap=60) == 60
+    assert retry_delay(0, 'Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    for attempt in range(5):
+        assert 0.25 * 2 ** attempt <= retry_delay(attempt, 'soon') <= 0.5 * 2 ** attempt
+
+def test_limiter_backs_off_and_recovers():
+    limiter = AdaptiveLimiter(initial=8, maximum=16, cooldown=0)
+    limiter.record(0.1, True)
+    limiter.record(0.1, False)
+    assert limiter.limit < 5
+    limiter.record(1.0, True)
+    assert limiter.limit < 3
+    for _ in range(50):
+        limiter.record(0.1, True)
+    assert limiter.limit > 8
+
+    limiter = AdaptiveLimiter(initial=8, cooldown=60)
+    for _ in range(5):
+        limiter.record(None, False)
+    assert limiter.limit == 4
+
+def test_limiter_caps_concurrency():
+    limiter = AdaptiveLimiter(initial=2, maximum=2)
+    peak = 0
+
+    async def task():
+        nonlocal peak
+        async with limiter:
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await asyncio.gather(*[task() for _ in range(10)])
+
+    asyncio.run(run())
+    assert peak == 2 and limiter.in_flight == 0
+
+def test_breaker_trips_and_recovers():
+    breaker = CircuitBreaker(threshold=3, reset_timeout=0.1)
+    assert not breaker.record_failure() and not breaker.record_failure()
+    assert breaker.record_failure() and breaker.state == 'open'
+    assert not breaker.record_failure()
+
+    start = time.monotonic()
+    asyncio.run(breaker.wait())
+    assert time.monotonic() - start >= 0.09 and breaker.state == 'half-open'
+    # Failing again while half-open doubles the cool-down
+    assert breaker.record_failure() and breaker.timeout == 0.2
+    breaker.record_success()
+    assert breaker.state == 'closed' and breaker.timeout == 0.1 and breaker.trips == 2
+
+def test_crawler_retries_throttled_pages():
+    FlakyDevpostHandler.failures = {'/software/project-1-0': 3, '/submissions/search': 1}
+    server, base_url = start_stub_server(FlakyDevpostHandler)
+    metrics = Metrics()
+
+    async def run():
+        async with Crawler(base_url=base_url, metrics=metrics) as crawler:
+            return await crawler.crawl(base_url, lambda url, html: url)
+
+    try:
+        pages = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    # The throttled gallery page didn't end the walk and no page was lost
+    assert len(pages) == 15 and f"{base_url}/software/project-1-0" in pages
+    retries = sum(c['value'] for c in metrics.snapshot()['counters'] if c['name'] == 'http_retries_total')
+    assert retries == 4
+    assert max(page['retries'] for page in metrics.pages) == 3
+
+if __name__ == "__main__":
+    test_retry_delay()
+    test_limiter_backs_off_and_recovers()
+    test_limiter_caps_concurrency()
+    test_breaker_trips_and_recovers()
+    test_crawler_retries_throttled_pages()
+    print("Host control tests passed")
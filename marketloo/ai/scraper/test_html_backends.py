@@ -0,0 +1,56 @@
+import glob
+import os
+from html_backend import available_backends
+from page_archive import PageArchive, read_page
+from parse_projects import parse_project_html
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(HERE, 'ai', 'scraper', 'data')
+
+def saved_pages():
+    """Every saved HTML page we have on disk"""
+    patterns = [
+        os.path.join(DATA_DIR, '*.html'),
+        os.path.join(DATA_DIR, 'raw_html', '*.html'),
+        os.path.join(DATA_DIR, 'page_cache', 'objects', '*', '*.html'),
+        os.path.join(HERE, 'scraped_pages', '*.html'),
+        os.path.join(HERE, 'fixtures', '*.html')
+    ]
+    pages = []
+    for pattern in patterns:
+        pages.extend(sorted(glob.glob(pattern)))
+    archive_path = os.path.join(DATA_DIR, 'page_cache', 'pages.arc')
+    if os.path.exists(archive_path):
+        archive = PageArchive(archive_path, read_only=True)
+        pages.extend(archive.ref(digest) for digest in archive.entries)
+    return pages
+
+def extract(content, backend):
+    project = parse_project_html(content, backend=backend)
+    project.pop('scraped_at')
+    return project
+
+def test_backends_agree_on_a_project_page():
+    """The saved hackathon page has no project fields to disagree on, so
+    compare the backends where every field is filled in"""
+    content = read_page(os.path.join(HERE, 'fixtures', 'project_page.html'))
+    expected = extract(content, 'html.parser')
+    for field in ['title', 'tagline', 'sections', 'technologies', 'links', 'team_members', 'prizes']:
+        assert expected[field], f"fixture has no {field}"
+    for backend in available_backends():
+        assert extract(content, backend) == expected, f"{backend} differs on the project page"
+
+def test_backends_extract_identical_output():
+    backends = available_backends()
+    pages = saved_pages()
+    print(f"Comparing {backends} over {len(pages)} saved pages")
+    for page in pages:
+        content = read_page(page)
+        expected = extract(content, 'html.parser')
+        for backend in backends:
+            assert extract(content, backend) == expected, f"{backend} differs on {page}"
+
+if __name__ == "__main__":
+    test_backends_agree_on_a_project_page()
+    test_backends_extract_identical_output()
+    print("All backends agree")
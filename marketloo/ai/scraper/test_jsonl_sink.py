@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+from jsonl_sink import JsonlSink, compact, read_jsonl
+
+def test_torn_line_is_skipped_and_terminated():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'out.jsonl')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('{"url": "a", "n": 1}\n{"url": "b", "n"')
+
+        with JsonlSink(path) as sink:
+            assert 'a' in sink and 'b' not in sink
+            sink.write({'url': 'b', 'n': 2})
+
+        assert list(read_jsonl(path)) == [{'url': 'a', 'n': 1}, {'url': 'b', 'n': 2}]
+
+def test_resume_skips_keys_already_written():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'nested', 'out.jsonl')
+        with JsonlSink(path, key='source_file', flush_every=1) as sink:
+            sink.write({'source_file': 'one.html'})
+            sink.write({'source_file': 'two.html'})
+
+        with JsonlSink(path, key='source_file') as resumed:
+            todo = [f for f in ['one.html', 'two.html', 'three.html'] if f not in resumed]
+            assert todo == ['three.html']
+            for name in todo:
+                resumed.write({'source_file': name})
+            assert resumed.written == 1
+        assert [r['source_file'] for r in read_jsonl(path)] == ['one.html', 'two.html', 'three.html']
+
+def test_compact_keeps_the_last_record_per_key():
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl_path = os.path.join(tmp, 'out.jsonl')
+        json_path = os.path.join(tmp, 'out.json')
+        with JsonlSink(jsonl_path) as sink:
+            sink.write({'url': 'a', 'title': 'old'})
+            sink.write({'url': 'b', 'title': 'b'})
+            sink.write({'url': 'a', 'title': 'new'})
+            sink.write({'title': 'no url'})
+            sink.write({'title': 'no url either'})
+
+        assert compact(jsonl_path, json_path) == 4
+        with open(json_path, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        assert records == [{'url': 'b', 'title': 'b'}, {'url': 'a', 'title': 'new'},
+                           {'title': 'no url'}, {'title': 'no url either'}]
+
+        open(jsonl_path, 'w').close()
+        assert compact(jsonl_path, json_path) == 0
+        with open(json_path, 'r', encoding='utf-8') as f:
+            assert json.load(f) == []
+
+if __name__ == "__main__":
+    test_torn_line_is_skipped_and_terminated()
+    test_resume_skips_keys_already_written()
+    test_compact_keeps_the_last_record_per_key()
+    print("JSONL sink tests passed")
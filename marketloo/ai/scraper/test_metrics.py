@@ -0,0 +1,113 @@
+import json
+import os
+import tempfile
+import threading
+from metrics import Metrics
+
+def test_counters_and_gauges():
+    metrics = Metrics()
+    metrics.inc('http_requests_total', stage='download', status='200')
+    metrics.inc('http_requests_total', 2, status='200', stage='download')
+    metrics.inc('http_requests_total', stage='download', status='404')
+    assert metrics.counters[('http_requests_total', (('stage', 'download'), ('status', '200')))] == 3
+    assert metrics.counters[('http_requests_total', (('stage', 'download'), ('status', '404')))] == 1
+
+    metrics.set_gauge('download_queue_depth', 7)
+    metrics.set_gauge('download_queue_depth', 4)
+    metrics.add_gauge('parse_in_flight', 2)
+    metrics.add_gauge('parse_in_flight', -1)
+    assert metrics.gauges[('download_queue_depth', ())] == 4
+    assert metrics.gauges[('parse_in_flight', ())] == 1
+
+def test_in_flight_is_lowered_on_error():
+    metrics = Metrics()
+    key = ('http_in_flight', (('host', 'devpost.com'),))
+    with metrics.in_flight('http_in_flight', host='devpost.com'):
+        with metrics.in_flight('http_in_flight', host='devpost.com'):
+            assert metrics.gauges[key] == 2
+    assert metrics.gauges[key] == 0
+    try:
+        with metrics.in_flight('http_in_flight', host='devpost.com'):
+            raise ValueError
+    except ValueError:
+        pass
+    assert metrics.gauges[key] == 0
+
+def test_counts_are_thread_safe():
+    metrics = Metrics()
+
+    def work():
+        for _ in range(1000):
+            metrics.inc('pages_parsed_total')
+            with metrics.in_flight('parse_in_flight'):
+                pass
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert metrics.counters[('pages_parsed_total', ())] == 8000
+    assert metrics.gauges[('parse_in_flight', ())] == 0
+
+def test_timers_and_slow_pages():
+    metrics = Metrics(slow_page_seconds=1.0)
+    metrics.record_page('https://devpost.com/software/a', 'download', 0.25, status=200, size=100)
+    metrics.record_page('https://devpost.com/software/b', 'download', 1.5, status=200, size=300, retries=2)
+    metrics.observe('parse', 0.5)
+    with metrics.timer('save'):
+        pass
+
+    assert metrics.timers['download'] == {'count': 2, 'sum': 1.75, 'max': 1.5}
+    assert metrics.timers['parse']['count'] == 1 and metrics.timers['save']['count'] == 1
+    assert [p['url'] for p in metrics.pages] == ['https://devpost.com/software/a', 'https://devpost.com/software/b']
+    assert metrics.slow_pages == [{'url': 'https://devpost.com/software/b', 'stage': 'download',
+                                   'status': 200, 'bytes': 300, 'retries': 2, 'ms': 1500.0}]
+    assert 'download' in metrics.summary() and 'save' in metrics.summary()
+
+def test_prometheus_export():
+    metrics = Metrics(prefix='test')
+    metrics.inc('http_requests_total', stage='download', status='200')
+    metrics.inc('http_requests_total', stage='discover', status='200')
+    metrics.set_gauge('download_queue_depth', 3)
+    metrics.observe('parse', 0.5)
+    metrics.observe('parse', 1.0)
+
+    lines = metrics.prometheus().splitlines()
+    assert lines == [
+        '# TYPE test_http_requests_total counter',
+        'test_http_requests_total{stage="discover",status="200"} 1',
+        'test_http_requests_total{stage="download",status="200"} 1',
+        '# TYPE test_download_queue_depth gauge',
+        'test_download_queue_depth 3',
+        '# TYPE test_stage_seconds summary',
+        'test_stage_seconds_count{stage="parse"} 2',
+        'test_stage_seconds_sum{stage="parse"} 1.500000',
+        'test_stage_max_seconds{stage="parse"} 1.000000'
+    ]
+    assert Metrics().prometheus() == '\n'
+
+def test_write():
+    metrics = Metrics(slow_page_seconds=0.1)
+    metrics.inc('pages_unchanged_total', 5)
+    metrics.record_page('https://devpost.com/software/slow', 'download', 0.2, status=200)
+    metrics.record_page('https://devpost.com/software/fast', 'download', 0.01, status=200)
+    with tempfile.TemporaryDirectory() as directory:
+        metrics.write(os.path.join(directory, 'metrics'))
+        with open(os.path.join(directory, 'metrics', 'metrics.json'), 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+        assert snapshot['counters'] == [{'name': 'pages_unchanged_total', 'labels': {}, 'value': 5}]
+        assert len(snapshot['pages']) == 2 and snapshot['timers']['download']['count'] == 2
+        with open(os.path.join(directory, 'metrics', 'slow_pages.jsonl'), 'r', encoding='utf-8') as f:
+            assert [json.loads(line)['url'] for line in f] == ['https://devpost.com/software/slow']
+        with open(os.path.join(directory, 'metrics', 'metrics.prom'), 'r', encoding='utf-8') as f:
+            assert 'scraper_pages_unchanged_total 5' in f.read()
+
+if __name__ == "__main__":
+    test_counters_and_gauges()
+    test_in_flight_is_lowered_on_error()
+    test_counts_are_thread_safe()
+    test_timers_and_slow_pages()
+    test_prometheus_export()
+    test_write()
+    print("Metrics tests passed")
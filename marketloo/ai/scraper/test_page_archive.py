@@ -0,0 +1,84 @@
+import fcntl
+import os
+import tempfile
+from page_archive import INDEX_ENTRY, PageArchive, read_page
+
+PAGES = [f"<html><h1 id='app-title'>project {i}</h1>{'<p>boilerplate</p>' * 200}</html>".encode('utf-8')
+         for i in range(50)]
+
+def test_archive_round_trip():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'pages.arc')
+        with PageArchive(path) as archive:
+            digests = [archive.put(page) for page in PAGES]
+            assert archive.put(PAGES[0]) == digests[0] and len(archive) == len(PAGES)
+            assert archive.get(digests[3]) == PAGES[3]
+        assert os.path.getsize(path) < sum(len(p) for p in PAGES) / 10
+
+        archive = PageArchive(path)
+        assert [data for _, data in archive] == PAGES
+        assert read_page(archive.ref(digests[7])) == PAGES[7].decode('utf-8')
+
+        reclaimed = archive.compact(set(digests[:10]))
+        assert reclaimed > 0 and len(archive) == 10
+        assert archive.get(digests[9]) == PAGES[9] and archive.get(digests[10]) is None
+        archive.close()
+        assert len(PageArchive(path)) == 10
+
+def test_torn_append_is_dropped():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'pages.arc')
+        with PageArchive(path) as archive:
+            first = archive.put(PAGES[0])
+            second = archive.put(PAGES[1])
+        # Crash after the index entry was lost and mid-way through the data
+        with open(path + '.idx', 'r+b') as f:
+            f.truncate(os.path.getsize(path + '.idx') // 2)
+        with open(path, 'ab') as f:
+            f.write(b'PGA1\x00garbage')
+
+        archive = PageArchive(path)
+        assert archive.get(first) == PAGES[0] and archive.get(second) == PAGES[1]
+        third = archive.put(PAGES[2])
+        archive.close()
+        assert PageArchive(path).get(third) == PAGES[2]
+
+def test_readers_leave_a_busy_archive_alone():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'pages.arc')
+        writer = PageArchive(path)
+        first = writer.put(PAGES[0])
+        writer.flush()
+        # Another process's record, half on disk
+        size = os.path.getsize(path)
+        with open(path, 'ab') as f:
+            f.write(b'PGA1\x00' + b'\x00' * 20)
+        reader = PageArchive(path, read_only=True)
+        assert reader.get(first) == PAGES[0]
+        assert os.path.getsize(path) == size + 25
+        assert os.path.getsize(path + '.idx') == INDEX_ENTRY.size
+        try:
+            reader.put(PAGES[1])
+            assert False, "read-only archives can't be written"
+        except PermissionError:
+            pass
+
+        # A second writer waits for the first to let go of the lock
+        other = PageArchive(path)
+        with open(path + '.lock') as lock:
+            try:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                assert False, "the writer should hold the lock"
+            except BlockingIOError:
+                pass
+        writer.close()
+        second = other.put(PAGES[1])
+        other.close()
+        archive = PageArchive(path, read_only=True)
+        assert archive.get(first) == PAGES[0] and archive.get(second) == PAGES[1]
+
+if __name__ == "__main__":
+    test_archive_round_trip()
+    test_torn_append_is_dropped()
+    test_readers_leave_a_busy_archive_alone()
+    print("Page archive tests passed")
@@ -0,0 +1,53 @@
+import glob
+import os
+import shutil
+import tempfile
+import parse_projects
+from parse_cache import ParseCache
+from parse_projects import parse_html_files
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+def test_unchanged_pages_are_not_reparsed():
+    saved = sorted(glob.glob(os.path.join(HERE, 'scraped_pages', '*.html')))[:1]
+    with tempfile.TemporaryDirectory() as tmp:
+        pages = []
+        for i, page in enumerate(saved * 3):
+            pages.append(os.path.join(tmp, f"page-{i}.html"))
+            shutil.copy(page, pages[-1])
+        with open(pages[-1], 'a', encoding='utf-8') as f:
+            f.write("<!-- modified -->")
+
+        with ParseCache(os.path.join(tmp, 'parse_cache.sqlite')) as cache:
+            first = dict(parse_html_files(pages, workers=1, cache=cache))
+            # Two pages share their HTML, so they were parsed once
+            assert cache.stats()['entries'] == 2
+
+            second = dict(parse_html_files(pages, workers=1, cache=cache))
+            assert cache.hits == len(pages)
+            assert {k: v['title'] for k, v in second.items()} == {k: v['title'] for k, v in first.items()}
+            assert second[pages[1]]['source_file'] == pages[1]
+
+            # A new extractor version misses, and prune drops the old entries
+            version = parse_projects.EXTRACTOR_VERSION
+            try:
+                parse_projects.EXTRACTOR_VERSION = 'edited'
+                list(parse_html_files(pages[:1], workers=1, cache=cache))
+                assert cache.hits == len(pages)
+                assert cache.prune('edited') == 2
+            finally:
+                parse_projects.EXTRACTOR_VERSION = version
+
+def test_version_covers_every_extractor_module():
+    # Sections, text and markup come from document_walk, so editing it has
+    # to invalidate cached parses just like editing parse_projects
+    assert 'document_walk' in parse_projects.EXTRACTOR_MODULES
+    assert parse_projects.extractor_version() == parse_projects.EXTRACTOR_VERSION
+    for module in parse_projects.EXTRACTOR_MODULES:
+        others = tuple(m for m in parse_projects.EXTRACTOR_MODULES if m != module)
+        assert parse_projects.extractor_version(others) != parse_projects.EXTRACTOR_VERSION
+
+if __name__ == "__main__":
+    test_unchanged_pages_are_not_reparsed()
+    test_version_covers_every_extractor_module()
+    print("Parse cache tests passed")
@@ -0,0 +1,55 @@
+import os
+from parse_projects import PROJECT_SPEC, parse_project_html
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PROJECT_PAGE = os.path.join(HERE, 'fixtures', 'project_page.html')
+
+def read_fixture():
+    with open(PROJECT_PAGE, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def test_spec_fields_from_project_page():
+    project = parse_project_html(read_fixture())
+    assert project['title'] == 'TalkTuahTaxer'
+    assert project['tagline'] == 'fanum taxing all the way - just with a little more help :)'
+    assert list(project['sections']) == ['Inspiration', 'What it does', 'How we built it',
+                                         'Challenges we ran into', "Accomplishments that we're proud of",
+                                         'What we learned', "What's next for TalkTuahTaxer"]
+    assert 'Talk to it instead of filling forms' in project['sections']['What it does']
+    assert '&' in project['sections']['Inspiration']
+    assert project['technologies'] == ['fastapi', 'openai', 'python', 'react', 'tesseract']
+    assert project['links'] == [
+        {'text': 'github.com', 'url': 'https://github.com/quoccodes4lyf/talktuahtaxer'},
+        {'text': 'talktuahtaxer.vercel.app', 'url': 'https://talktuahtaxer.vercel.app'}
+    ]
+    assert [m['name'] for m in project['team_members']] == ['Kien Quoc Ngo', 'Thi Nguyen',
+                                                             'Atharv Mhatre', 'Ahmed Abid']
+    assert project['team_members'][0]['profile_url'] == 'https://devpost.com/quoccodes4lyf'
+    assert project['team_members'][2]['contribution'] == ''
+    assert project['prizes'] == [{'hackathon': 'Brainrot Jia Seed Hackathon',
+                                  'hackathon_url': 'https://brainrot-jia-seed-hackathon.devpost.com/',
+                                  'won': ['Best Overall', 'Most Brainrot']}]
+
+def test_full_dump_keeps_the_spec_fields():
+    content = read_fixture()
+    project = parse_project_html(content)
+    full = parse_project_html(content, full=True)
+    everything = full.pop('everything')
+    for record in (project, full):
+        record.pop('scraped_at')
+    assert full == project
+    assert everything['raw_data'] and everything['links']
+    assert everything['headers']
+
+def test_html_rules_keep_markup():
+    spec = {'technologies': dict(PROJECT_SPEC['technologies'], html=True)}
+    project = parse_project_html(read_fixture(), spec)
+    assert set(project) == {'scraped_at', 'technologies', 'technologies_html'}
+    assert len(project['technologies_html']) == 5
+    assert project['technologies_html'][-1] == '<span class="cp-tag">tesseract</span>'
+
+if __name__ == "__main__":
+    test_spec_fields_from_project_page()
+    test_full_dump_keeps_the_spec_fields()
+    test_html_rules_keep_markup()
+    print("Extractor tests passed")
@@ -0,0 +1,68 @@
+import os
+import tempfile
+from project_store import ProjectStore
+
+HACKATHON = "https://brainrot-jia-seed-hackathon.devpost.com"
+
+def make_project(slug, technologies, won=()):
+    return {
+        'url': f"https://devpost.com/software/{slug}",
+        'title': slug,
+        'technologies': technologies,
+        'team_members': [{'name': 'Umaru', 'profile_url': 'https://devpost.com/umaru909'}],
+        'prizes': [{'hackathon_url': HACKATHON + '/', 'won': list(won)}]
+    }
+
+def test_upserts_and_indexed_queries():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'projects.sqlite')
+        with ProjectStore(path) as store:
+            store.upsert_tracks(HACKATHON, [{'name': 'best overall yay :3', 'prize_amount': 100}])
+            store.upsert_project(make_project('snake', ['c', 'react'], won=['best overall yay :3']), HACKATHON)
+            store.upsert_project(make_project('taxer', ['react']), HACKATHON)
+            store.upsert_project(make_project('rotbot', ['python']), HACKATHON)
+            # Re-running a stage updates in place
+            store.upsert_project(make_project('snake', ['c', 'react', 'ncurses'], won=['best overall yay :3']), HACKATHON)
+            store.record_match("https://devpost.com/software/taxer", 'best overall yay :3')
+
+        with ProjectStore(path) as store:
+            assert len(store.find_projects(hackathon=HACKATHON + '/')) == 3
+            assert [p['title'] for p in store.find_projects(technology='react')] == ['snake', 'taxer']
+            winners = store.find_projects(track='best overall yay :3', technology='react')
+            assert [p['title'] for p in winners] == ['snake']
+            assert winners[0]['technologies'] == ['c', 'ncurses', 'react']
+            assert [p['title'] for p in store.find_projects(prize='best overall yay :3')] == ['taxer']
+            assert store.tracks(HACKATHON)[0]['prize_amount'] == 100
+
+def test_project_listed_by_several_hackathons():
+    other = "https://other-hackathon.devpost.com"
+    with ProjectStore(':memory:') as store:
+        store.upsert_project(make_project('snake', ['c']), HACKATHON)
+        store.upsert_project(make_project('snake', ['c']), other + '/')
+        store.upsert_project(make_project('taxer', ['react']), other)
+        assert [p['title'] for p in store.find_projects(hackathon=HACKATHON)] == ['snake']
+        assert [p['title'] for p in store.find_projects(hackathon=other)] == ['snake', 'taxer']
+        snake = store.get_project("https://devpost.com/software/snake")
+        assert snake['hackathon'] == HACKATHON and snake['hackathons'] == sorted([HACKATHON, other])
+
+        # Winning a track of the same name in one hackathon isn't entering it in the other
+        store.add_submission("https://devpost.com/software/snake", other, 'best overall yay :3', won=True)
+        assert [p['title'] for p in store.find_projects(hackathon=other, track='best overall yay :3')] == ['snake']
+        assert store.find_projects(hackathon=HACKATHON, track='best overall yay :3') == []
+
+def test_older_stores_are_backfilled():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'projects.sqlite')
+        with ProjectStore(path) as store:
+            store.upsert_project(make_project('snake', ['c']), HACKATHON)
+            # As written before projects were linked to their hackathons
+            store.db.execute("DELETE FROM project_hackathons")
+            store.db.execute("PRAGMA user_version = 0")
+        with ProjectStore(path) as store:
+            assert [p['title'] for p in store.find_projects(hackathon=HACKATHON)] == ['snake']
+
+if __name__ == "__main__":
+    test_upserts_and_indexed_queries()
+    test_project_listed_by_several_hackathons()
+    test_older_stores_are_backfilled()
+    print("Project store tests passed")
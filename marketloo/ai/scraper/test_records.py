@@ -0,0 +1,59 @@
+import json
+import os
+import tempfile
+from records import Project, Track, dump_projects, load_projects
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(HERE, 'ai', 'scraper', 'data')
+
+def saved_projects():
+    with open(os.path.join(DATA_DIR, 'parsed_projects.json'), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def test_round_trip():
+    for data in saved_projects():
+        project = Project.from_dict(data)
+        # Only the record's own fields are dropped when None
+        assert project.to_dict() == {k: v for k, v in data.items() if v is not None or k not in Project.FIELDS}
+        assert Project.from_dict(project.to_dict()) == project
+
+def test_aliases_and_unknown_keys():
+    project = Project.from_dict({'name': 'TalkTuahTaxer', 'link': 'https://devpost.com/software/t',
+                                 'thumbnail': 'thumb.png',
+                                 'team_members': [{'name': 'Kien', 'avatar_url': 'a.png'}]})
+    assert project.title == 'TalkTuahTaxer' and project.url == 'https://devpost.com/software/t'
+    assert project.team_members[0].name == 'Kien'
+    assert project.to_dict() == {'url': 'https://devpost.com/software/t', 'title': 'TalkTuahTaxer',
+                                 'team_members': [{'name': 'Kien', 'avatar_url': 'a.png'}],
+                                 'thumbnail': 'thumb.png'}
+
+def test_repeated_strings_are_shared():
+    projects = [Project.from_dict(json.loads(json.dumps(data))) for data in saved_projects()]
+    technologies = {}
+    for project in projects:
+        for technology in project.technologies or []:
+            assert technologies.setdefault(technology, technology) is technology
+    assert not hasattr(projects[0], '__dict__')
+
+def test_load_and_dump():
+    projects = [Project.from_dict(data) for data in saved_projects()]
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ['projects.json', 'projects.jsonl']:
+            path = os.path.join(tmp, name)
+            dump_projects(projects, path)
+            assert load_projects(path) == projects
+
+def test_track():
+    with open(os.path.join(DATA_DIR, 'tracks.json'), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    tracks = [Track.from_dict(dict(t, hackathon=data['hackathon_url'])) for t in data['tracks']]
+    assert tracks[0].name == 'best overall yay :3' and tracks[0].prize_amount == 100
+    assert tracks[0].to_dict()['hackathon'] == data['hackathon_url']
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_aliases_and_unknown_keys()
+    test_repeated_strings_are_shared()
+    test_load_and_dump()
+    test_track()
+    print("Record tests passed")
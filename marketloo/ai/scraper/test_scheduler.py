@@ -0,0 +1,79 @@
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+import asyncio
+import tempfile
+from page_cache import PageCache
+from scheduler import BatchScheduler, FairQueue, hackathon_slug
+from test_crawler import start_stub_server
+
+# Two hackathons on one stub server; 'shared' is submitted to both
+GALLERIES = {
+    'big': [f"big-{i}" for i in range(30)] + ['shared'],
+    'small': ['small-0', 'small-1', 'shared']
+}
+
+class MultiHackathonHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        segments = parts.path.strip('/').split('/')
+        if segments[1:] == ['submissions', 'search'] and segments[0] in GALLERIES:
+            page = int(parse_qs(parts.query).get('page', ['1'])[0])
+            slugs = GALLERIES[segments[0]] if page == 1 else []
+            links = ''.join(f'<a class="block-wrapper-link" href="/software/{s}">{s}</a>' for s in slugs)
+            self._send(200, f"<html><body>{links}</body></html>")
+        elif segments[0] == 'software':
+            self._send(200, f"<html><h1 id='app-title'>{segments[1]}</h1></html>")
+        else:
+            self._send(404, "not found")
+
+    def _send(self, status, body):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def test_fair_queue_round_robin():
+    async def run():
+        queue = FairQueue(maxsize=10)
+        for key in ['a', 'b']:
+            queue.add_key(key)
+        for i in range(4):
+            await queue.put('a', i)
+        await queue.put('b', 0)
+        await queue.close('a')
+        await queue.close('b')
+        items = []
+        while (item := await queue.get()) is not None:
+            items.append(item)
+        return items
+
+    assert asyncio.run(run()) == [('a', 0), ('b', 0), ('a', 1), ('a', 2), ('a', 3)]
+
+def test_batch_is_partitioned_per_hackathon():
+    server, base_url = start_stub_server(MultiHackathonHandler)
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with PageCache(cache_dir) as cache:
+                scheduler = BatchScheduler([f"{base_url}/big", f"{base_url}/small/"], cache,
+                                           progress_every=0, base_url=base_url, workers=4)
+                partitions = asyncio.run(scheduler.run())
+    finally:
+        server.shutdown()
+
+    big_changed, big_unchanged = partitions[f"{base_url}/big"]
+    small_changed, small_unchanged = partitions[f"{base_url}/small"]
+    assert len(big_changed) + len(big_unchanged) == len(GALLERIES['big'])
+    assert sorted(url.split('/')[-1] for url, _ in small_changed) == sorted(GALLERIES['small'])
+    # The shared project was downloaded once but belongs to both
+    assert scheduler.fetched[f"{base_url}/big"] + scheduler.fetched[f"{base_url}/small"] == 33
+    assert f"{base_url}/software/shared" in [url for url, _ in big_changed]
+    assert hackathon_slug("https://brainrot-jia-seed-hackathon.devpost.com/") == 'brainrot-jia-seed-hackathon'
+
+if __name__ == "__main__":
+    test_fair_queue_round_robin()
+    test_batch_is_partitioned_per_hackathon()
+    print("Scheduler tests passed")
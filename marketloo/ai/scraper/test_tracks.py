@@ -1,9 +1,10 @@
-from bs4 import BeautifulSoup
+from html_backend import make_soup
 import requests
 import json
 import re
 import os
 import time
+from project_store import ProjectStore
 
 def test_track_scraping(hackathon_url):
     """Test scraping prize tracks from a hackathon's main page"""
@@ -19,7 +20,7 @@ def test_track_scraping(hackathon_url):
         with open('ai/scraper/data/hackathon_page.html', 'w', encoding='utf-8') as f:
             f.write(response.text)
             
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = make_soup(response.text)
         
         tracks_data = {
             "hackathon_url": hackathon_url,
@@ -74,7 +75,10 @@ def test_track_scraping(hackathon_url):
         with open('ai/scraper/data/tracks.json', 'w', encoding='utf-8') as f:
             json.dump(tracks_data, f, indent=2)
             
-        print(f"\nSaved {len(tracks_data['tracks'])} tracks to tracks.json")
+        with ProjectStore() as store:
+            store.upsert_tracks(hackathon_url, tracks_data['tracks'])
+            
+        print(f"\nSaved {len(tracks_data['tracks'])} tracks to tracks.json and the project store")
             
     except Exception as e:
         print(f"Error scraping tracks: {str(e)}")
@@ -0,0 +1,135 @@
+from urllib.parse import urlsplit, parse_qs
+import asyncio
+import hashlib
+import json
+import os
+import tempfile
+from crawler import Crawler
+from metrics import Metrics
+from page_cache import PageCache
+from test_crawler import StubDevpostHandler, start_stub_server
+from watch import GalleryWatch, gallery_entries
+
+PER_PAGE = 3
+
+def render_entry(project):
+    badge = '<aside class="entry-badge"><span class="winner label">Winner</span></aside>' if project['winner'] else ''
+    return (f'<div class="gallery-item"><a class="block-wrapper-link" href="/software/{project["slug"]}">'
+            f'<div class="software-entry">{badge}<div class="software-entry-name"><h5>{project["slug"]}</h5></div>'
+            f'<footer><span class="count like-count">{project["likes"]}</span>'
+            f'<span class="count comment-count">{project["comments"]}</span></footer></div></a></div>')
+
+class LiveGalleryHandler(StubDevpostHandler):
+    """A gallery whose projects the test edits between polls. Gallery pages
+    carry an ETag of their body and answer 304 when it still matches."""
+    projects = []
+    requests = []
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        self.requests.append((parts.path, self.headers.get('If-None-Match') is not None))
+        if parts.path != '/submissions/search':
+            return super().do_GET()
+        page = int(parse_qs(parts.query).get('page', ['1'])[0])
+        listed = self.projects[(page - 1) * PER_PAGE:page * PER_PAGE]
+        page_count = -(-len(self.projects) // PER_PAGE)
+        pagination = ''.join(f'<li><a href="/submissions/search?page={n}">{n}</a></li>'
+                             for n in range(1, page_count + 1))
+        body = f'<html><body>{"".join(map(render_entry, listed))}<ul class="pagination">{pagination}</ul></body></html>'
+        etag = f'"{hashlib.sha256(body.encode()).hexdigest()[:16]}"'
+        if self.headers.get('If-None-Match') == etag:
+            return self._send(304, "", etag=etag)
+        self._send(200, body, etag=etag)
+
+def project(slug, likes=0, comments=0, winner=False):
+    return {'slug': slug, 'likes': likes, 'comments': comments, 'winner': winner}
+
+def test_gallery_entries():
+    html = ''.join(map(render_entry, [project('a', likes=1204, comments=9, winner=True), project('b')]))
+    html += '<a class="block-wrapper-link" href="https://devpost.com/software/bare">bare</a>'
+    entries = gallery_entries(html)
+    assert entries[0] == {'url': 'https://devpost.com/software/a', 'title': 'a', 'likes': 1204,
+                          'comments': 9, 'winner': True}
+    assert not entries[1]['winner'] and entries[1]['likes'] == 0
+    assert entries[2] == {'url': 'https://devpost.com/software/bare', 'title': None, 'likes': None,
+                          'comments': None, 'winner': False}
+
+def test_watch_emits_only_what_changed():
+    LiveGalleryHandler.projects = [project(f"p{i}", likes=i) for i in range(5)]
+    server, base_url = start_stub_server(LiveGalleryHandler)
+    queue = asyncio.Queue()
+    seen = []
+    fetched = []
+
+    async def run(state_path, cache, metrics):
+        async with Crawler(base_url=base_url, cache=cache, metrics=metrics) as crawler:
+            watch = GalleryWatch(crawler, base_url, [queue, seen.append],
+                                 lambda url, html: fetched.append(url), state_path)
+            first = await watch.poll()
+
+            LiveGalleryHandler.requests = []
+            fetched.clear()
+            assert await watch.poll() == []
+            # Every gallery page revalidated with a 304; no project pages
+            assert all(path == '/submissions/search' and conditional
+                       for path, conditional in LiveGalleryHandler.requests)
+
+            LiveGalleryHandler.projects[1]['likes'] += 4
+            LiveGalleryHandler.projects[2]['winner'] = True
+            LiveGalleryHandler.projects.append(project('p5', likes=2))
+            LiveGalleryHandler.requests = []
+            changed = await watch.poll()
+            # Only this poll's unchanged pages are kept
+            assert crawler.unchanged == [f"{base_url}/software/p2"]
+            return first, changed
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            state_path = os.path.join(directory, 'watch_state.json')
+            metrics = Metrics()
+            with PageCache(os.path.join(directory, 'cache')) as cache:
+                first, changed = asyncio.run(run(state_path, cache, metrics))
+
+            assert [e['type'] for e in first] == ['new_project'] * 5
+            assert first[3]['likes'] == 3 and first[3]['url'] == f"{base_url}/software/p3"
+            assert {(e['type'], e['title']) for e in changed} == {('likes', 'p1'), ('winner', 'p2'),
+                                                                 ('new_project', 'p5')}
+            likes = next(e for e in changed if e['type'] == 'likes')
+            assert (likes['likes'], likes['delta']) == (5, 4)
+            # Only the new project and the new winner were requested, and
+            # only the new one's page had changed
+            assert sorted(path for path, _ in LiveGalleryHandler.requests
+                          if path != '/submissions/search') == ['/software/p2', '/software/p5']
+            assert fetched == [f"{base_url}/software/p5"]
+            assert seen == first + changed and queue.qsize() == len(seen)
+            assert metrics.counters[('watch_events_total', (('type', 'new_project'),))] == 6
+
+            # Both pages, and the empty one probed past them
+            with open(state_path, 'r', encoding='utf-8') as f:
+                pages = json.load(f)[base_url]['pages']
+            assert [len(pages[page]) for page in sorted(pages)] == [3, 3, 0]
+
+            # A restarted watch picks up from the snapshot
+            del LiveGalleryHandler.projects[0]
+            with PageCache(os.path.join(directory, 'cache')) as cache:
+                restarted = asyncio.run(restart(base_url, state_path, cache))
+            assert [(e['type'], e['title']) for e in restarted] == [('removed', 'p0')]
+    finally:
+        server.shutdown()
+
+async def restart(base_url, state_path, cache):
+    async with Crawler(base_url=base_url, cache=cache) as crawler:
+        return await GalleryWatch(crawler, base_url, state_path=state_path).poll()
+
+def test_watch_needs_a_cache():
+    try:
+        GalleryWatch(Crawler(), "https://example.devpost.com")
+    except ValueError:
+        return
+    assert False, "expected a ValueError"
+
+if __name__ == "__main__":
+    test_gallery_entries()
+    test_watch_emits_only_what_changed()
+    test_watch_needs_a_cache()
+    print("Watch tests passed")
@@ -0,0 +1,260 @@
+import argparse
+import asyncio
+import inspect
+import json
+import os
+import re
+import time
+from crawler import Crawler, gallery_page_count, gallery_url
+from frontier import DEVPOST_URL, canonicalize
+from html_backend import make_soup
+from jsonl_sink import JsonlSink
+from page_cache import PageCache
+
+STATE_PATH = "ai/scraper/data/watch_state.json"
+EVENTS_PATH = "ai/scraper/data/watch_events.jsonl"
+PROJECTS_PATH = "ai/scraper/data/watch_projects.jsonl"
+# Not parse.py's page_cache: both rewrite the cache index from the copy
+# they loaded, so sharing one would lose the other's entries
+CACHE_DIR = "ai/scraper/data/watch_cache"
+POLL_INTERVAL = 60
+
+def _count(container, selector):
+    element = container.select_one(selector)
+    match = re.search(r'\d+', element.get_text().replace(',', '')) if element else None
+    return int(match.group()) if match else None
+
+def gallery_entries(html, base_url=DEVPOST_URL):
+    """What a gallery page says about each project on it: [{url, title,
+    likes, comments, winner}] in gallery order. Counts the page doesn't
+    show are None."""
+    soup = make_soup(html)
+    entries = []
+    for link in soup.find_all('a', class_='block-wrapper-link'):
+        href = link.get('href')
+        if not href:
+            continue
+        container = link.find_parent(class_='gallery-item') or link
+        title = container.find('h5')
+        entries.append({
+            'url': canonicalize(href, base_url),
+            'title': title.get_text(strip=True) if title else None,
+            'likes': _count(container, '.like-count'),
+            'comments': _count(container, '.comment-count'),
+            'winner': container.select_one('.winner') is not None
+        })
+    return entries
+
+def event_sink(target):
+    """A function that delivers one event to target: a callback (plain or
+    coroutine function), anything with put_nowait (an asyncio.Queue), or a
+    JSONL file path or JsonlSink"""
+    if isinstance(target, str):
+        target = JsonlSink(target, flush_every=1)
+    if isinstance(target, JsonlSink):
+        return target.write
+    if hasattr(target, 'put_nowait'):
+        return target.put_nowait
+    return target
+
+class GalleryWatch:
+    """Polls a hackathon gallery and emits what changed since the last poll.
+
+    Gallery pages are fetched through the crawler's PageCache, so a page
+    that comes back 304 or byte-identical is neither parsed nor diffed; the
+    projects it listed last time are taken from the snapshot instead. Only
+    projects that are new, or whose winner flag flipped, have their pages
+    fetched (again through the cache) and passed to on_page; likes and
+    comments come from the gallery itself. A poll of a quiet gallery is
+    one conditional request per gallery page and nothing else.
+
+    Each change is an event dict with 'type' ('new_project', 'likes',
+    'comments', 'winner' or 'removed'), 'hackathon', 'url', 'title' and
+    'at', plus the new value and, for counts, the 'delta'. Events go to
+    every sink (see event_sink). Projects are only reported removed after
+    a poll that read every gallery page.
+
+    The snapshot (page count and each page's entries) is kept per
+    hackathon in one JSON file at state_path, so a restarted watch diffs
+    against where the last one left off.
+    """
+
+    def __init__(self, crawler, hackathon_url, sinks=(), on_page=None, state_path=STATE_PATH):
+        if crawler.cache is None:
+            raise ValueError("Watching a gallery needs a Crawler with a PageCache")
+        self.crawler = crawler
+        self.hackathon_url = hackathon_url.rstrip('/')
+        self.sinks = [event_sink(sink) for sink in sinks]
+        self.on_page = on_page
+        self.state_path = state_path
+        self.state = {}
+        if state_path and os.path.exists(state_path):
+            with open(state_path, 'r', encoding='utf-8') as f:
+                self.state = json.load(f)
+        snapshot = self.state.get(self.hackathon_url, {})
+        self.page_count = snapshot.get('page_count', 1)
+        self.pages = {int(page): entries for page, entries in snapshot.get('pages', {}).items()}
+        self.polls = 0
+
+    def projects(self):
+        """{url: entry} for every project in the snapshot, in gallery order"""
+        return {entry['url']: entry for page in sorted(self.pages) for entry in self.pages[page]}
+
+    async def _poll_page(self, page):
+        """The entries on one gallery page, or None if it couldn't be read"""
+        url = gallery_url(self.hackathon_url, page)
+        outcome, html = await self.crawler.revalidate(url, stage='watch')
+        if self.crawler.metrics is not None:
+            self.crawler.metrics.inc('watch_gallery_pages_total', outcome=outcome)
+        if outcome == 'failed':
+            print(f"Failed to poll gallery page {page} of {self.hackathon_url}: {html}")
+            return None
+        if outcome == 'unchanged':
+            if page in self.pages:
+                return self.pages[page]
+            # Cached by an earlier run but not in this snapshot
+            html = self.crawler.cache.read(url)
+            if html is None:
+                return None
+        self.pages[page] = gallery_entries(html, self.crawler.base_url)
+        if page == 1:
+            self.page_count = gallery_page_count(html) or 1
+        return self.pages[page]
+
+    async def _read_gallery(self):
+        """Poll every gallery page. Returns True if all of them were read."""
+        complete = await self._poll_page(1) is not None
+        pages = range(2, self.page_count + 1)
+        results = await asyncio.gather(*(self._poll_page(page) for page in pages))
+        complete = complete and all(entries is not None for entries in results)
+
+        # New submissions can spill onto pages past the advertised count
+        last = self.page_count
+        while complete and self.pages.get(last):
+            last += 1
+            entries = await self._poll_page(last)
+            complete = entries is not None
+        for page in [p for p in self.pages if p > last]:
+            del self.pages[page]
+        return complete
+
+    def _event(self, kind, entry, **fields):
+        return dict({'type': kind, 'hackathon': self.hackathon_url, 'url': entry['url'],
+                     'title': entry.get('title'), 'at': time.time()}, **fields)
+
+    def diff(self, before, after, complete=True):
+        """Events for the change from one {url: entry} snapshot to another,
+        and the URLs whose project pages need fetching"""
+        events, fetch = [], []
+        for url, entry in after.items():
+            old = before.get(url)
+            if old is None:
+                events.append(self._event('new_project', entry, likes=entry['likes'],
+                                          comments=entry['comments'], winner=entry['winner']))
+                fetch.append(url)
+                continue
+            for count in ('likes', 'comments'):
+                if entry[count] is not None and old[count] is not None and entry[count] != old[count]:
+                    events.append(self._event(count, entry, **{count: entry[count],
+                                                               'delta': entry[count] - old[count]}))
+            if entry['winner'] != old['winner']:
+                events.append(self._event('winner', entry, winner=entry['winner']))
+                fetch.append(url)
+        if complete:
+            events += [self._event('removed', entry) for url, entry in before.items() if url not in after]
+        return events, fetch
+
+    async def emit(self, event):
+        for sink in self.sinks:
+            result = sink(event)
+            if inspect.isawaitable(result):
+                await result
+        if self.crawler.metrics is not None:
+            self.crawler.metrics.inc('watch_events_total', type=event['type'])
+
+    async def poll(self):
+        """Poll the gallery once. Returns the events emitted."""
+        # The crawler lists the unchanged project pages it fetched; only
+        # this poll's are of any use, and a long watch would pile them up
+        self.crawler.unchanged = []
+        before = self.projects()
+        complete = await self._read_gallery()
+        events, fetch = self.diff(before, self.projects(), complete)
+        for event in events:
+            await self.emit(event)
+        if fetch:
+            await asyncio.gather(*(self.crawler.download(url, self.on_page) for url in fetch))
+        self.polls += 1
+        self.save()
+        return events
+
+    async def run(self, interval=POLL_INTERVAL, polls=None):
+        """Poll every interval seconds, forever or for `polls` polls"""
+        while polls is None or self.polls < polls:
+            start = time.monotonic()
+            events = await self.poll()
+            print(f"Poll {self.polls} of {self.hackathon_url}: {len(self.projects())} projects, "
+                  f"{len(events)} changes")
+            if polls is not None and self.polls >= polls:
+                break
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - start)))
+
+    def save(self):
+        """Write the snapshot and the page cache index"""
+        self.crawler.cache.save()
+        if not self.state_path:
+            return
+        self.state[self.hackathon_url] = {'page_count': self.page_count,
+                                          'pages': {str(page): entries for page, entries in self.pages.items()}}
+        if os.path.dirname(self.state_path):
+            os.makedirs(os.path.dirname(self.state_path), exist_ok=True)
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+        os.replace(tmp_path, self.state_path)
+
+def watch(hackathon_url, sinks=(), on_page=None, interval=POLL_INTERVAL, polls=None,
+          state_path=STATE_PATH, cache=None, **crawler_options):
+    """Blocking helper that watches one hackathon, by default caching pages
+    in its own CACHE_DIR. A cache passed in is left open."""
+    own_cache = cache is None
+    cache = cache or PageCache(CACHE_DIR)
+
+    async def run():
+        async with Crawler(cache=cache, **crawler_options) as crawler:
+            await GalleryWatch(crawler, hackathon_url, sinks, on_page, state_path).run(interval, polls)
+    try:
+        asyncio.run(run())
+    finally:
+        if own_cache:
+            cache.close()
+
+if __name__ == "__main__":
+    from parse_projects import parse_project_html
+
+    parser = argparse.ArgumentParser(description="Watch a live hackathon gallery for changes")
+    parser.add_argument('hackathon', help="Hackathon URL")
+    parser.add_argument('--interval', type=float, default=POLL_INTERVAL, help="Seconds between polls")
+    parser.add_argument('--polls', type=int, help="Stop after this many polls (default: run until stopped)")
+    parser.add_argument('--events', default=EVENTS_PATH, help="JSONL file the change events are appended to")
+    parser.add_argument('--projects', default=PROJECTS_PATH,
+                        help="JSONL file new and re-fetched projects are parsed into")
+    parser.add_argument('--state', default=STATE_PATH, help="Where the gallery snapshot is kept between runs")
+    parser.add_argument('--cache-dir', default=CACHE_DIR,
+                        help="Page cache to poll through (don't share it with a running parse.py)")
+    args = parser.parse_args()
+
+    def print_event(event):
+        detail = {k: v for k, v in event.items() if k not in ('type', 'hackathon', 'url', 'title', 'at')}
+        print(f"{event['type']}: {event['title'] or event['url']} {detail}")
+
+    with JsonlSink(args.events, flush_every=1) as events, JsonlSink(args.projects) as projects, \
+            PageCache(args.cache_dir) as cache:
+        def on_page(url, html):
+            project = parse_project_html(html)
+            if project:
+                projects.write(dict(project, url=url))
+        try:
+            watch(args.hackathon, [events, print_event], on_page, args.interval, args.polls, args.state, cache)
+        except KeyboardInterrupt:
+            print("Stopped watching")